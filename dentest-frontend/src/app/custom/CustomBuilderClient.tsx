@@ -6,6 +6,7 @@ import Link from 'next/link';
 import { useRouter, useSearchParams } from 'next/navigation';
 import { motion } from 'framer-motion';
 import GradientButton from '@/components/GradientButton';
+import { syncStatuses } from '@/lib/sync';
 
 /* -------------------------------------------------------------
    Helpers
@@ -69,6 +70,7 @@ export default function CustomBuilderClient() {
     const [errorMsg, setErrorMsg] = useState<string | null>(null);
     const [hasHistory, setHasHistory] = useState(false);
     const [isLoggedIn, setIsLoggedIn] = useState(false);
+    const [username, setUsername] = useState<string | null>(null);
     const [checkingLogin, setCheckingLogin] = useState(true);
     const router = useRouter();
     const search = useSearchParams();
@@ -79,7 +81,10 @@ export default function CustomBuilderClient() {
         (async () => {
             try {
                 const data = await apiFetch('/current-user/');
-                if (data.username) setIsLoggedIn(true);
+                if (data.username) {
+                    setIsLoggedIn(true);
+                    setUsername(data.username);
+                }
             } catch {
                 setIsLoggedIn(false);
             } finally {
@@ -95,16 +100,16 @@ export default function CustomBuilderClient() {
     ------------------------------------------------------------- */
     // 📚 Check if user has question history
     useEffect(() => {
-        if (!isLoggedIn) return;
+        if (!isLoggedIn || !username) return;
         (async () => {
             try {
-                const data = await apiFetch('/user-question-status/all/');
-                setHasHistory((data.results ?? data).length > 0);
+                const statuses = await syncStatuses<{ question_id: number }>(username);
+                setHasHistory(statuses.length > 0);
             } catch {
                 setHasHistory(false);
             }
         })();
-    }, [isLoggedIn]);
+    }, [isLoggedIn, username]);
 
     /* -------------------------------------------------------------
        Load subjects by section / exam
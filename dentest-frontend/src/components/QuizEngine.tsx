@@ -8,6 +8,7 @@ import clsx from 'clsx';
 import GradientButton from '@/components/GradientButton';
 import { API } from '@/lib/config';
 import { MEDIA_BASE } from "@/lib/config";
+import { syncSubjectQuestions } from '@/lib/sync';
 import Image from "next/image";
 import ReactMarkdown from 'react-markdown';
 import rehypeRaw from 'rehype-raw';
@@ -28,7 +29,30 @@ function fullMediaUrl(url?: string | null): string | null {
   return `${MEDIA_BASE}/${url}`;
 }
 
+/* "url 320w, url 640w" from the API, with relative urls made absolute */
+function fullSrcSet(srcset?: string | null): string | undefined {
+  if (!srcset) return undefined;
+  return srcset
+    .split(', ')
+    .map((entry) => {
+      const [url, width] = entry.split(' ');
+      return `${fullMediaUrl(url)} ${width}`;
+    })
+    .join(', ');
+}
+
+/* Rendered inside max-w-md (28rem) boxes */
+const DIAGRAM_SIZES = '(max-width: 480px) 100vw, 448px';
+
 /* ---------- types ---------- */
+export interface ImageVariants {
+  width: number | null;
+  height: number | null;
+  placeholder: string | null;
+  webp: string;
+  jpeg: string;
+}
+
 export interface Question {
   id: number;
   text: string;
@@ -42,10 +66,38 @@ export interface Question {
   question_image_url?: string | null;
   explanation_image?: string | null;
   explanation_image_url?: string | null;
+  question_image_variants?: ImageVariants | null;
+  explanation_image_variants?: ImageVariants | null;
 }
 type Letter = 'A' | 'B' | 'C' | 'D';
 type AnswerStatus = { selected: Letter; isCorrect: boolean };
 
+/* WebP/JPEG srcset with a blurred placeholder; the original until variants are built */
+function Diagram({ src, variants, alt }: { src: string; variants?: ImageVariants | null; alt: string }) {
+  const className = 'rounded-lg border border-neutral-800 object-contain';
+  if (!variants?.jpeg) {
+    return <Image src={src} alt={alt} className={className} width={600} height={400} priority={false} />;
+  }
+  return (
+    <picture>
+      {variants.webp && <source type="image/webp" srcSet={fullSrcSet(variants.webp)} sizes={DIAGRAM_SIZES} />}
+      {/* eslint-disable-next-line @next/next/no-img-element -- variants are pre-sized, next/image would resize again */}
+      <img
+        src={src}
+        srcSet={fullSrcSet(variants.jpeg)}
+        sizes={DIAGRAM_SIZES}
+        alt={alt}
+        className={clsx(className, 'w-full h-auto bg-cover bg-center')}
+        width={variants.width ?? undefined}
+        height={variants.height ?? undefined}
+        loading="lazy"
+        decoding="async"
+        style={variants.placeholder ? { backgroundImage: `url("${variants.placeholder}")` } : undefined}
+      />
+    </picture>
+  );
+}
+
 export default function QuizEngine({
   subjectId,
   sectionId,
@@ -85,8 +137,7 @@ export default function QuizEngine({
     if (propQuestions?.length) {
       setQuestions(propQuestions);
     } else if (subjectId) {
-      fetch(`${API}/questions/subject/${subjectId}/`)
-        .then((r) => r.json())
+      syncSubjectQuestions<Question>(subjectId)
         .then(setQuestions)
         .catch((err) => console.error('Failed to load questions:', err));
     }
@@ -318,13 +369,10 @@ export default function QuizEngine({
             <p className="leading-relaxed text-neutral-100">{q.text}</p>
             {(q.question_image || q.question_image_url) && (
               <div className="relative w-full max-w-md mx-auto my-4 aspect-auto">
-                <Image
+                <Diagram
                   src={fullMediaUrl(q.question_image_url || q.question_image)!}
+                  variants={q.question_image_variants}
                   alt="Question diagram"
-                  className="rounded-lg border border-neutral-800 object-contain"
-                  width={600}
-                  height={400}
-                  priority={false}
                 />
               </div>
             )}
@@ -397,13 +445,10 @@ export default function QuizEngine({
 
                   {(q.explanation_image || q.explanation_image_url) && (
                     <div className="relative w-full max-w-md mx-auto mt-4 aspect-auto">
-                      <Image
+                      <Diagram
                         src={fullMediaUrl(q.explanation_image_url || q.explanation_image)!}
+                        variants={q.explanation_image_variants}
                         alt="Explanation diagram"
-                        className="rounded-lg border border-neutral-800 object-contain"
-                        width={600}
-                        height={400}
-                        priority={false}
                       />
                     </div>
                   )}
@@ -0,0 +1,104 @@
+// lib/sync.ts
+// Delta sync against /api/sync/*: cache rows in localStorage, then ask only for
+// what changed since the last token. Any cache problem just means a full sync.
+// A first visit to a subject starts from the static catalog (publish_static_catalog)
+// instead of a full sync, so only the changes since its publish go through Django.
+import { API, MEDIA_BASE } from '@/lib/config';
+
+type Cached<T> = { token: string; rows: T[] };
+
+function load<T>(key: string): Cached<T> | null {
+    try {
+        const raw = localStorage.getItem(key);
+        return raw ? (JSON.parse(raw) as Cached<T>) : null;
+    } catch {
+        return null;
+    }
+}
+
+function store<T>(key: string, value: Cached<T>) {
+    try {
+        localStorage.setItem(key, JSON.stringify(value));
+    } catch {
+        /* quota exceeded → next visit does a full sync */
+    }
+}
+
+function merge<T>(
+    cached: Cached<T> | null,
+    full: boolean,
+    changed: T[],
+    deleted: number[],
+    idOf: (row: T) => number
+): T[] {
+    const byId = new Map<number, T>(
+        full || !cached ? [] : cached.rows.map((row) => [idOf(row), row] as [number, T])
+    );
+    deleted.forEach((id) => byId.delete(id));
+    changed.forEach((row) => byId.set(idOf(row), row));
+    return [...byId.values()].sort((a, b) => idOf(a) - idOf(b));
+}
+
+type CatalogManifest = {
+    version?: string;
+    published_at?: string;
+    base_url?: string;
+    questions?: Record<string, string>;
+};
+
+let manifest: Promise<CatalogManifest> | null = null;
+
+function catalogManifest(): Promise<CatalogManifest> {
+    manifest ??= fetch(`${API}/catalog/manifest/`)
+        .then((res) => (res.ok ? res.json() : {}))
+        .catch(() => ({}));
+    return manifest;
+}
+
+/** The subject's published bank and a sync token for its publish time, or null when there is none. */
+async function catalogQuestions<T>(subjectId: string): Promise<Cached<T> | null> {
+    const { base_url, published_at, questions } = await catalogManifest();
+    const name = questions?.[subjectId];
+    const publishedAt = published_at ? Date.parse(published_at) : NaN;
+    if (!base_url || !name || Number.isNaN(publishedAt)) return null;
+    const base = base_url.startsWith('http') ? base_url : `${MEDIA_BASE}${base_url}`;
+    try {
+        // Hashed name: the browser and CDN cache it forever
+        const res = await fetch(`${base}${name}`);
+        return res.ok ? { token: String(publishedAt), rows: (await res.json()) as T[] } : null;
+    } catch {
+        return null;
+    }
+}
+
+/** Full question bank of a subject, transferring only changes on repeat visits. */
+export async function syncSubjectQuestions<T extends { id: number }>(subjectId: string): Promise<T[]> {
+    const key = `dentest:questions:${subjectId}`;
+    const cached = load<T>(key) ?? (await catalogQuestions<T>(subjectId));
+    const params = new URLSearchParams({ subject_id: subjectId });
+    if (cached) params.set('since', cached.token);
+
+    const res = await fetch(`${API}/sync/questions/?${params}`);
+    if (!res.ok) throw new Error(`Question sync failed: ${res.status}`);
+    const data: { token: string; full: boolean; questions: T[]; deleted: number[] } = await res.json();
+
+    const rows = merge(cached, data.full, data.questions, data.deleted, (q) => q.id);
+    store(key, { token: data.token, rows });
+    return rows;
+}
+
+/** Every answer status of the logged-in user (cache is per username). */
+export async function syncStatuses<T extends { question_id: number }>(username: string): Promise<T[]> {
+    const key = `dentest:statuses:${username}`;
+    const cached = load<T>(key);
+    const params = new URLSearchParams();
+    if (cached) params.set('since', cached.token);
+
+    const res = await fetch(`${API}/sync/statuses/?${params}`, { credentials: 'include' });
+    if (!res.ok) throw new Error(`Status sync failed: ${res.status}`);
+    const data: { token: string; full: boolean; statuses: T[]; deleted: number[] } = await res.json();
+
+    const rows = merge(cached, data.full, data.statuses, data.deleted, (s) => s.question_id);
+    store(key, { token: data.token, rows });
+    return rows;
+}
@@ -0,0 +1,52 @@
+"""
+Gunicorn profile for serving the ASGI application with uvicorn workers.
+
+    gunicorn myproject.core.asgi:application -c myproject/core/gunicorn_asgi.py
+
+or, single process (development / containers that scale by replica):
+
+    uvicorn myproject.core.asgi:application --host 0.0.0.0 --port 8000 --workers 2 --lifespan off
+
+Why: with the WSGI profile (`gunicorn myproject.core.wsgi:application`, sync
+workers) each request owns a whole worker process until it returns, so a slow
+Postgres query or a slow client caps concurrency at the worker count. A uvicorn
+worker runs an event loop and keeps accepting requests while the async views in
+quiz/views_async.py (/api/async/...) await the database.
+
+Caveats:
+  * Django's async ORM still executes queries on one thread per worker, so
+    queries inside a worker are serialized; size `workers` by cores as for WSGI.
+  * Synchronous DRF views still work but run in a thread, one at a time per
+    worker by default. Only the /api/async/ endpoints benefit.
+  * Every middleware must be async-capable, or Django adapts the request to
+    sync around it. Workers therefore default to the production settings with
+    SERVE_STATIC=False: WhiteNoise is sync-only, so static files come from a
+    WSGI instance or the CDN.
+  * Persistent connections (CONN_MAX_AGE) are not safe to share across the
+    async worker's request contexts, so they are disabled here. Put PgBouncer
+    in front of Postgres if connection setup shows up in latency.
+
+Compare both profiles on the same core count with
+`manage.py bench_read_endpoints` (spawns each profile, reports req/s and p99).
+
+Every setting below can be overridden from the environment.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = 500
+raw_env = [
+    "CONN_MAX_AGE=0",
+    # asgi.py falls back to the dev settings, whose debug toolbar is sync-only
+    f"DJANGO_SETTINGS_MODULE={os.environ.get('DJANGO_SETTINGS_MODULE', 'myproject.core.settings_production')}",
+    f"SERVE_STATIC={os.environ.get('SERVE_STATIC', 'False')}",
+]
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
@@ -0,0 +1,80 @@
+"""
+Non-blocking logging handlers.
+
+`QueueingHandler` is a `logging.handlers.QueueHandler` that owns its
+`QueueListener`: the request thread only freezes the message and puts the
+record on an in-memory queue. Formatting (JSON, tracebacks) and I/O happen on
+the listener thread, in the real ("target") handler. Usable straight from
+`LOGGING`:
+
+    "console": {
+        "class": "myproject.core.log_handlers.QueueingHandler",
+        "target": "logging.StreamHandler",
+        "formatter": "plain",
+    }
+
+Extra keys are passed to the target handler's constructor. A `{pid}` in a
+`filename` is replaced by the worker's pid, so rotating file handlers never
+rotate a file another gunicorn worker is still writing.
+"""
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+
+from django.utils.module_loading import import_string
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    def __init__(self, target="logging.StreamHandler", maxsize=10000, **target_kwargs):
+        super().__init__(queue.Queue(maxsize))
+        self._target_class = import_string(target)
+        self._target_kwargs = target_kwargs
+        self._formatter = None
+        self.target = None
+        self._listener = None
+        self._start()
+        atexit.register(self._stop)
+        # gunicorn --preload forks after settings are loaded; threads don't survive fork
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        kwargs = dict(self._target_kwargs)
+        if "filename" in kwargs:
+            kwargs["filename"] = str(kwargs["filename"]).format(pid=os.getpid())
+            os.makedirs(os.path.dirname(os.path.abspath(kwargs["filename"])), exist_ok=True)
+        self.target = self._target_class(**kwargs)
+        if self._formatter is not None:
+            self.target.setFormatter(self._formatter)
+        self._listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self._listener.start()
+
+    def _stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the target handler
+        self._formatter = fmt
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Freeze the message (args may be mutated after we return) and nothing else
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # shed log lines rather than block a request when the sink can't keep up
+
+    def close(self):
+        self._stop()
+        self.target.close()
+        super().close()
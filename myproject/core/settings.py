@@ -3,6 +3,7 @@ Django settings for myproject project.
 """
 
 import os
+import tempfile
 from pathlib import Path
 import environ
 import dj_database_url
@@ -55,6 +56,11 @@ INSTALLED_APPS = [
 
 # --- MIDDLEWARE ---
 MIDDLEWARE = [
+    'quiz.request_log.RequestLogMiddleware',  # outermost: times the whole stack
+    'quiz.metrics.MetricsMiddleware',
+    'quiz.slow_queries.SlowQueryMiddleware',  # no-op unless SLOW_QUERY_LOG
+    'quiz.profiling.ProfilingMiddleware',  # only requests with a signed X-Profile header
+    'quiz.memory.MemoryMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -62,6 +68,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Query cap + statement_timeout per view, 503 when exceeded. Inside the session
+    # middleware, so its response-phase save isn't charged to the view.
+    'quiz.budgets.BudgetMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -94,7 +103,7 @@ if os.environ.get('DATABASE_URL'):
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ['DATABASE_URL'],
-            conn_max_age=600,
+            conn_max_age=env.int("CONN_MAX_AGE", default=600),  # 0 under ASGI, see gunicorn_asgi.py
             ssl_require=True
         )
     }
@@ -140,7 +149,20 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Content-hashed names (collectstatic manifest, publish_static_catalog JSON) are cached forever
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.\w+$"
+
+# Uploads are stored by SHA-256 (content/ab/cd/<hash>.<ext>): identical files are kept once
+STORAGES = {
+    "default": {"BACKEND": "quiz.storage.ContentAddressedStorage"},
+    # Hashed + pre-compressed names from collectstatic (matched by WHITENOISE_IMMUTABLE_FILE_TEST)
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Background threads that render resized WebP/JPEG variants of uploaded images
+IMAGE_VARIANT_WORKERS = env.int("IMAGE_VARIANT_WORKERS", default=2)
+# False renders them in the request's on_commit instead (tests, one-off scripts)
+IMAGE_VARIANTS_ASYNC = env.bool("IMAGE_VARIANTS_ASYNC", default=True)
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -148,16 +170,88 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 INTERNAL_IPS = ['127.0.0.1']
 LOGIN_REDIRECT_URL = 'classification_list'
 
+# --- METRICS (quiz/metrics.py, scraped at /metrics) ---
+# Shared by every worker on the host; a tmpfs path keeps the flushes off disk
+METRICS_DIR = env("METRICS_DIR", default=os.path.join(tempfile.gettempdir(), "dentest-metrics"))
+METRICS_FLUSH_SECONDS = env.float("METRICS_FLUSH_SECONDS", default=1.0)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")  # Bearer token for the Prometheus scraper
+
+# --- SLOW QUERY LOG (quiz/slow_queries.py, staff view at /api/slow-queries/) ---
+SLOW_QUERY_LOG = env.bool("SLOW_QUERY_LOG", default=False)
+SLOW_QUERY_MS = env.int("SLOW_QUERY_MS", default=100)
+SLOW_QUERY_REPEAT = env.int("SLOW_QUERY_REPEAT", default=10)  # same fingerprint this often in one request → N+1
+SLOW_QUERY_BUFFER = env.int("SLOW_QUERY_BUFFER", default=200)
+
+# --- REQUEST PROFILES (quiz/profiling.py, tokens from POST /api/profiles/token/) ---
+PROFILE_DIR = env("PROFILE_DIR", default=os.path.join(BASE_DIR, "profiles"))
+PROFILE_INTERVAL_MS = env.float("PROFILE_INTERVAL_MS", default=5.0)
+PROFILE_MAX_SECONDS = env.int("PROFILE_MAX_SECONDS", default=30)
+PROFILE_TOKEN_MAX_AGE = env.int("PROFILE_TOKEN_MAX_AGE", default=3600)
+PROFILE_KEEP = env.int("PROFILE_KEEP", default=100)
+
+# --- WORKER MEMORY (quiz/memory.py, staff views under /api/memory/) ---
+MEMORY_TRACE = env.bool("MEMORY_TRACE", default=False)  # tracemalloc from boot; otherwise on demand
+MEMORY_TRACE_FRAMES = env.int("MEMORY_TRACE_FRAMES", default=10)
+MEMORY_MAX_RSS_MB = env.int("MEMORY_MAX_RSS_MB", default=0)  # 0 = never recycle on memory
+
+# --- REQUEST BUDGETS (quiz/budgets.py) ---
+# Per URL name, merged over the default; every api/ view gets at least the default. None or 0 = no limit
+REQUEST_BUDGET_DEFAULT = {
+    "queries": env.int("REQUEST_BUDGET_QUERIES", default=50),
+    "timeout_ms": env.int("REQUEST_BUDGET_TIMEOUT_MS", default=5000),  # Postgres statement_timeout
+}
+REQUEST_BUDGETS = {
+    "custom-quiz": {"queries": 5, "timeout_ms": 2000},
+    "question-search": {"timeout_ms": 2000},
+    "user-progress": {"timeout_ms": 2000},
+    "percentile": {"timeout_ms": 2000},
+}
+CUSTOM_QUIZ_MAX_LIMIT = env.int("CUSTOM_QUIZ_MAX_LIMIT", default=100)  # the builder's slider stops at 100
+CUSTOM_QUIZ_MAX_SUBJECTS = env.int("CUSTOM_QUIZ_MAX_SUBJECTS", default=100)
+
 # --- LOGGING ---
+# Handlers only enqueue; a listener thread per process formats and writes (myproject/core/log_handlers.py)
+REQUEST_LOG_SLOW_MS = env.int("REQUEST_LOG_SLOW_MS", default=1000)
+# {pid}: one file per worker, so size/time rotation never races another process
+REQUEST_LOG_FILE = env("REQUEST_LOG_FILE", default=os.path.join(BASE_DIR, "logs", "requests.{pid}.log"))
+REQUEST_LOG_ROTATE_WHEN = env("REQUEST_LOG_ROTATE_WHEN", default="")  # e.g. "midnight"; empty → rotate by size
+REQUEST_LOG_BACKUPS = env.int("REQUEST_LOG_BACKUPS", default=10)
+
+if REQUEST_LOG_ROTATE_WHEN:
+    REQUEST_LOG_HANDLER = {
+        'target': 'logging.handlers.TimedRotatingFileHandler',
+        'when': REQUEST_LOG_ROTATE_WHEN,
+        'utc': True,
+    }
+else:
+    REQUEST_LOG_HANDLER = {
+        'target': 'logging.handlers.RotatingFileHandler',
+        'maxBytes': env.int("REQUEST_LOG_MAX_MB", default=50) * 1024 * 1024,
+    }
+REQUEST_LOG_HANDLER.update({
+    'class': 'myproject.core.log_handlers.QueueingHandler',
+    'filename': REQUEST_LOG_FILE,
+    'backupCount': REQUEST_LOG_BACKUPS,
+    'encoding': 'utf-8',
+    'formatter': 'json',
+})
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'quiz.request_log.JsonFormatter'},
+    },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'class': 'myproject.core.log_handlers.QueueingHandler',
+            'target': 'logging.handlers.RotatingFileHandler',
             'filename': os.path.join(BASE_DIR, 'debug.log'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 3,
         },
+        'requests': REQUEST_LOG_HANDLER,
     },
     'loggers': {
         'django': {
@@ -165,6 +259,26 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'quiz.requests': {
+            'handlers': ['requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'quiz.slow_queries': {
+            'handlers': ['requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'quiz.memory': {
+            'handlers': ['requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'quiz.budgets': {
+            'handlers': ['requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
@@ -245,6 +359,6 @@ if SENTRY_DSN:
         dsn=SENTRY_DSN,
         integrations=[DjangoIntegration()],
         send_default_pii=True,       # Include user/IP info for better context
-        traces_sample_rate=1.0,      # Capture performance data (safe to lower later)
+        traces_sample_rate=env.float("SENTRY_TRACES_SAMPLE_RATE", default=1.0),  # settings_production lowers this
         environment="production" if not DEBUG else "development",
     )
\ No newline at end of file
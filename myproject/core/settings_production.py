@@ -0,0 +1,100 @@
+"""
+Production profile: only what serving /api/ needs.
+
+    DJANGO_SETTINGS_MODULE=myproject.core.settings_production
+
+Differences from settings.py:
+  * DEBUG defaults to False and debug_toolbar (app, middleware, URLs) is not loaded.
+  * The admin, messages and their middleware are only loaded with SERVE_ADMIN=True,
+    e.g. on a separate admin instance.
+  * SERVE_STATIC=False drops WhiteNoise, which is sync-only: the ASGI profile
+    (gunicorn_asgi.py) sets it so no request is adapted to sync, and leaves
+    static files to a WSGI instance or the CDN.
+  * Logs go to stderr at WARNING through a queue, so request threads never block
+    on log I/O; there is no debug.log file. Structured request lines
+    (quiz/request_log.py) go to stdout, or to rotating files with REQUEST_LOG_FILE.
+  * Sentry traces are sampled at SENTRY_TRACES_SAMPLE_RATE (default 0.05).
+
+Everything else (database, CORS/CSRF, storage, Sentry DSN) comes from settings.py
+and the same environment variables. `manage.py measure_profiles` compares the two.
+"""
+import os
+from pathlib import Path
+
+import environ
+
+# .env and the real environment win over the profile defaults below
+environ.Env.read_env(Path(__file__).resolve().parent.parent / ".env")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("SENTRY_TRACES_SAMPLE_RATE", "0.05")
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REQUEST_LOG_HANDLER, TEMPLATES, env  # noqa: E402
+
+SERVE_ADMIN = env.bool("SERVE_ADMIN", default=False)
+SERVE_STATIC = env.bool("SERVE_STATIC", default=True)
+
+DEBUG_ONLY_APPS = {"debug_toolbar"}
+ADMIN_APPS = {"django.contrib.admin", "django.contrib.messages"}
+DEBUG_ONLY_MIDDLEWARE = {"debug_toolbar.middleware.DebugToolbarMiddleware"}
+ADMIN_MIDDLEWARE = {"django.contrib.messages.middleware.MessageMiddleware"}
+STATIC_MIDDLEWARE = {"whitenoise.middleware.WhiteNoiseMiddleware"}
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in DEBUG_ONLY_APPS and (SERVE_ADMIN or app not in ADMIN_APPS)
+]
+MIDDLEWARE = [
+    mw for mw in MIDDLEWARE
+    if mw not in DEBUG_ONLY_MIDDLEWARE
+    and (SERVE_ADMIN or mw not in ADMIN_MIDDLEWARE)
+    and (SERVE_STATIC or mw not in STATIC_MIDDLEWARE)
+]
+
+if not SERVE_ADMIN:
+    TEMPLATES = [
+        {
+            **backend,
+            "OPTIONS": {
+                **backend["OPTIONS"],
+                "context_processors": [
+                    cp for cp in backend["OPTIONS"]["context_processors"]
+                    if cp != "django.contrib.messages.context_processors.messages"
+                ],
+            },
+        }
+        for backend in TEMPLATES
+    ]
+
+# --- LOGGING ---
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+        "json": {"()": "quiz.request_log.JsonFormatter"},
+    },
+    "handlers": {
+        "console": {
+            "level": "WARNING",
+            "class": "myproject.core.log_handlers.QueueingHandler",
+            "target": "logging.StreamHandler",
+            "formatter": "plain",
+        },
+        # JSON request lines on stdout for the platform's log drain, or rotating files with REQUEST_LOG_FILE
+        "requests": REQUEST_LOG_HANDLER if os.environ.get("REQUEST_LOG_FILE") else {
+            "class": "myproject.core.log_handlers.QueueingHandler",
+            "target": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "json",
+        },
+    },
+    "root": {"handlers": ["console"], "level": "WARNING"},
+    "loggers": {
+        "django": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+        "quiz.requests": {"handlers": ["requests"], "level": "INFO", "propagate": False},
+        "quiz.slow_queries": {"handlers": ["requests"], "level": "WARNING", "propagate": False},
+        "quiz.memory": {"handlers": ["requests"], "level": "WARNING", "propagate": False},
+        "quiz.budgets": {"handlers": ["requests"], "level": "WARNING", "propagate": False},
+    },
+}
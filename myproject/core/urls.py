@@ -14,21 +14,26 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.conf import settings
-from django.conf.urls.static import static
-from django.contrib import admin
-from django.urls import path, include
+from django.apps import apps
+from django.urls import path, include, re_path
+from quiz.views_api import metrics_endpoint
+from quiz.views_media import serve_media
 from . import views
 
 
 urlpatterns = [
     path('api/', include('quiz.api_urls')),
-    path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('contact/', views.contact, name='contact'),
     path('accounts/', include('django.contrib.auth.urls')),  # Add this line
-    path('__debug__/', include('debug_toolbar.urls')),
+    # Media in every environment: ETag / Range / immutable caching for content-addressed files
+    re_path(r'^media/(?P<path>.+)$', serve_media, name='media'),
+    path('metrics', metrics_endpoint, name='metrics'),
 ]
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
+
+# settings_production leaves these apps out
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
+if apps.is_installed('debug_toolbar'):
+    urlpatterns.append(path('__debug__/', include('debug_toolbar.urls')))
@@ -1,5 +1,14 @@
-from django.contrib import admin
+import json
+
+from django.contrib import admin, messages
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import Substr
+from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import (
     Section,
     Subject,
@@ -10,7 +19,63 @@ from .models import (
     CustomQuiz,
     CustomQuizQuestion,
     UserQuestionStatus,
+    DeletedQuestion,
 )
+from .forms import QuestionActionForm
+from .search import full_text_filter
+
+BULK_BATCH_SIZE = 1000
+
+QUESTION_HEAVY_FIELDS = (
+    "text", "explanation", "option1", "option2", "option3", "option4",
+    "search_vector", "image_variants",
+)
+
+# ════════════════════════════════════════════════════════════════════════
+# PAGINATION FOR HUGE TABLES
+# ════════════════════════════════════════════════════════════════════════
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Avoids exact COUNT(*) over multi-million-row tables on Postgres:
+    unfiltered lists use pg_class.reltuples, filtered ones the planner's
+    row estimate. Small results (< EXACT_BELOW) are still counted exactly.
+    """
+    EXACT_BELOW = 50_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if connection.vendor != "postgresql" or not hasattr(qs, "query"):
+            return super().count
+        if not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            plan = json.loads(qs.order_by().explain(format="json"))
+            estimate = plan[0]["Plan"]["Plan Rows"]
+        if estimate < self.EXACT_BELOW:
+            return super().count
+        return int(estimate)
+
+
+class SubjectListFilter(admin.RelatedFieldListFilter):
+    """Subject choices in one query (Subject.__str__ needs its section)."""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or Subject._meta.ordering
+        return [(s.pk, str(s)) for s in Subject.objects.select_related("section").order_by(*ordering)]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # skip the second unfiltered COUNT(*)
+
 
 # ════════════════════════════════════════════════════════════════════════
 # INLINE MODELS
@@ -26,6 +91,7 @@ class QuestionImageInline(admin.TabularInline):
 class CustomQuizQuestionInline(admin.TabularInline):
     model = CustomQuizQuestion
     extra = 0
+    autocomplete_fields = ("question",)
     verbose_name_plural = "Included Questions"
 
 
@@ -46,6 +112,7 @@ class SectionAdmin(admin.ModelAdmin):
 class SubjectAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "section", "exam_type_display")
     list_filter = ("section__exam_type", "section")
+    list_select_related = ("section",)
     search_fields = ("name",)
     ordering = ("section", "id")
     list_per_page = 25
@@ -56,13 +123,17 @@ class SubjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(LargeTableAdmin):
     list_display = ("id", "short_text", "subject", "correct_option", "has_explanation")
-    list_filter = ("subject__section__exam_type", "subject__section", "subject")
+    list_filter = ("subject__section__exam_type", "subject__section", ("subject", SubjectListFilter))
+    list_select_related = ("subject__section",)  # Subject.__str__ walks to section
+    autocomplete_fields = ("subject",)
     search_fields = ("text",)
     ordering = ("subject__section__name", "subject__name", "id")
     inlines = [QuestionImageInline]
     list_per_page = 20
+    action_form = QuestionActionForm
+    actions = ["move_to_subject", "set_correct_option", "delete_in_batches"]
 
     def short_text(self, obj):
         return (obj.text[:80] + "...") if len(obj.text) > 80 else obj.text
@@ -73,47 +144,173 @@ class QuestionAdmin(admin.ModelAdmin):
     has_explanation.boolean = True
     has_explanation.short_description = "Explanation?"
 
+    # ───────── Bulk actions: set-based, batched, no per-row signals ─────────
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Default action loads every object and renders them all on a confirmation page
+        actions.pop("delete_selected", None)
+        return actions
+
+    def _action_input(self, request, name):
+        field = self.action_form.base_fields[name]
+        try:
+            return field.clean(field.widget.value_from_datadict(request.POST, {}, name))
+        except ValidationError:
+            return None
+
+    @staticmethod
+    def _batches(ids):
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            yield ids[start:start + BULK_BATCH_SIZE]
+
+    @admin.action(description="Move selected questions to subject…")
+    def move_to_subject(self, request, queryset):
+        target = self._action_input(request, "target_subject")
+        if target is None:
+            self.message_user(request, "Pick a subject in “Move to” first.", messages.ERROR)
+            return
+
+        # uq_subject_normtext: a moved question can't share normalized text with one already in the target
+        taken = set(Question.objects.filter(subject=target).values_list("normalized_text_key", flat=True))
+        movable, conflicts = [], []
+        rows = queryset.exclude(subject=target).values_list("id", "normalized_text_key", "subject_id")
+        for qid, key, old_subject in rows.iterator():
+            if key in taken:
+                conflicts.append(qid)
+            else:
+                taken.add(key)
+                movable.append((qid, old_subject))
+
+        for batch in self._batches(movable):
+            with transaction.atomic():
+                Question.objects.filter(pk__in=[qid for qid, _ in batch]).update(
+                    subject=target, updated_at=timezone.now()
+                )
+                # Statuses carry a copy of the subject (per-subject progress reads it)
+                UserQuestionStatus.objects.filter(question_id__in=[qid for qid, _ in batch]).update(subject=target)
+                # Old subject's sync clients see the move as a deletion
+                DeletedQuestion.objects.bulk_create(
+                    [DeletedQuestion(question_id=qid, subject_id=old) for qid, old in batch]
+                )
+
+        self.message_user(request, f"Moved {len(movable)} question(s) to {target}.", messages.SUCCESS)
+        if conflicts:
+            shown = ", ".join(map(str, conflicts[:20])) + (" …" if len(conflicts) > 20 else "")
+            self.message_user(
+                request,
+                f"Skipped {len(conflicts)} question(s) whose text already exists in {target}: {shown}",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Set correct option of selected questions…")
+    def set_correct_option(self, request, queryset):
+        option = self._action_input(request, "correct_option")
+        if not option:
+            self.message_user(request, "Pick an option in “Correct option” first.", messages.ERROR)
+            return
+
+        ids = list(queryset.exclude(correct_option=option).values_list("id", flat=True))
+        for batch in self._batches(ids):
+            with transaction.atomic():
+                Question.objects.filter(pk__in=batch).update(correct_option=option, updated_at=timezone.now())
+                # Re-key latest answers so progress reflects the corrected key
+                UserQuestionStatus.rekey(batch, option)
+        self.message_user(request, f"Updated the correct option of {len(ids)} question(s).", messages.SUCCESS)
+
+    @admin.action(description="Delete selected questions (batched)")
+    def delete_in_batches(self, request, queryset):
+        if not self._action_input(request, "confirm_delete"):
+            self.message_user(request, "Tick “Confirm delete” to delete questions.", messages.ERROR)
+            return
+
+        ids = list(queryset.values_list("id", flat=True))
+        for batch in self._batches(ids):
+            with transaction.atomic():
+                # QuestionQuerySet.delete writes the batch's tombstones in one INSERT
+                Question.objects.filter(pk__in=batch).only("pk").delete()
+        self.message_user(request, f"Deleted {len(ids)} question(s).", messages.SUCCESS)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Postgres: use the GIN-indexed tsvector instead of ILIKE '%…%' over every row
+        if search_term and connection.vendor == "postgresql":
+            return full_text_filter(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 @admin.register(PatientChartData)
-class PatientChartDataAdmin(admin.ModelAdmin):
-    list_display = ("id", "question", "chief_complaint")
+class PatientChartDataAdmin(LargeTableAdmin):
+    list_display = ("id", "question_preview", "chief_complaint")
     search_fields = ("question__text", "chief_complaint")
+    autocomplete_fields = ("question",)
     ordering = ("-id",)
     list_per_page = 25
 
+    list_select_related = ("question",)  # __str__ shows the question text
+
+    def question_preview(self, obj):
+        text = obj.question.text
+        return (text[:80] + "...") if len(text) > 80 else text
+    question_preview.short_description = "Question"
+
 
 # ════════════════════════════════════════════════════════════════════════
 # QUIZZES AND ATTEMPTS
 # ════════════════════════════════════════════════════════════════════════
 
 @admin.register(CustomQuiz)
-class CustomQuizAdmin(admin.ModelAdmin):
+class CustomQuizAdmin(LargeTableAdmin):
     list_display = ("id", "title", "user", "created_at", "num_questions")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("title", "user__username")
     ordering = ("-created_at",)
     inlines = [CustomQuizQuestionInline]
     list_per_page = 25
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            question_count=Count("customquizquestion")
+        )
+
     def num_questions(self, obj):
-        return obj.customquizquestion_set.count()
+        return obj.question_count
     num_questions.short_description = "Questions"
+    num_questions.admin_order_field = "question_count"
 
 
 @admin.register(QuizAttempt)
-class QuizAttemptAdmin(admin.ModelAdmin):
+class QuizAttemptAdmin(LargeTableAdmin):
     list_display = ("id", "user", "subject", "score")
+    list_select_related = ("user", "subject__section")
+    autocomplete_fields = ("user", "subject")
     search_fields = ("user__username",)
     ordering = ("-id",)
     list_per_page = 25
 
 
 @admin.register(UserQuestionStatus)
-class UserQuestionStatusAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "question", "status_display")
+class UserQuestionStatusAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "question_label", "status_display")
+    list_select_related = ("user", "question")  # __str__ (row checkbox label) uses question_id
+    autocomplete_fields = ("user", "question")
     search_fields = ("user__username", "question__text")
     ordering = ("-id",)
     list_per_page = 25
 
+    def get_queryset(self, request):
+        # Question.__str__ is the full text; join only its code + a short prefix
+        return (
+            super().get_queryset(request)
+            .defer(*(f"question__{f}" for f in QUESTION_HEAVY_FIELDS))
+            .annotate(question_preview=Substr("question__text", 1, 60))
+        )
+
+    def question_label(self, obj):
+        prefix = f"[{obj.question.question_id}] " if obj.question.question_id else ""
+        return f"{prefix}{obj.question_preview}"
+    question_label.short_description = "Question"
+
     def status_display(self, obj):
         if obj.last_was_correct is True:
             return "✅ Correct"
@@ -135,7 +332,7 @@ except admin.sites.NotRegistered:
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = ("id", "username", "email", "is_active", "date_joined")
     list_filter = ("is_active", "date_joined")
     search_fields = ("username", "email")
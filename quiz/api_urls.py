@@ -1,4 +1,5 @@
 from django.urls import path
+from . import views_async
 from .views_api import (
     SectionList,
     SubjectListBySection,
@@ -14,6 +15,20 @@ from .views_api import (
     CurrentUserView,
     SignupView,
     UserQuestionStatusAllView,
+    PercentileView,
+    QuestionSearchView,
+    RelatedQuestionsView,
+    QuestionExportView,
+    QuestionSyncView,
+    StatusSyncView,
+    CatalogManifestView,
+    SlowQueryLogView,
+    ProfileTokenView,
+    ProfileListView,
+    ProfileDownloadView,
+    MemoryStatusView,
+    MemorySnapshotView,
+    MemoryDiffView,
 )
 
 urlpatterns = [
@@ -31,4 +46,23 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(), name="logout"),
     path("signup/", SignupView.as_view(), name="signup"),
     path("user-question-status/all/", UserQuestionStatusAllView.as_view(), name="user_question_status_all"),
+    path("percentile/", PercentileView.as_view(), name="percentile"),
+    path("search/", QuestionSearchView.as_view(), name="question-search"),
+    path("questions/<int:question_id>/related/", RelatedQuestionsView.as_view(), name="related-questions"),
+    path("export/", QuestionExportView.as_view(), name="question-export"),
+    path("sync/questions/", QuestionSyncView.as_view(), name="sync-questions"),
+    path("sync/statuses/", StatusSyncView.as_view(), name="sync-statuses"),
+    path("catalog/manifest/", CatalogManifestView.as_view(), name="catalog-manifest"),
+    path("slow-queries/", SlowQueryLogView.as_view(), name="slow-queries"),
+    path("profiles/", ProfileListView.as_view(), name="profile-list"),
+    path("profiles/token/", ProfileTokenView.as_view(), name="profile-token"),
+    path("profiles/<str:profile_id>/<str:kind>/", ProfileDownloadView.as_view(), name="profile-download"),
+    path("memory/", MemoryStatusView.as_view(), name="memory-status"),
+    path("memory/snapshot/", MemorySnapshotView.as_view(), name="memory-snapshot"),
+    path("memory/diff/", MemoryDiffView.as_view(), name="memory-diff"),
+    # Async twins of the hot read endpoints (native async views, see quiz/views_async.py)
+    path("async/sections/<str:exam_type>/", views_async.section_list, name="async-section-list"),
+    path("async/sections/<int:section_id>/with-subjects/", views_async.section_with_subjects, name="async-section-with-subjects"),
+    path("async/questions/subject/<int:subject_id>/", views_async.questions_by_subject, name="async-questions-by-subject"),
+    path("async/user-progress/", views_async.user_progress, name="async-user-progress"),
 ]
\ No newline at end of file
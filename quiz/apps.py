@@ -8,3 +8,6 @@ class QuizConfig(AppConfig):
     def ready(self):
         # Import the signals to ensure they are registered when the app is ready
         import quiz.signals
+        # Snapshot the static catalog manifest before WhiteNoise indexes STATIC_ROOT
+        from quiz.catalog import load_manifest
+        load_manifest()
@@ -0,0 +1,178 @@
+# quiz/benchmarking.py
+"""
+Closed-loop HTTP load generator shared by the benchmark / load-test commands.
+
+Standard library only (threads + http.client keep-alive connections), so it
+runs anywhere manage.py does. Each client thread sends its next request as
+soon as the previous one returns, which is what a pool of busy users does.
+"""
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    latencies: list = field(default_factory=list)  # seconds, successful (2xx/3xx) requests only
+    errors: int = 0
+    elapsed: float = 0.0
+    statuses: Counter = field(default_factory=Counter)
+    by_label: dict = field(default_factory=dict)  # label → LoadResult, for labelled requests
+
+    @property
+    def requests(self):
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        """Nearest-rank percentile of successful latencies, in milliseconds."""
+        return percentile(sorted(self.latencies), p) * 1000
+
+    def merge(self, other):
+        self.latencies += other.latencies
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+        for label, part in other.by_label.items():
+            self.by_label.setdefault(label, LoadResult()).merge(part)
+
+    def record(self, label, status, latency):
+        for target in (self, self.label(label)) if label else (self,):
+            target.statuses[status] += 1
+            if latency is not None:
+                target.latencies.append(latency)
+            else:
+                target.errors += 1
+
+    def label(self, name):
+        return self.by_label.setdefault(name, LoadResult())
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def _connection(base_url, timeout):
+    parts = urlsplit(base_url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+
+def _prefix(base_url):
+    return urlsplit(base_url).path.rstrip("/")
+
+
+def fetch(base_url, method, path, body=None, headers=None, timeout=30):
+    """One-off request → (status, headers, body bytes)."""
+    conn = _connection(base_url, timeout)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        hdrs = {"Content-Type": "application/json", **(headers or {})} if payload else dict(headers or {})
+        conn.request(method, _prefix(base_url) + path, body=payload, headers=hdrs)
+        response = conn.getresponse()
+        return response.status, response.getheaders(), response.read()
+    finally:
+        conn.close()
+
+
+def login(base_url, username, password, headers=None):
+    """Log in through /api/login/ and return headers that carry the session (and CSRF token)."""
+    status, headers, _ = fetch(base_url, "POST", "/api/login/", {"username": username, "password": password}, headers)
+    if status != 200:
+        raise RuntimeError(f"Login as {username!r} failed with HTTP {status}")
+    cookies = {}
+    for name, value in headers:
+        if name.lower() == "set-cookie":
+            key, _, rest = value.partition("=")
+            cookies[key.strip()] = rest.split(";", 1)[0]
+    session = {"Cookie": "; ".join(f"{k}={v}" for k, v in cookies.items())}
+    if "csrftoken" in cookies:
+        session["X-CSRFToken"] = cookies["csrftoken"]
+    return session
+
+
+def wait_until_up(base_url, path="/api/csrf/", timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if fetch(base_url, "GET", path, timeout=2)[0] < 500:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def run_load(base_url, requests, concurrency, duration, headers=None, timeout=30):
+    """
+    Drive `concurrency` keep-alive clients for `duration` seconds.
+    `requests` is a list of (method, path, json body or None[, label]); each
+    client walks it round-robin from its own offset, so duplicate entries act
+    as weights. Labelled requests are also broken down in `result.by_label`.
+    `headers` is one dict for every client, or a list handed out round-robin
+    (one logged-in user per client).
+    """
+    result = LoadResult()
+    lock = threading.Lock()
+    prefix = _prefix(base_url)
+    deadline = time.perf_counter() + duration
+
+    per_client = headers if isinstance(headers, list) else [headers or {}]
+
+    def client(offset):
+        local = LoadResult()
+        conn = _connection(base_url, timeout)
+        i = offset
+        while time.perf_counter() < deadline:
+            method, path, body, *label = requests[i % len(requests)]
+            label = label[0] if label else None
+            i += 1
+            payload = json.dumps(body).encode() if body is not None else None
+            hdrs = dict(per_client[offset % len(per_client)])
+            if payload is not None:
+                hdrs["Content-Type"] = "application/json"
+            start = time.perf_counter()
+            try:
+                conn.request(method, prefix + path, body=payload, headers=hdrs)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = _connection(base_url, timeout)
+                local.record(label, "error", None)
+                continue
+            local.record(label, status, time.perf_counter() - start if status < 400 else None)
+        conn.close()
+        with lock:
+            result.merge(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result.elapsed = time.perf_counter() - started
+    for part in result.by_label.values():
+        part.elapsed = result.elapsed
+    return result
+
+
+def format_table(header, rows):
+    """Plain-text table: first column left-aligned, the rest right-aligned."""
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+
+    def line(cells):
+        return "  ".join(str(c).rjust(w) if i else str(c).ljust(w) for i, (c, w) in enumerate(zip(cells, widths)))
+
+    return "\n".join([line(header), line(["-" * w for w in widths])] + [line(r) for r in rows])
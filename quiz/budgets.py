@@ -0,0 +1,168 @@
+# quiz/budgets.py
+"""
+Runtime per-request database budgets.
+
+`BudgetMiddleware` gives every API view (and any other URL name listed in
+REQUEST_BUDGETS) two limits, from REQUEST_BUDGETS[url name] merged over
+REQUEST_BUDGET_DEFAULT:
+
+  * "queries": the view may run at most this many statements; the next one
+    raises `QueryBudgetExceeded` instead of reaching the database.
+  * "timeout_ms": on PostgreSQL the view's connection gets this
+    statement_timeout before its first statement (reset when the view
+    returns), so a runaway query is cancelled by the server and the request
+    fails with `StatementTimeout`.
+
+Either ends the request with 503 {"detail": ...} and one "budget_exceeded"
+event on the `quiz.budgets` logger. A limit of None or 0 switches it off.
+
+Budgets cover the view only. The middleware sits after SessionMiddleware and
+AuthenticationMiddleware: a session save on the way out is not counted, since a
+cap tripped there would skip process_exception and reach the client as a 500.
+Streamed bodies (the export) run their queries after the middleware has
+returned and are not limited either.
+"""
+import logging
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger("quiz.budgets")
+
+QUERY_CANCELED = "57014"  # SQLSTATE of a statement cancelled by statement_timeout
+
+
+class BudgetExceeded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class QueryBudgetExceeded(BudgetExceeded):
+    default_code = "query_budget_exceeded"
+
+
+class StatementTimeout(BudgetExceeded):
+    default_code = "statement_timeout"
+
+
+def budget_for(match):
+    """{"queries", "timeout_ms"} for a resolved URL, or None when it has no budget."""
+    budgets = settings.REQUEST_BUDGETS
+    if match.view_name not in budgets and not match.route.startswith("api/"):
+        return None
+    return {**settings.REQUEST_BUDGET_DEFAULT, **budgets.get(match.view_name, {})}
+
+
+def _is_timeout(exc):
+    cause = exc.__cause__
+    return QUERY_CANCELED in (getattr(cause, "pgcode", None), getattr(cause, "sqlstate", None))
+
+
+# ───────── Per-request guard ─────────
+class RequestBudget:
+    """`connection.execute_wrapper` that enforces one request's budget."""
+
+    def __init__(self, request):
+        self.request = request
+        self.budget = None
+        self.count = 0
+        self.timed = set()  # aliases whose statement_timeout was changed
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.budget is None:
+            # Resolved lazily: the URL is matched after the middleware runs, before the view's first query
+            if self.request.resolver_match is None:
+                return execute(sql, params, many, context)
+            self.budget = budget_for(self.request.resolver_match) or {}
+        limit = self.budget.get("queries")
+        self.count += 1
+        if limit and self.count > limit:
+            message = f"This request needed more than {limit} database queries."
+            self.exceeded("queries", limit, message)
+            raise QueryBudgetExceeded(message)
+
+        conn = context["connection"]
+        timeout = self.budget.get("timeout_ms")
+        if timeout and not many and conn.vendor == "postgresql" and conn.alias not in self.timed:
+            self.timed.add(conn.alias)
+            execute(f"SET statement_timeout = {int(timeout)}", None, False, context)
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if conn.alias in self.timed and _is_timeout(exc):
+                message = f"A database query ran longer than {timeout} ms."
+                self.exceeded("timeout_ms", timeout, message)
+                raise StatementTimeout(message) from exc
+            raise
+
+    def exceeded(self, kind, limit, message):
+        match = self.request.resolver_match
+        logger.warning(
+            message,
+            extra={
+                "event": "budget_exceeded",
+                "budget": kind,
+                "limit": limit,
+                "endpoint": match.view_name if match else None,
+                "method": self.request.method,
+                "path": self.request.path,
+                "request_id": getattr(self.request, "request_id", None),
+            },
+        )
+
+    def reset(self):
+        for alias in self.timed:
+            conn = connections[alias]
+            if conn.connection is not None and not conn.needs_rollback:
+                # Straight on the driver connection, so the request's query counters don't see it
+                with conn.connection.cursor() as cursor:
+                    cursor.execute("RESET statement_timeout")
+        self.timed.clear()
+
+
+# ───────── Middleware ─────────
+@contextmanager
+def _wrapped(guard):
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(guard))
+        yield guard
+
+
+class BudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        guard = RequestBudget(request)
+        with _wrapped(guard):
+            try:
+                return self.get_response(request)
+            finally:
+                guard.reset()
+
+    async def __acall__(self, request):
+        guard = RequestBudget(request)
+        with _wrapped(guard):
+            try:
+                return await self.get_response(request)
+            finally:
+                guard.reset()
+
+    @staticmethod
+    def process_exception(request, exception):
+        # DRF views answer BudgetExceeded themselves; this covers plain Django views
+        if isinstance(exception, BudgetExceeded):
+            return JsonResponse({"detail": str(exception.detail)}, status=exception.status_code)
+        return None
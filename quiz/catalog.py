@@ -0,0 +1,141 @@
+# quiz/catalog.py
+"""
+Static export of the public read API (sections, section → subjects, subject →
+questions) as content-hashed JSON under STATIC_ROOT/catalog/, served by
+WhiteNoise like any other static file.
+
+    catalog/manifest.json                       ← what /api/catalog/manifest/ returns
+    catalog/sections-inbde.<12 hex>.json        ← GET /api/sections/inbde/
+    catalog/section-3.<12 hex>.json (+ .gz)     ← GET /api/sections/3/with-subjects/
+    catalog/questions-17.<12 hex>.json (+ .gz)  ← GET /api/questions/subject/17/
+
+Documents match the API responses byte for byte, except that image URLs are
+site-relative (/media/…) because there is no request to build them from.
+
+The frontend (dentest-frontend/src/lib/sync.ts) starts a subject's question
+cache from its file here and asks /api/sync/questions/ only for the changes
+since `published_at`.
+
+WhiteNoise indexes STATIC_ROOT when a worker starts (unless DEBUG), so a
+publish only becomes visible after workers are reloaded. For the same reason
+the manifest is read once per process, at startup, and the previous
+generation of files is kept on disk for workers still serving it.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import Question, Section
+from .serializers import QuestionSerializer, SectionSerializer, SectionWithSubjectsSerializer
+
+CATALOG_DIR = "catalog"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12  # same width as ManifestStaticFilesStorage, so WHITENOISE_IMMUTABLE_FILE_TEST matches both
+GZIP_MIN_BYTES = 512
+
+_manifest = None
+
+
+def catalog_root():
+    return os.path.join(settings.STATIC_ROOT, CATALOG_DIR)
+
+
+def render_documents():
+    """Yield (group, key, stem, data) for every public catalog document."""
+    for exam_type in Section.ExamType.values:
+        sections = Section.objects.filter(exam_type=exam_type)
+        yield "sections", exam_type, f"sections-{exam_type}", SectionSerializer(sections, many=True).data
+
+    for section in Section.objects.prefetch_related("subjects"):
+        yield "sections_with_subjects", str(section.pk), f"section-{section.pk}", SectionWithSubjectsSerializer(section).data
+
+    questions = Question.objects.select_related("subject__section").order_by("subject_id", "id")
+    subject_id, bank = None, []
+    for question in questions.iterator(chunk_size=2000):
+        if question.subject_id != subject_id and bank:
+            yield "questions", str(subject_id), f"questions-{subject_id}", QuestionSerializer(bank, many=True).data
+            bank = []
+        subject_id = question.subject_id
+        bank.append(question)
+    if bank:
+        yield "questions", str(subject_id), f"questions-{subject_id}", QuestionSerializer(bank, many=True).data
+
+
+def _write_atomic(path, content: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(content)
+    os.replace(tmp, path)
+
+
+def write_document(root, stem, data):
+    """Write one hashed JSON file (plus a .gz sibling WhiteNoise can negotiate). Returns (name, written?)."""
+    body = JSONRenderer().render(data)
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}.json"
+    path = os.path.join(root, name)
+    if os.path.exists(path):
+        return name, False  # same content as an earlier publish: keep the file (and browser caches)
+    _write_atomic(path, body)
+    if len(body) >= GZIP_MIN_BYTES:
+        _write_atomic(f"{path}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+    return name, True
+
+
+def read_manifest(root=None):
+    try:
+        with open(os.path.join(root or catalog_root(), MANIFEST_NAME), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def publish(root=None):
+    """Render and write the whole catalog, then swap in a new manifest. Returns (manifest, written, pruned)."""
+    root = root or catalog_root()
+    os.makedirs(root, exist_ok=True)
+    previous = read_manifest(root)
+    # Taken before rendering: clients sync changes since this, so edits made mid-publish aren't lost
+    started = timezone.now()
+
+    files = {}
+    written = 0
+    for group, key, stem, data in render_documents():
+        name, is_new = write_document(root, stem, data)
+        files.setdefault(group, {})[key] = name
+        written += is_new
+
+    manifest = {
+        "version": hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:HASH_LENGTH],
+        "published_at": started.isoformat(),
+        "base_url": f"{settings.STATIC_URL.rstrip('/')}/{CATALOG_DIR}/",
+        **files,
+    }
+    _write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+
+    # Keep this and the previous generation; workers that haven't reloaded still point at it
+    keep = {MANIFEST_NAME} | set(_names(manifest)) | set(_names(previous or {}))
+    pruned = 0
+    for entry in os.scandir(root):
+        if entry.is_file() and entry.name.removesuffix(".gz") not in keep and not entry.name.endswith(".tmp"):
+            os.remove(entry.path)
+            pruned += 1
+    return manifest, written, pruned
+
+
+def _names(manifest):
+    for value in manifest.values():
+        if isinstance(value, dict):
+            yield from value.values()
+
+
+def load_manifest():
+    """Read the manifest as of process start (see module docstring); re-read every call under DEBUG."""
+    global _manifest
+    if _manifest is None or settings.DEBUG:
+        _manifest = read_manifest() or {}
+    return _manifest
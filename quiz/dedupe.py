@@ -0,0 +1,116 @@
+# quiz/dedupe.py
+"""
+Near-duplicate detection with MinHash signatures and an LSH band index.
+
+Each question (text + options) becomes a set of hashed word shingles, then a
+fixed-size MinHash signature whose per-slot agreement estimates Jaccard
+similarity. Signatures are split into bands; only questions sharing a band
+bucket are compared, so the work grows with the number of real candidates
+instead of n².
+"""
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from .models import normalize_for_key
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def question_document(text, *options) -> str:
+    return " ".join(normalize_for_key(part or "") for part in (text, *options))
+
+
+def shingles(doc: str, size: int = 3) -> np.ndarray:
+    """32-bit hashes of the word n-grams in `doc` (whole words if it is shorter)."""
+    words = _WORD_RE.findall(doc)
+    if len(words) < size:
+        grams = words or [doc]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter(
+        {zlib.crc32(g.encode("utf-8")) for g in grams}, dtype=np.uint64
+    )
+
+
+def optimal_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to `threshold`."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class NearDuplicateIndex:
+    """Collects signatures with `add()`, then groups them with `clusters()`."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.keys = []
+        self._signatures = []
+        self._buckets = defaultdict(list)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def signature(self, doc: str) -> np.ndarray:
+        hashed = shingles(doc)
+        # (a·x + b) mod p for every permutation × shingle, then column-wise min
+        permuted = (np.outer(self._a, hashed) + self._b[:, None]) % _PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def add(self, key, doc: str):
+        sig = self.signature(doc)
+        idx = len(self.keys)
+        self.keys.append(key)
+        self._signatures.append(sig)
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows]
+            self._buckets[(band, chunk.tobytes())].append(idx)
+
+    def similarity(self, i: int, j: int) -> float:
+        return float(np.count_nonzero(self._signatures[i] == self._signatures[j])) / self.num_perm
+
+    def clusters(self, ignore_pair=None) -> list[list]:
+        """
+        Connected groups of keys whose estimated similarity ≥ threshold.
+        `ignore_pair(key_a, key_b)` can veto pairs (e.g. a row and the question it updates).
+        """
+        parent = list(range(len(self.keys)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for members in self._buckets.values():
+            if len(members) < 2:
+                continue
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    ri, rj = find(i), find(j)
+                    if ri == rj:
+                        continue
+                    if ignore_pair and ignore_pair(self.keys[i], self.keys[j]):
+                        continue
+                    if self.similarity(i, j) >= self.threshold:
+                        parent[rj] = ri
+
+        groups = defaultdict(list)
+        for idx in range(len(self.keys)):
+            groups[find(idx)].append(self.keys[idx])
+        return [g for g in groups.values() if len(g) > 1]
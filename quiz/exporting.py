@@ -0,0 +1,108 @@
+# quiz/exporting.py
+"""
+Streaming export of the question bank in the sheet format `import_questions`
+reads, as CSV or JSONL, optionally gzip-compressed.
+
+Rows come from a server-side cursor (`QuerySet.iterator`) and are encoded
+one at a time, so memory stays flat for any bank size.
+"""
+import csv
+import json
+import zlib
+
+from .models import Question
+
+EXPORT_COLUMNS = [
+    "text",
+    "option1",
+    "option2",
+    "option3",
+    "option4",
+    "correct_option",
+    "explanation",
+    "subject_id",
+    "question_image",
+    "explanation_image",
+    "images",
+    "patient_details",
+    "chief_complaint",
+    "medical_history",
+    "current_findings",
+]
+CHART_COLUMNS = ("patient_details", "chief_complaint", "medical_history", "current_findings")
+EXPORT_FORMATS = {
+    # format: (content type, file extension)
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+CHUNK_SIZE = 2000
+
+
+def export_queryset(subject_id=None, exam_type=None):
+    qs = (
+        Question.objects.select_related("chart_data")
+        .prefetch_related("images")
+        .defer("search_vector", "image_variants", "normalized_text_key")
+        .order_by("subject_id", "id")
+    )
+    if subject_id:
+        qs = qs.filter(subject_id=subject_id)
+    if exam_type:
+        qs = qs.filter(subject__section__exam_type=exam_type)
+    return qs
+
+
+def export_rows(qs):
+    """One dict per question, keyed by EXPORT_COLUMNS, exactly as the importer expects them."""
+    for q in qs.iterator(chunk_size=CHUNK_SIZE):
+        row = {
+            "text": q.text,
+            "option1": q.option1,
+            "option2": q.option2,
+            "option3": q.option3,
+            "option4": q.option4,
+            "correct_option": (q.correct_option or "").replace("option", ""),
+            "explanation": q.explanation or "",
+            "subject_id": q.subject_id,
+            "question_image": q.question_image.name or "",
+            "explanation_image": q.explanation_image.name or "",
+            "images": ";".join(img.image.name for img in q.images.all()),
+        }
+        chart = getattr(q, "chart_data", None)
+        for col in CHART_COLUMNS:
+            row[col] = (getattr(chart, col, "") or "") if chart else ""
+        yield row
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS).encode("utf-8")
+    for row in rows:
+        yield writer.writerow([row[c] for c in EXPORT_COLUMNS]).encode("utf-8")
+
+
+def jsonl_chunks(rows):
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 → gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_chunks(fmt="csv", gzip=False, subject_id=None, exam_type=None):
+    rows = export_rows(export_queryset(subject_id=subject_id, exam_type=exam_type))
+    chunks = csv_chunks(rows) if fmt == "csv" else jsonl_chunks(rows)
+    return gzip_chunks(chunks) if gzip else chunks
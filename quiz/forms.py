@@ -1,7 +1,8 @@
 # forms.py
 
 from django import forms
-from .models import Subject
+from django.contrib.admin.helpers import ActionForm
+from .models import Question, Subject
 
 FILTER_CHOICES = [
     ('all', 'All Questions'),
@@ -26,3 +27,18 @@ class CustomQuizForm(forms.Form):
         initial='all',
         widget=forms.RadioSelect
     )
+
+
+class QuestionActionForm(ActionForm):
+    """Extra inputs shown next to the admin action dropdown for bulk question edits."""
+    target_subject = forms.ModelChoiceField(
+        queryset=Subject.objects.select_related("section"),
+        required=False,
+        label="Move to",
+    )
+    correct_option = forms.ChoiceField(
+        choices=[("", "---------")] + Question.CORRECT_OPTION_CHOICES,
+        required=False,
+        label="Correct option",
+    )
+    confirm_delete = forms.BooleanField(required=False, label="Confirm delete")
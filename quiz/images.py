@@ -0,0 +1,171 @@
+# quiz/images.py
+"""
+Width-bucketed WebP/JPEG derivatives and blur placeholders for question media.
+
+A variant map is stored per image field on the owning row:
+
+    {"source": "content/ab/cd/abcd….png", "width": 1600, "height": 900,
+     "placeholder": "data:image/jpeg;base64,...",
+     "webp": {"320": "<storage name>", ...},
+     "jpeg": {"320": "<storage name>", ...}}
+
+Maps are (re)built off the request path in a small thread pool whenever an
+image field changes, and in bulk by `manage.py build_image_variants`.
+"""
+import base64
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = {
+    # key: (Pillow format, extension, save options)
+    "webp": ("WEBP", "webp", {"quality": 75, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 80, "optimize": True, "progressive": True}),
+}
+PLACEHOLDER_WIDTH = 16
+
+# model label → image fields that get variants
+IMAGE_FIELDS = {
+    "quiz.question": ("question_image", "explanation_image"),
+    "quiz.questionimage": ("image",),
+}
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix="image-variants",
+        )
+    return _executor
+
+
+def _flatten(img: Image.Image, keep_alpha: bool) -> Image.Image:
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        if keep_alpha:
+            return img
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def build_variants(field_file) -> dict:
+    """Render every derivative of `field_file` into its storage and return the variant map."""
+    storage = field_file.storage
+    with field_file.open("rb") as fh:
+        original = ImageOps.exif_transpose(Image.open(fh))
+        original.load()
+
+    width, height = original.size
+    stem = os.path.splitext(os.path.basename(field_file.name))[0]
+    variants = {
+        "source": field_file.name,
+        "width": width,
+        "height": height,
+    }
+
+    # Every bucket narrower than the original, plus the original width itself
+    widths = [w for w in VARIANT_WIDTHS if w < width] + [width]
+    for key, (fmt, ext, options) in VARIANT_FORMATS.items():
+        base = _flatten(original, keep_alpha=(fmt == "WEBP"))
+        variants[key] = {}
+        for w in widths:
+            h = max(1, round(height * w / width))
+            resized = base if w == width else base.resize((w, h), Image.LANCZOS)
+            buf = BytesIO()
+            resized.save(buf, fmt, **options)
+            name = storage.save(f"variants/{stem}_{w}.{ext}", ContentFile(buf.getvalue()))
+            variants[key][str(w)] = name
+
+    tiny = _flatten(original, keep_alpha=False)
+    tiny = tiny.resize(
+        (PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR
+    ).filter(ImageFilter.GaussianBlur(1))
+    buf = BytesIO()
+    tiny.save(buf, "JPEG", quality=40)
+    variants["placeholder"] = "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
+    return variants
+
+
+def stale_fields(instance) -> list[str]:
+    """Image fields whose stored variant map doesn't describe the current file."""
+    stored = instance.image_variants or {}
+    fields = IMAGE_FIELDS.get(instance._meta.label_lower, ())
+    return [
+        f for f in fields
+        if (getattr(instance, f).name or None) != (stored.get(f) or {}).get("source")
+    ]
+
+
+def refresh_variants(model, pk, fields=None):
+    """Rebuild variant maps for `fields` (default: stale ones) of one row."""
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    fields = fields if fields is not None else stale_fields(instance)
+    if not fields:
+        return
+    variants = dict(instance.image_variants or {})
+    for field in fields:
+        field_file = getattr(instance, field)
+        if not field_file:
+            variants.pop(field, None)
+            continue
+        try:
+            variants[field] = build_variants(field_file)
+        except Exception:
+            logger.exception("Could not build variants for %s %s.%s", model.__name__, pk, field)
+    # .update() so no save() signal fires again
+    extra = {"updated_at": timezone.now()} if model._meta.label_lower == "quiz.question" else {}
+    model.objects.filter(pk=pk).update(image_variants=variants, **extra)
+
+
+def refresh_in_worker(model, pk, fields=None):
+    """`refresh_variants` for pool threads, which must not keep DB connections open."""
+    try:
+        refresh_variants(model, pk, fields)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(instance):
+    """Queue a variant rebuild for `instance` after the current transaction commits."""
+    fields = stale_fields(instance)
+    if not fields:
+        return
+    model, pk = type(instance), instance.pk
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _pool().submit(refresh_in_worker, model, pk, fields))
+    else:
+        transaction.on_commit(lambda: refresh_variants(model, pk, fields))
+
+
+def variant_srcset(variants: dict, url_for) -> dict | None:
+    """API shape: srcset strings per format plus placeholder and intrinsic size."""
+    if not variants:
+        return None
+    out = {
+        "width": variants.get("width"),
+        "height": variants.get("height"),
+        "placeholder": variants.get("placeholder"),
+    }
+    for key in VARIANT_FORMATS:
+        entries = sorted((variants.get(key) or {}).items(), key=lambda kv: int(kv[0]))
+        out[key] = ", ".join(f"{url_for(default_storage.url(name))} {w}w" for w, name in entries)
+    return out
@@ -0,0 +1,42 @@
+# quiz/instrumentation.py
+"""
+Per-request database accounting shared by the request log and metrics middleware.
+
+`track_queries(request)` installs one execute wrapper on every connection for
+the duration of the request and stores the counters on `request.query_stats`.
+Nested callers (several middleware on the same request) reuse the outer one,
+so queries are only wrapped once.
+"""
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.db import connections
+
+
+class QueryStats:
+    """`connection.execute_wrapper` that counts queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+@contextmanager
+def track_queries(request):
+    stats = getattr(request, "query_stats", None)
+    if stats is not None:
+        yield stats
+        return
+    stats = request.query_stats = QueryStats()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(stats))
+        yield stats
@@ -0,0 +1,200 @@
+# quiz/management/commands/audit_query_plans.py
+import json
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from quiz.benchmarking import format_table
+from quiz.models import Question, RelatedQuestion, Subject, UserQuestionStatus
+from quiz.query_plans import MAX_LOOPS, MIN_ROWS, analyze_postgres, analyze_sqlite, postgres_totals
+from quiz.slow_queries import fingerprint
+
+SQL_PREVIEW = 160
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay every API endpoint against the current data as its most active user, capture the "
+        "SELECTs they issue and run each under EXPLAIN (ANALYZE, BUFFERS). Flags sequential scans, "
+        "sorts and hashes spilling to disk, ORDER BY random() and nested-loop blowups, and suggests "
+        "indexes. Everything runs in one transaction that is rolled back. On SQLite it falls back to "
+        "EXPLAIN QUERY PLAN (no timings)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Replay as this user (default: the one with the most statuses)")
+        parser.add_argument("--subject", type=int, help="Subject id to use (default: the user's most answered one)")
+        parser.add_argument("--min-rows", type=int, default=MIN_ROWS, help=f"Rows a scan or random sort must touch to be flagged (default {MIN_ROWS})")
+        parser.add_argument("--max-loops", type=int, default=MAX_LOOPS, help=f"Inner nested-loop executions to flag (default {MAX_LOOPS})")
+        parser.add_argument("--plans-dir", help="Also write each raw plan to this directory as <n>.json")
+        parser.add_argument("--all", action="store_true", help="List queries without findings too")
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor not in ("postgresql", "sqlite"):
+            raise CommandError(f"Plans can only be audited on PostgreSQL (or SQLite for a dry run), not {connection.vendor}.")
+        if connection.vendor == "sqlite":
+            self.stdout.write(self.style.WARNING("⚠️  SQLite: EXPLAIN QUERY PLAN only, no timings or buffers."))
+
+        user, subject = self.pick(kwargs["username"], kwargs["subject"])
+        self.stdout.write(f"🔎 Replaying the API as {user.username} on subject {subject.id} ({subject.name})")
+
+        with transaction.atomic():
+            captured = self.capture(user, subject)
+            audited = [(fp, endpoints, *self.explain(sql, params, kwargs)) for fp, endpoints, sql, params in captured]
+            transaction.set_rollback(True)
+
+        rows, suggestions, flagged = [], [], 0
+        audited.sort(key=lambda item: item[2].get("ms", 0), reverse=True)
+        for n, (fp, endpoints, totals, findings, plan) in enumerate(audited, 1):
+            if kwargs["plans_dir"]:
+                os.makedirs(kwargs["plans_dir"], exist_ok=True)
+                with open(os.path.join(kwargs["plans_dir"], f"{n}.json"), "w") as fh:
+                    json.dump({"endpoints": sorted(endpoints), "sql": fp, "plan": plan}, fh, indent=2, default=str)
+            rows.append([n, ", ".join(sorted(endpoints))[:60], totals.get("ms", "-"), totals.get("rows", "-"),
+                         totals.get("hit", "-"), totals.get("read", "-"), totals.get("temp", "-"), len(findings)])
+            if not findings and not kwargs["all"]:
+                continue
+            flagged += bool(findings)
+            self.stdout.write("")
+            self.stdout.write(f"#{n}  {', '.join(sorted(endpoints))}")
+            self.stdout.write(f"    {fp[:SQL_PREVIEW]}{'…' if len(fp) > SQL_PREVIEW else ''}")
+            for finding in findings:
+                self.stdout.write(self.style.WARNING(f"    ⚠️  {finding.kind}: {finding.node}: {finding.detail}"))
+                if finding.suggestion:
+                    self.stdout.write(f"       → {finding.suggestion}")
+                    if finding.suggestion not in suggestions:
+                        suggestions.append(finding.suggestion)
+
+        self.stdout.write("")
+        self.stdout.write(format_table(["#", "endpoints", "ms", "rows", "hit", "read", "temp", "findings"], rows))
+        if suggestions:
+            self.stdout.write("")
+            self.stdout.write("💡 Suggestions:")
+            for suggestion in suggestions:
+                self.stdout.write(f"   {suggestion}")
+        style = self.style.WARNING if flagged else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{'⚠️' if flagged else '✅'} Audited {len(rows)} distinct queries, {flagged} with findings."
+        ))
+
+    # ───────── Replay ─────────
+    @staticmethod
+    def pick(username, subject_id):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"No user {username!r}.")
+        else:
+            top = UserQuestionStatus.objects.values("user").annotate(n=Count("id")).order_by("-n").first()
+            user = User.objects.get(pk=top["user"]) if top else User.objects.order_by("pk").first()
+        if user is None:
+            raise CommandError("No users to replay as. Run seed_benchmark_data first.")
+
+        if subject_id is None:
+            top = (UserQuestionStatus.objects.filter(user=user).values("subject")
+                   .annotate(n=Count("id")).order_by("-n").first())
+            subject_id = top["subject"] if top else (
+                Question.objects.values("subject").annotate(n=Count("id")).order_by("-n").values_list("subject", flat=True).first()
+            )
+        subject = Subject.objects.select_related("section").filter(pk=subject_id).first()
+        if subject is None:
+            raise CommandError("No subject with questions. Run seed_benchmark_data first.")
+        return user, subject
+
+    @staticmethod
+    def requests(subject):
+        """(label, method, path, JSON body) for every endpoint that reads the database."""
+        question = (
+            RelatedQuestion.objects.filter(question__subject=subject).values("question")
+            .annotate(n=Count("id")).order_by("-n").values_list("question", flat=True).first()
+            or Question.objects.filter(subject=subject).values_list("id", flat=True).first()
+        )
+        text = Question.objects.filter(pk=question).values_list("text", flat=True).first() or ""
+        word = max(re.findall(r"[A-Za-z]{5,}", text) or ["pulpitis"], key=len)
+        since = int((timezone.now() - timedelta(days=1)).timestamp() * 1000)
+        subject_ids = list(Subject.objects.filter(section=subject.section_id).values_list("id", flat=True))
+        section = subject.section
+
+        quizzes = [
+            (f"custom-quiz {filt}", "post", "/api/custom-quiz/", {"subject_ids": subject_ids, "filter": filt, "limit": 20})
+            for filt in ("all", "correct", "incorrect", "unanswered")
+        ]
+        return [
+            ("section-list", "get", f"/api/sections/{section.exam_type}/", None),
+            ("subject-list", "get", f"/api/sections/{section.id}/subjects/", None),
+            ("section-with-subjects", "get", f"/api/sections/{section.id}/with-subjects/", None),
+            ("questions-by-subject", "get", f"/api/questions/subject/{subject.id}/", None),
+            ("related-questions", "get", f"/api/questions/{question}/related/", None),
+            ("question-search", "get", f"/api/search/?q={word}", None),
+            ("question-search subject", "get", f"/api/search/?q={word}&subject_id={subject.id}", None),
+            ("sync-questions", "get", f"/api/sync/questions/?subject_id={subject.id}", None),
+            ("sync-questions since", "get", f"/api/sync/questions/?subject_id={subject.id}&since={since}", None),
+            ("current-user", "get", "/api/current-user/", None),
+            ("update-question-status", "post", "/api/user-question-status/update/", {"question_id": question, "selected": "option1"}),
+            ("user-question-status-by-subject", "get", f"/api/user-question-status/subject/{subject.id}/", None),
+            ("user_question_status_all", "get", "/api/user-question-status/all/", None),
+            ("user-progress", "get", "/api/user-progress/", None),
+            ("percentile", "get", "/api/percentile/", None),
+            *quizzes,
+            ("sync-statuses", "get", "/api/sync/statuses/", None),
+            ("sync-statuses since", "get", f"/api/sync/statuses/?since={since}", None),
+            ("question-export", "get", f"/api/export/?format=jsonl&subject_id={subject.id}", None),
+            ("async-section-list", "get", f"/api/async/sections/{section.exam_type}/", None),
+            ("async-section-with-subjects", "get", f"/api/async/sections/{section.id}/with-subjects/", None),
+            ("async-questions-by-subject", "get", f"/api/async/questions/subject/{subject.id}/", None),
+            ("async-user-progress", "get", "/api/async/user-progress/", None),
+        ]
+
+    def capture(self, user, subject):
+        """(fingerprint, endpoints, sql, params of its first execution) for each distinct SELECT."""
+        seen = {}
+        label = None
+
+        def record(execute, sql, params, many, context):
+            if not many and sql.lstrip()[:6].upper() in ("SELECT", "WITH ") and label:
+                fp = fingerprint(sql)
+                if fp not in seen:
+                    seen[fp] = (set(), (sql, params))
+                seen[fp][0].add(label)
+            return execute(sql, params, many, context)
+
+        # The export is staff-only; the flag is rolled back with everything else
+        User.objects.filter(pk=user.pk).update(is_staff=True)
+        client = Client()
+        client.force_login(User.objects.get(pk=user.pk))
+        # Leave out the repo's instrumentation (metrics, request log, profiler) and the toolbar
+        middleware = [m for m in settings.MIDDLEWARE if not m.startswith(("quiz.", "debug_toolbar."))]
+        with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=["testserver"], SECURE_SSL_REDIRECT=False), \
+                connection.execute_wrapper(record):
+            for label, method, path, data in self.requests(subject):
+                kwargs = {"data": json.dumps(data), "content_type": "application/json"} if data else {}
+                response = getattr(client, method)(path, **kwargs)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                if response.status_code >= 400:
+                    self.stdout.write(self.style.WARNING(f"   {label}: HTTP {response.status_code}"))
+            label = None
+        return [(fp, endpoints, sql, params) for fp, (endpoints, (sql, params)) in seen.items()]
+
+    def explain(self, sql, params, options):
+        """(totals, findings, raw plan) for one statement."""
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                findings = analyze_postgres(connection, plan, options["min_rows"], options["max_loops"])
+                return postgres_totals(plan), findings, plan
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = cursor.fetchall()
+        return {}, analyze_sqlite(connection, sql, plan, options["min_rows"]), plan
@@ -0,0 +1,54 @@
+# quiz/management/commands/backfill_status_subject.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Max, Min, OuterRef, Subquery
+
+from quiz.models import Question, UserQuestionStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy question.subject onto UserQuestionStatus.subject for rows still without one. "
+        "Migration 0016 does this once on deploy; the command is for reruns and repairs. "
+        "Walks the table in primary-key ranges, one short UPDATE per batch, so answers keep "
+        "being written meanwhile. --recheck also repairs rows whose subject no longer matches "
+        "their question."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Primary keys per UPDATE (default 10000)")
+        parser.add_argument("--sleep", type=float, default=0.05, help="Pause between batches in seconds (default 0.05)")
+        parser.add_argument("--recheck", action="store_true", help="Also fix rows whose subject differs from the question's")
+
+    def handle(self, *args, **kwargs):
+        batch, pause = max(kwargs["batch_size"], 1), kwargs["sleep"]
+        bounds = UserQuestionStatus.objects.aggregate(lo=Min("pk"), hi=Max("pk"))
+        if bounds["lo"] is None:
+            self.stdout.write(self.style.SUCCESS("✅ No statuses to backfill."))
+            return
+
+        subject_of_question = Subquery(
+            Question.objects.filter(pk=OuterRef("question_id")).values("subject_id")[:1]
+        )
+        started = time.perf_counter()
+        updated = 0
+        for n, lo in enumerate(range(bounds["lo"], bounds["hi"] + 1, batch), 1):
+            rows = UserQuestionStatus.objects.filter(pk__gte=lo, pk__lt=lo + batch)
+            stale = rows.filter(subject__isnull=True)
+            if kwargs["recheck"]:
+                stale = stale | rows.exclude(subject_id=F("question__subject_id"))
+            # Autocommit: each batch is its own short transaction, nothing is held between batches
+            updated += stale.update(subject_id=subject_of_question)
+            if n % 50 == 0:
+                done = (lo + batch - bounds["lo"]) * 100 / (bounds["hi"] - bounds["lo"] + 1)
+                self.stdout.write(f"   {done:.0f}% (id {lo + batch}), {updated} row(s) updated")
+            if pause:
+                time.sleep(pause)
+
+        missing = UserQuestionStatus.objects.filter(subject__isnull=True).count()
+        style = self.style.SUCCESS if not missing else self.style.WARNING
+        self.stdout.write(style(
+            f"{'✅' if not missing else '⚠️'} Backfilled {updated} status(es) in {time.perf_counter() - started:.1f}s; "
+            f"{missing} still without a subject."
+        ))
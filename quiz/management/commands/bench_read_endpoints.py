@@ -0,0 +1,137 @@
+# quiz/management/commands/bench_read_endpoints.py
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.benchmarking import format_table, login, run_load, wait_until_up
+from quiz.models import Question
+
+REPO_ROOT = settings.BASE_DIR.parent
+ASGI_CONFIG = os.path.join(settings.BASE_DIR, "core", "gunicorn_asgi.py")
+
+# profile → (gunicorn arguments, URL prefix of the endpoints it is measured on, extra environment)
+PROFILES = {
+    "wsgi": (["myproject.core.wsgi:application"], "/api", {}),
+    # As gunicorn_asgi.py's raw_env: WhiteNoise is sync-only
+    "asgi": (["myproject.core.asgi:application", "-c", ASGI_CONFIG], "/api/async", {"SERVE_STATIC": "False"}),
+}
+SERVER_SETTINGS = "myproject.core.settings_production"
+# Production settings redirect plain HTTP; the spawned servers have no proxy in front to say it was HTTPS
+FORWARDED = {"X-Forwarded-Proto": "https"}
+
+# Prints the settings' middleware that can't run natively under ASGI
+SYNC_ONLY_MIDDLEWARE = r"""
+import json
+import django
+django.setup()
+from django.conf import settings
+from django.utils.module_loading import import_string
+print(json.dumps([m for m in settings.MIDDLEWARE if not getattr(import_string(m), "async_capable", False)]))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot read endpoints: the sync DRF views under gunicorn sync workers (WSGI) "
+        "against their async twins under gunicorn + uvicorn workers (ASGI), with the same worker "
+        "count, at several concurrency levels. Reports throughput and p50/p99 latency. Spawned servers "
+        "run the production settings: any sync-only middleware would adapt the whole ASGI stack to sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes per profile (default: cores)")
+        parser.add_argument("--concurrency", default="1,8,32,64", help="Comma-separated client counts (default 1,8,32,64)")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds per measurement (default 10)")
+        parser.add_argument("--port", type=int, default=8101, help="First port for spawned servers (default 8101)")
+        parser.add_argument("--wsgi-url", help="Measure an already running WSGI server instead of spawning one")
+        parser.add_argument("--asgi-url", help="Measure an already running ASGI server instead of spawning one")
+        parser.add_argument("--server-settings", default=SERVER_SETTINGS, help=f"Settings module of spawned servers (default {SERVER_SETTINGS})")
+        parser.add_argument("--username", help="Also measure user-progress as this user")
+        parser.add_argument("--password", help="Password for --username")
+
+    def handle(self, *args, **kwargs):
+        levels = [int(c) for c in kwargs["concurrency"].split(",") if c.strip()]
+        endpoints = self.endpoints(with_user=bool(kwargs["username"]))
+        server_settings = kwargs["server_settings"]
+        if not kwargs["asgi_url"]:
+            sync_only = self.sync_only_middleware(server_settings, PROFILES["asgi"][2])
+            if sync_only:
+                raise CommandError(
+                    f"{server_settings} has middleware without async support ({', '.join(sync_only)}): "
+                    "the ASGI profile would run every request through sync adapters. Pick other --server-settings."
+                )
+        else:
+            self.stdout.write(self.style.WARNING(
+                "⚠️  --asgi-url: make sure that server's MIDDLEWARE is all async-capable, or its numbers are sync ones."
+            ))
+
+        rows = []
+        for offset, (name, (server_args, prefix, extra_env)) in enumerate(PROFILES.items()):
+            base_url = kwargs[f"{name}_url"]
+            process = None
+            if not base_url:
+                base_url = f"http://127.0.0.1:{kwargs['port'] + offset}"
+                process = self.spawn(server_args, base_url, kwargs["workers"], {**extra_env, "DJANGO_SETTINGS_MODULE": server_settings})
+            try:
+                headers = dict(FORWARDED)
+                if kwargs["username"]:
+                    headers.update(login(base_url, kwargs["username"], kwargs["password"], FORWARDED))
+                for label, path in endpoints:
+                    # Warm caches / connections so the first level isn't penalised
+                    run_load(base_url, [("GET", prefix + path, None)], 1, 1, headers=headers)
+                    for level in levels:
+                        result = run_load(base_url, [("GET", prefix + path, None)], level, kwargs["duration"], headers=headers)
+                        rows.append([
+                            name, label, level, f"{result.throughput:.1f}",
+                            f"{result.percentile(50):.1f}", f"{result.percentile(99):.1f}", result.errors,
+                        ])
+                        self.stdout.write(f"   {name} {label} c={level}: {result.throughput:.1f} req/s")
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait(timeout=30)
+
+        self.stdout.write("")
+        self.stdout.write(format_table(["profile", "endpoint", "clients", "req/s", "p50 ms", "p99 ms", "errors"], rows))
+        self.stdout.write(self.style.SUCCESS(f"✅ Benchmarked {len(endpoints)} endpoint(s) with {kwargs['workers']} worker(s) per profile."))
+
+    @staticmethod
+    def endpoints(with_user):
+        first = Question.objects.values("subject_id", "subject__section__exam_type", "subject__section_id").order_by("subject_id").first()
+        if first is None:
+            raise CommandError("No questions to benchmark. Run import_questions first.")
+        endpoints = [
+            ("sections", f"/sections/{first['subject__section__exam_type']}/"),
+            ("with-subjects", f"/sections/{first['subject__section_id']}/with-subjects/"),
+            ("questions-by-subject", f"/questions/subject/{first['subject_id']}/"),
+        ]
+        if with_user:
+            endpoints.append(("user-progress", "/user-progress/"))
+        return endpoints
+
+    @staticmethod
+    def sync_only_middleware(server_settings, extra_env):
+        proc = subprocess.run(
+            [sys.executable, "-c", SYNC_ONLY_MIDDLEWARE], cwd=REPO_ROOT, capture_output=True, text=True,
+            env={**os.environ, **extra_env, "DJANGO_SETTINGS_MODULE": server_settings},
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"Could not load {server_settings}:\n{proc.stderr.strip()[-2000:]}")
+        # Production logs JSON to stdout too; the list is the last line
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def spawn(self, server_args, base_url, workers, server_env):
+        bind = base_url.split("://", 1)[1]
+        cmd = [sys.executable, "-m", "gunicorn", *server_args, "--workers", str(workers), "--bind", bind, "--log-level", "warning"]
+        self.stdout.write(f"🚀 {' '.join(f'{k}={v}' for k, v in server_env.items())} {' '.join(cmd[2:])}")
+        # The servers only listen on 127.0.0.1, which the production ALLOWED_HOSTS doesn't list
+        env = {**os.environ, **server_env, "ALLOWED_HOSTS": "127.0.0.1,localhost"}
+        process = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+        if not wait_until_up(base_url):
+            process.terminate()
+            raise CommandError(f"Server at {base_url} did not come up.")
+        return process
@@ -0,0 +1,44 @@
+# quiz/management/commands/build_image_variants.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from quiz.images import IMAGE_FIELDS, refresh_in_worker
+from quiz.models import Question, QuestionImage
+
+
+class Command(BaseCommand):
+    help = "Backfill resized WebP/JPEG variants and blur placeholders for every question image."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Parallel image workers (default 4)")
+        parser.add_argument("--force", action="store_true", help="Rebuild even if variants are up to date")
+
+    def handle(self, *args, **kwargs):
+        jobs = [
+            (Question, Question.objects.filter(
+                ~Q(question_image="") & Q(question_image__isnull=False)
+                | ~Q(explanation_image="") & Q(explanation_image__isnull=False)
+            )),
+            (QuestionImage, QuestionImage.objects.exclude(image="")),
+        ]
+        workers = max(kwargs["workers"], 1)
+        submitted = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-variants") as pool:
+            pending = set()
+            for model, qs in jobs:
+                fields = list(IMAGE_FIELDS[model._meta.label_lower]) if kwargs["force"] else None
+                for pk in qs.values_list("pk", flat=True).iterator(chunk_size=2000):
+                    # Keep the queue bounded so millions of rows don't sit in memory
+                    if len(pending) >= workers * 4:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(pool.submit(refresh_in_worker, model, pk, fields))
+                    submitted += 1
+            for future in pending:
+                future.result()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Checked {submitted} image row(s) with {workers} worker(s)."))
@@ -0,0 +1,109 @@
+# quiz/management/commands/build_related_questions.py
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min
+
+from quiz.models import Question, RelatedQuestion, Section
+from quiz.related import similarity_rows, tfidf_matrix, top_k
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the top-k most similar questions (TF-IDF over question + explanation "
+        "text, same exam type) for /api/questions/<id>/related/. Incremental by default: "
+        "only questions without neighbours are computed, and existing lists are updated "
+        "when a new question outranks their weakest neighbour. Use --full to rebuild."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=5, help="Neighbours per question (default 5)")
+        parser.add_argument("--min-score", type=float, default=0.1, help="Minimum cosine similarity (default 0.1)")
+        parser.add_argument("--exam-type", choices=Section.ExamType.values, help="Only rebuild this exam type")
+        parser.add_argument("--full", action="store_true", help="Recompute every question, not just new ones")
+
+    def handle(self, *args, **kwargs):
+        exam_types = [kwargs["exam_type"]] if kwargs["exam_type"] else Section.ExamType.values
+        for exam_type in exam_types:
+            computed, refreshed = self.build(exam_type, kwargs["top_k"], kwargs["min_score"], kwargs["full"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ {exam_type.upper()}: computed {computed} question(s), refreshed {refreshed} existing list(s)."
+                )
+            )
+
+    def build(self, exam_type, k, min_score, full):
+        rows = list(
+            Question.objects.filter(subject__section__exam_type=exam_type)
+            .order_by("id")
+            .values_list("id", "text", "explanation")
+        )
+        if len(rows) < 2:
+            return 0, 0
+
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        X = tfidf_matrix([f"{text} {explanation or ''}" for _, text, explanation in rows])
+
+        # Current list size and weakest score for every question that already has neighbours
+        existing = {
+            row["question_id"]: (row["n"], row["floor"])
+            for row in RelatedQuestion.objects.filter(question__subject__section__exam_type=exam_type)
+            .values("question_id")
+            .annotate(n=Count("id"), floor=Min("score"))
+            .order_by()
+        }
+        if full:
+            targets = list(range(len(ids)))
+        else:
+            targets = [pos for pos, qid in enumerate(ids) if int(qid) not in existing]
+        target_set = set(targets)
+
+        fresh = {}                        # question id → [(related id, score)]
+        candidates = defaultdict(list)    # existing question id → [(new related id, score)]
+        for row, cols, vals in similarity_rows(X, targets, min_score):
+            qid = int(ids[row])
+            fresh[qid] = [(int(ids[c]), s) for c, s in top_k(cols, vals, k)]
+            if full:
+                continue
+            # Similarity is symmetric: the new question may belong in older lists too
+            for col, score in zip(cols, vals):
+                if col in target_set:
+                    continue
+                other = int(ids[col])
+                n, floor = existing.get(other, (0, 0.0))
+                if n < k or score > floor:
+                    candidates[other].append((qid, float(score)))
+
+        if candidates:
+            current = defaultdict(list)
+            pending = list(candidates)
+            for start in range(0, len(pending), 1000):
+                for link in RelatedQuestion.objects.filter(
+                    question_id__in=pending[start:start + 1000]
+                ).values_list("question_id", "related_id", "score"):
+                    current[link[0]].append(link[1:])
+            for other, extra in candidates.items():
+                merged = dict(current[other])
+                merged.update(extra)
+                fresh[other] = sorted(merged.items(), key=lambda p: -p[1])[:k]
+
+        self.write(fresh)
+        return len(targets), len(candidates)
+
+    @staticmethod
+    def write(neighbours, batch_size=1000):
+        qids = list(neighbours)
+        for start in range(0, len(qids), batch_size):
+            batch = qids[start:start + batch_size]
+            with transaction.atomic():
+                RelatedQuestion.objects.filter(question_id__in=batch).delete()
+                RelatedQuestion.objects.bulk_create(
+                    [
+                        RelatedQuestion(question_id=qid, related_id=rid, score=round(score, 4))
+                        for qid in batch
+                        for rid, score in neighbours[qid]
+                    ],
+                    batch_size=batch_size,
+                )
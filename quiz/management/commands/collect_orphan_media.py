@@ -0,0 +1,134 @@
+# quiz/management/commands/collect_orphan_media.py
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quiz.images import IMAGE_FIELDS, VARIANT_FORMATS
+from quiz.models import Question, QuestionImage
+
+
+def walk_storage(storage, path=""):
+    """Yield (name, modified datetime) for every file, one directory listing at a time."""
+    if isinstance(storage, FileSystemStorage):
+        root = storage.path(path)
+        if not os.path.isdir(root):
+            return
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = os.path.relpath(entry.path, storage.location).replace(os.sep, "/")
+                        modified = datetime.fromtimestamp(entry.stat().st_mtime, tz=dt_timezone.utc)
+                        yield name, modified
+        return
+
+    dirs, files = storage.listdir(path)
+    for filename in files:
+        name = f"{path}/{filename}" if path else filename
+        yield name, storage.get_modified_time(name)
+    for directory in dirs:
+        yield from walk_storage(storage, f"{path}/{directory}" if path else directory)
+
+
+def referenced_names(ignore_images=None):
+    """
+    Every storage name the database points at: image fields plus their variants.
+    Held as one set, about 175 bytes per name: an image and its up to eight
+    variants cost ~1.6 KB, so 100k images need ~160 MB. Variant names sit inside
+    JSON maps, which can't be matched per batch with an indexed `name__in`.
+    """
+    names = set()
+    querysets = [Question.objects.all(), QuestionImage.objects.all()]
+    if ignore_images is not None:
+        querysets[1] = querysets[1].exclude(pk__in=ignore_images.values("pk"))
+    for qs in querysets:
+        fields = IMAGE_FIELDS[qs.model._meta.label_lower]
+        for row in qs.values_list(*fields, "image_variants").iterator(chunk_size=5000):
+            *files, variants = row
+            names.update(f for f in files if f)
+            for variant in (variants or {}).values():
+                for key in VARIANT_FORMATS:
+                    names.update((variant.get(key) or {}).values())
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete unlinked QuestionImage rows older than a grace period, then media files "
+        "no row references. Storage is walked lazily and deleted in bounded batches; the "
+        "referenced names are held in memory, ~1.6 KB per image with its variants "
+        "(~160 MB per 100k images)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=int, default=24, help="Ignore anything newer than this (default 24)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows / files deleted per batch (default 500)")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+        parser.add_argument("--rows-only", action="store_true", help="Skip the storage walk")
+
+    def handle(self, *args, **kwargs):
+        dry = kwargs["dry_run"]
+        batch_size = max(kwargs["batch_size"], 1)
+        cutoff = timezone.now() - timedelta(hours=kwargs["grace_hours"])
+
+        # ───────── 1. Unlinked QuestionImage rows ─────────
+        stale = QuestionImage.objects.filter(question__isnull=True, uploaded_at__lt=cutoff)
+        if dry:
+            row_count = stale.count()
+        else:
+            row_count = 0
+            while batch := list(stale.values_list("pk", flat=True)[:batch_size]):
+                QuestionImage.objects.filter(pk__in=batch).delete()
+                row_count += len(batch)
+        self.stdout.write(f"{'🔎 Would delete' if dry else '🗑️ Deleted'} {row_count} unlinked QuestionImage row(s).")
+
+        if kwargs["rows_only"]:
+            return
+
+        # ───────── 2. Unreferenced files ─────────
+        # A dry run hasn't deleted the stale rows, so don't let them keep their files alive
+        referenced = referenced_names(ignore_images=stale if dry else None)
+        storage = default_storage
+        scanned = orphaned = freed = 0
+        pending = []
+
+        def flush():
+            nonlocal freed, orphaned
+            for name in pending:
+                try:
+                    # Reused by an upload since the walk (ContentAddressedStorage touches dedupe hits)
+                    if storage.get_modified_time(name) >= cutoff:
+                        orphaned -= 1
+                        continue
+                    freed += storage.size(name)
+                    if not dry:
+                        storage.delete(name)
+                except FileNotFoundError:
+                    pass
+            pending.clear()
+
+        for name, modified in walk_storage(storage):
+            scanned += 1
+            if name in referenced or modified >= cutoff:
+                continue
+            orphaned += 1
+            if dry and orphaned <= 20:
+                self.stdout.write(f"   • {name}")
+            pending.append(name)
+            if len(pending) >= batch_size:
+                flush()
+        flush()
+
+        verb = "🔎 Would delete" if dry else "✅ Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {orphaned} of {scanned} file(s), {freed / 1024 / 1024:.1f} MB "
+                f"({len(referenced)} referenced)."
+            )
+        )
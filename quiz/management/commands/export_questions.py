@@ -0,0 +1,46 @@
+# quiz/management/commands/export_questions.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.exporting import EXPORT_FORMATS, export_chunks
+from quiz.models import Section
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the question bank (with patient chart data and image names) in the "
+        "sheet format import_questions reads. Re-importing the output changes nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv", help="csv (default) or jsonl")
+        parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+        parser.add_argument("-o", "--output", help="File to write (default: stdout)")
+        parser.add_argument("--subject-id", type=int, help="Only this subject")
+        parser.add_argument("--exam-type", choices=Section.ExamType.values, help="Only this exam type")
+
+    def handle(self, *args, **kwargs):
+        if kwargs["gzip"] and not kwargs["output"]:
+            raise CommandError("--gzip needs --output (refusing to write binary to a terminal).")
+
+        chunks = export_chunks(
+            kwargs["format"],
+            gzip=kwargs["gzip"],
+            subject_id=kwargs["subject_id"],
+            exam_type=kwargs["exam_type"],
+        )
+        out = open(kwargs["output"], "wb") if kwargs["output"] else sys.stdout.buffer
+        written = 0
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if kwargs["output"]:
+                out.close()
+            else:
+                out.flush()
+
+        if kwargs["output"]:
+            self.stdout.write(self.style.SUCCESS(f"✅ Exported {written / 1024:.1f} KB to {kwargs['output']}"))
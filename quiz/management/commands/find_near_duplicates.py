@@ -0,0 +1,87 @@
+# quiz/management/commands/find_near_duplicates.py
+import csv
+import time
+
+from django.core.management.base import BaseCommand
+
+from quiz.dedupe import NearDuplicateIndex, question_document
+from quiz.models import Question, normalize_for_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Report clusters of near-duplicate questions (reworded or cross-subject) "
+        "using MinHash + LSH over question text and options. With --csv, acts as an "
+        "import pre-check: only clusters involving rows of that CSV are reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", dest="csv_file", help="CSV about to be imported (pre-check mode)")
+        parser.add_argument("--threshold", type=float, default=0.8, help="Estimated Jaccard similarity (default 0.8)")
+        parser.add_argument("--num-perm", type=int, default=128, help="MinHash signature length (default 128)")
+        parser.add_argument("--exam-type", help="Only index questions of this exam type")
+        parser.add_argument("--subject-id", type=int, help="Only index questions of this subject")
+        parser.add_argument("--max-clusters", type=int, default=200, help="Clusters to print (default 200)")
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        index = NearDuplicateIndex(threshold=kwargs["threshold"], num_perm=kwargs["num_perm"])
+        # key → (subject_id, normalized text, snippet)
+        meta = {}
+
+        # ───────── Bank ─────────
+        qs = Question.objects.all()
+        if kwargs["exam_type"]:
+            qs = qs.filter(subject__section__exam_type=kwargs["exam_type"])
+        if kwargs["subject_id"]:
+            qs = qs.filter(subject_id=kwargs["subject_id"])
+        fields = ("id", "subject_id", "text", "option1", "option2", "option3", "option4")
+        for qid, subject_id, text, *options in qs.values_list(*fields).iterator(chunk_size=2000):
+            key = ("q", qid)
+            index.add(key, question_document(text, *options))
+            meta[key] = (str(subject_id), normalize_for_key(text), text)
+
+        # ───────── Incoming CSV rows ─────────
+        csv_keys = set()
+        if kwargs["csv_file"]:
+            with open(kwargs["csv_file"], newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                reader.fieldnames = [h.strip().lstrip('\ufeff') for h in reader.fieldnames]
+                for line_no, row in enumerate(reader, start=2):
+                    text = (row.get("text") or "").strip()
+                    if not text:
+                        continue
+                    key = ("csv", line_no)
+                    options = [row.get(f"option{i}", "") for i in range(1, 5)]
+                    index.add(key, question_document(text, *options))
+                    meta[key] = ((row.get("subject_id") or "").strip(), normalize_for_key(text), text)
+                    csv_keys.add(key)
+
+        def is_update_of(a, b):
+            # A CSV row matching its own question (same subject + normalized text) is an update, not a duplicate
+            if (a[0] == "csv") == (b[0] == "csv"):
+                return False
+            return meta[a][:2] == meta[b][:2]
+
+        clusters = index.clusters(ignore_pair=is_update_of if csv_keys else None)
+        if csv_keys:
+            clusters = [c for c in clusters if csv_keys.intersection(c)]
+
+        # ───────── Report ─────────
+        clusters.sort(key=len, reverse=True)
+        for n, cluster in enumerate(clusters[: kwargs["max_clusters"]], start=1):
+            self.stdout.write(f"\n🔁 Cluster {n} ({len(cluster)} questions)")
+            for key in sorted(cluster):
+                subject_id, _, text = meta[key]
+                label = f"CSV line {key[1]}" if key[0] == "csv" else f"Question {key[1]}"
+                snippet = (text[:90] + "...") if len(text) > 90 else text
+                self.stdout.write(f"   • {label} [subject {subject_id}]: {snippet}")
+
+        elapsed = time.monotonic() - started
+        style = self.style.WARNING if clusters else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"\n{'⚠️' if clusters else '✅'} {len(clusters)} near-duplicate cluster(s) among "
+                f"{len(index)} questions ({index.bands} bands × {index.rows} rows, {elapsed:.1f}s)."
+            )
+        )
@@ -1,9 +1,18 @@
 # quiz/management/commands/import_questions.py
 from django.core.management.base import BaseCommand
-import csv, os, re, unicodedata
+from django.core.management import call_command
+import csv, gzip, json, os, re, unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from django.core.files import File
+from django.core.files.storage import default_storage
 from django.conf import settings
+from django.utils import timezone
 from quiz.models import Question, QuestionImage, PatientChartData, Subject
+from quiz.storage import content_name, file_digest
+
+IMAGE_COLUMNS = ("question_image", "explanation_image")
+EXTRA_IMAGES_COLUMN = "images"  # several filenames separated by ';' or '|'
+CHART_FIELDS = ("patient_details", "chief_complaint", "medical_history", "current_findings")
 
 
 # ───────── Normalization helpers ─────────
@@ -28,7 +37,7 @@ def find_existing_by_subject_and_text(subject, raw_text):
 
     for q in Question.objects.filter(subject=subject).only("id", "text"):
         if normalize_text(q.text) == target:
-            return q
+            return Question.objects.get(pk=q.pk)
     return None
 
 
@@ -42,89 +51,215 @@ def parse_correct_option(val):
     return {"A": "option1", "B": "option2", "C": "option3", "D": "option4"}.get(s, None)
 
 
+def read_rows(path):
+    """Rows of a CSV or JSONL sheet (as written by export_questions), optionally .gz."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        if path.removesuffix(".gz").endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield {k: "" if v is None else str(v) for k, v in json.loads(line).items()}
+            return
+        reader = csv.DictReader(f)
+        reader.fieldnames = [h.strip().lstrip('\ufeff') for h in reader.fieldnames]
+        yield from reader
+
+
+# ───────── Image ingest helpers ─────────
+def image_cells(row):
+    """Local image filenames named by a CSV row (URLs are left alone)."""
+    names = [(row.get(col) or "").strip() for col in IMAGE_COLUMNS]
+    names += re.split(r"[;|]", row.get(EXTRA_IMAGES_COLUMN) or "")
+    return [n.strip() for n in names if n.strip() and not re.match(r"^https?://", n.strip(), re.I)]
+
+
+def _digest(path):
+    with open(path, "rb") as fh:
+        return file_digest(File(fh))
+
+
+def _upload(path):
+    with open(path, "rb") as fh:
+        return default_storage.save(os.path.basename(path), File(fh))
+
+
+def ingest_media(media_dir, filenames, workers=8, dry=False):
+    """
+    Hash every referenced file in parallel, then upload each distinct content once.
+    Content already in storage (unchanged re-imports, shared diagrams) is never re-sent.
+    Returns ({filename: storage name}, uploaded, reused, missing filenames).
+    """
+    root = os.path.abspath(media_dir)
+    paths, missing = {}, []
+    for name in filenames:
+        path = os.path.abspath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) == root and os.path.isfile(path):
+            paths[name] = path
+        else:
+            missing.append(name)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = dict(zip(paths, pool.map(_digest, paths.values())))
+
+        by_digest = {}
+        for name, digest in digests.items():
+            by_digest.setdefault(digest, paths[name])
+        targets = {
+            digest: content_name(digest, os.path.splitext(path)[1])
+            for digest, path in by_digest.items()
+        }
+        to_upload = [d for d, target in targets.items() if not default_storage.exists(target)]
+        if not dry:
+            for digest, stored in zip(to_upload, pool.map(_upload, [by_digest[d] for d in to_upload])):
+                targets[digest] = stored
+
+    stored = {name: targets[digest] for name, digest in digests.items()}
+    return stored, len(to_upload), len(targets) - len(to_upload), missing
+
+
+def link_images(instance, row, stored):
+    """Point the question's image fields / extra images at ingested files. Returns True if anything changed."""
+    changed = []
+    for field in IMAGE_COLUMNS:
+        name = stored.get((row.get(field) or "").strip())
+        if name and getattr(instance, field).name != name:
+            setattr(instance, field, name)
+            changed.append(field)
+    if changed:
+        instance.save(update_fields=changed + ["updated_at"])
+
+    extras = [stored[n.strip()] for n in re.split(r"[;|]", row.get(EXTRA_IMAGES_COLUMN) or "") if n.strip() in stored]
+    added = 0
+    if extras:
+        have = set(instance.images.values_list("image", flat=True))
+        for name in dict.fromkeys(extras):
+            if name not in have:
+                QuestionImage.objects.create(question=instance, image=name)
+                added += 1
+    return bool(changed or added)
+
+
 # ───────── Command class ─────────
 class Command(BaseCommand):
     help = "Upsert questions from a CSV. Matches by (subject_id + normalized question text). Removes missing ones."
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_file", type=str, help="Path to CSV exported from Google Sheets")
+        parser.add_argument("csv_file", type=str, help="Path to CSV exported from Google Sheets (or an export_questions .csv/.jsonl[.gz])")
         parser.add_argument("--dry-run", action="store_true", help="Preview changes without writing to DB")
+        parser.add_argument(
+            "--check-near-duplicates", action="store_true",
+            help="Report reworded / cross-subject near-duplicates of the CSV rows before importing",
+        )
+        parser.add_argument(
+            "--media-dir",
+            help="Local folder holding the files named in question_image / explanation_image / images columns",
+        )
+        parser.add_argument("--media-workers", type=int, default=8, help="Parallel hash/upload threads (default 8)")
 
     def handle(self, *args, **kwargs):
         csv_file = kwargs["csv_file"]
         dry = kwargs["dry_run"]
 
-        created = updated = skipped = deleted = 0
+        if kwargs["check_near_duplicates"]:
+            call_command("find_near_duplicates", csv=csv_file, stdout=self.stdout)
+
+        created = updated = unchanged = skipped = deleted = 0
         processed_by_subject = {}
 
-        with open(csv_file, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            reader.fieldnames = [h.strip().lstrip('\ufeff') for h in reader.fieldnames]
-
-            for row in reader:
-                raw_text = (row.get("text") or "").strip()
-                if not raw_text:
-                    print(f"⚠️ Skipped (no text): {row}")
-                    skipped += 1
-                    continue
-
-                subject_id = (row.get("subject_id") or "").strip()
-                if not subject_id:
-                    print(f"⚠️ Skipped (no subject_id): {row}")
-                    skipped += 1
-                    continue
-
-                try:
-                    subject = Subject.objects.get(id=subject_id)
-                except Subject.DoesNotExist:
-                    print(f"⚠️ Skipped (invalid subject_id {subject_id}): {row}")
-                    skipped += 1
-                    continue
-
-                if subject_id not in processed_by_subject:
-                    processed_by_subject[subject_id] = set()
-
-                instance = find_existing_by_subject_and_text(subject, raw_text)
-                correct_option = parse_correct_option(row.get("correct_option"))
-
-                if instance is None:
-                    # CREATE
-                    if not dry:
-                        instance = Question.objects.create(
-                            subject=subject,
-                            text=raw_text,
-                            option1=row.get("option1", ""),
-                            option2=row.get("option2", ""),
-                            option3=row.get("option3", ""),
-                            option4=row.get("option4", ""),
-                            correct_option=correct_option,
-                            explanation=row.get("explanation", ""),
-                        )
-                    created += 1
-                else:
-                    # UPDATE
-                    if not dry:
-                        instance.option1 = row.get("option1", "")
-                        instance.option2 = row.get("option2", "")
-                        instance.option3 = row.get("option3", "")
-                        instance.option4 = row.get("option4", "")
-                        instance.correct_option = correct_option
-                        instance.explanation = row.get("explanation", "")
-                        instance.save()
-                    updated += 1
+        # ───────── Media ingest (before any row is written) ─────────
+        stored_media = {}
+        if kwargs["media_dir"]:
+            filenames = sorted({name for row in read_rows(csv_file) for name in image_cells(row)})
+            stored_media, uploaded, reused, missing = ingest_media(
+                kwargs["media_dir"], filenames, workers=max(kwargs["media_workers"], 1), dry=dry
+            )
+            for name in missing:
+                print(f"⚠️ Image not found in media dir: {name}")
+            self.stdout.write(
+                f"🖼️ Images: {len(stored_media)} referenced, {uploaded} uploaded, {reused} already stored, {len(missing)} missing"
+            )
+
+        for row in read_rows(csv_file):
+            raw_text = (row.get("text") or "").strip()
+            if not raw_text:
+                print(f"⚠️ Skipped (no text): {row}")
+                skipped += 1
+                continue
+
+            subject_id = (row.get("subject_id") or "").strip()
+            if not subject_id:
+                print(f"⚠️ Skipped (no subject_id): {row}")
+                skipped += 1
+                continue
+
+            try:
+                subject = Subject.objects.get(id=subject_id)
+            except Subject.DoesNotExist:
+                print(f"⚠️ Skipped (invalid subject_id {subject_id}): {row}")
+                skipped += 1
+                continue
 
-                processed_by_subject[subject_id].add(instance.id)
+            if subject_id not in processed_by_subject:
+                processed_by_subject[subject_id] = set()
 
-                # Optional patient chart data
-                has_chart = any(
-                    [row.get("chief_complaint"), row.get("medical_history"), row.get("current_findings")]
+            instance = find_existing_by_subject_and_text(subject, raw_text)
+            correct_option = parse_correct_option(row.get("correct_option"))
+            values = {
+                "option1": row.get("option1", ""),
+                "option2": row.get("option2", ""),
+                "option3": row.get("option3", ""),
+                "option4": row.get("option4", ""),
+                "correct_option": correct_option,
+                "explanation": row.get("explanation", ""),
+            }
+
+            is_new = instance is None
+            if is_new:
+                # CREATE
+                created += 1
+                if dry:
+                    continue  # nothing to link images or chart data to yet
+                instance = Question.objects.create(subject=subject, text=raw_text, **values)
+                changed = True
+            else:
+                # UPDATE — rows identical to the database aren't written at all
+                changed = [f for f, v in values.items() if (getattr(instance, f) or "") != (v or "")]
+                if changed and not dry:
+                    for f in changed:
+                        setattr(instance, f, values[f])
+                    instance.save()
+                changed = bool(changed)
+
+            processed_by_subject[subject_id].add(instance.id)
+
+            if stored_media and not dry:
+                changed = link_images(instance, row, stored_media) or changed
+
+            # Optional patient chart data
+            has_chart = any(
+                [row.get("chief_complaint"), row.get("medical_history"), row.get("current_findings")]
+            )
+            if has_chart:
+                chart = {f: row.get(f, "") or "" for f in CHART_FIELDS if f in row}
+                pcd = PatientChartData.objects.filter(question=instance).first()
+                chart_changed = pcd is None or any(
+                    (getattr(pcd, f) or "") != v for f, v in chart.items()
                 )
-                if has_chart and not dry:
-                    pcd, _ = PatientChartData.objects.get_or_create(question=instance)
-                    pcd.chief_complaint = row.get("chief_complaint", "") or ""
-                    pcd.medical_history = row.get("medical_history", "") or ""
-                    pcd.current_findings = row.get("current_findings", "") or ""
+                if chart_changed and not dry:
+                    pcd = pcd or PatientChartData(question=instance)
+                    for f, v in chart.items():
+                        setattr(pcd, f, v)
                     pcd.save()
+                    if not is_new:
+                        # Chart-only edits must still reach delta sync, which keys off the question
+                        Question.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+                changed = changed or chart_changed
+
+            if not is_new:
+                if changed:
+                    updated += 1
+                else:
+                    unchanged += 1
 
         # ───────── Deletion phase ─────────
         if not dry:
@@ -139,6 +274,6 @@ class Command(BaseCommand):
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"✅ Done. Created: {created}, Updated: {updated}, Deleted: {deleted}, Skipped: {skipped}"
+                f"✅ Done. Created: {created}, Updated: {updated}, Unchanged: {unchanged}, Deleted: {deleted}, Skipped: {skipped}"
             )
         )
\ No newline at end of file
@@ -0,0 +1,111 @@
+# quiz/management/commands/load_test.py
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.benchmarking import format_table, login, run_load, wait_until_up
+from quiz.management.commands.seed_benchmark_data import DEFAULT_PASSWORD, DEFAULT_PREFIX
+from quiz.models import Question, Subject
+
+ANSWERS_PER_QUIZ = 10
+CYCLES = 200
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server with the real study flow of seeded users: catalog → subject quiz → "
+        "answers → progress/percentile → custom quiz. Each client is logged in as its own "
+        "seed_benchmark_data user. Reports throughput and p50/p95/p99 per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to test (default http://127.0.0.1:8000)")
+        parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients, one user each (default 16)")
+        parser.add_argument("--duration", type=float, default=30, help="Measured seconds (default 30)")
+        parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds first (default 3)")
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help=f"seed_benchmark_data prefix (default {DEFAULT_PREFIX})")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of the seeded users")
+        parser.add_argument("--seed", type=int, default=7, help="Random seed for the request mix (default 7)")
+
+    def handle(self, *args, **kwargs):
+        base_url = kwargs["url"].rstrip("/")
+        if not wait_until_up(base_url, timeout=5):
+            raise CommandError(f"No server at {base_url}. Start one (e.g. gunicorn myproject.core.wsgi:application).")
+
+        usernames = list(
+            User.objects.filter(username__startswith=f"{kwargs['prefix']}_user_")
+            .order_by("username").values_list("username", flat=True)[:kwargs["concurrency"]]
+        )
+        if not usernames:
+            raise CommandError(f"No users with prefix {kwargs['prefix']!r}. Run seed_benchmark_data first.")
+        sessions = [login(base_url, name, kwargs["password"]) for name in usernames]
+        self.stdout.write(f"🔑 Logged in {len(sessions)} user(s)")
+
+        requests = self.flow(random.Random(kwargs["seed"]), kwargs["prefix"])
+        if kwargs["warmup"]:
+            run_load(base_url, requests, kwargs["concurrency"], kwargs["warmup"], headers=sessions)
+        result = run_load(base_url, requests, kwargs["concurrency"], kwargs["duration"], headers=sessions)
+
+        rows = [self.row(label, part) for label, part in sorted(result.by_label.items())]
+        rows.append(self.row("total", result))
+        self.stdout.write("")
+        self.stdout.write(format_table(["endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms"], rows))
+        statuses = ", ".join(f"{k}: {v}" for k, v in sorted(result.statuses.items(), key=str))
+        self.stdout.write(f"   statuses: {statuses}")
+        style = self.style.SUCCESS if not result.errors else self.style.WARNING
+        self.stdout.write(style(
+            f"{'✅' if not result.errors else '⚠️'} {result.requests} requests from {kwargs['concurrency']} "
+            f"client(s) in {result.elapsed:.1f}s, {result.errors} error(s)."
+        ))
+
+    @staticmethod
+    def row(label, part):
+        return [
+            label, part.requests, part.errors, f"{part.throughput:.1f}",
+            f"{part.percentile(50):.1f}", f"{part.percentile(95):.1f}", f"{part.percentile(99):.1f}",
+        ]
+
+    def flow(self, rng, prefix):
+        """
+        CYCLES study sessions laid end to end; clients walk the list from different offsets.
+        Subjects (seeded ones if any) are picked in proportion to their size.
+        """
+        fields = ("id", "section_id", "section__exam_type")
+        subjects = list(
+            Subject.objects.filter(section__name__startswith=f"[{prefix}] ").values(*fields)
+        ) or list(Subject.objects.values(*fields))
+        by_subject = {}
+        for qid, sid, correct in Question.objects.filter(subject__in=[s["id"] for s in subjects]).values_list(
+            "id", "subject_id", "correct_option"
+        ):
+            by_subject.setdefault(sid, []).append((qid, correct))
+        subjects = [s for s in subjects if s["id"] in by_subject]
+        if not subjects:
+            raise CommandError("No questions to quiz on. Run seed_benchmark_data first.")
+        weights = [len(by_subject[s["id"]]) for s in subjects]
+
+        requests = []
+        for _ in range(CYCLES):
+            subject = rng.choices(subjects, weights)[0]
+            requests += [
+                ("GET", f"/api/sections/{subject['section__exam_type']}/", None, "GET sections"),
+                ("GET", f"/api/sections/{subject['section_id']}/with-subjects/", None, "GET with-subjects"),
+                ("GET", f"/api/questions/subject/{subject['id']}/", None, "GET questions-by-subject"),
+                ("GET", f"/api/user-question-status/subject/{subject['id']}/", None, "GET statuses-by-subject"),
+            ]
+            pool = by_subject[subject["id"]]
+            for qid, correct in rng.sample(pool, min(ANSWERS_PER_QUIZ, len(pool))):
+                selected = correct if rng.random() < 0.7 else f"option{rng.randint(1, 4)}"
+                requests.append(("POST", "/api/user-question-status/update/",
+                                 {"question_id": qid, "selected": selected}, "POST answer"))
+            requests += [
+                ("GET", "/api/user-progress/", None, "GET user-progress"),
+                ("GET", "/api/percentile/", None, "GET percentile"),
+                ("POST", "/api/custom-quiz/", {
+                    "subject_ids": [s["id"] for s in rng.sample(subjects, min(3, len(subjects)))],
+                    "filter": rng.choice(["all", "incorrect", "unanswered"]),
+                    "limit": 20,
+                }, "POST custom-quiz"),
+            ]
+        return requests
@@ -0,0 +1,126 @@
+# quiz/management/commands/measure_profiles.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.benchmarking import format_table
+
+REPO_ROOT = settings.BASE_DIR.parent
+
+# Runs in a fresh interpreter per sample, so imports are cold every time.
+# The request goes through the real WSGI handler (routing + every middleware)
+# and, for comparison, straight into the view function.
+CHILD = r"""
+import json, statistics, sys, time
+t0 = time.perf_counter()
+from django.conf import settings
+settings.INSTALLED_APPS
+t1 = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+t2 = time.perf_counter()
+
+from io import BytesIO
+from django.test import RequestFactory
+from quiz.views_api import get_csrf_token
+
+path, count = sys.argv[1], int(sys.argv[2])
+
+def environ():
+    return {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "", "SERVER_NAME": "localhost",
+        "SERVER_PORT": "443", "HTTP_HOST": "localhost", "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "https", "wsgi.input": BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0), "wsgi.multithread": True, "wsgi.multiprocess": True, "wsgi.run_once": False,
+    }
+
+statuses = set()
+def start_response(status, headers, exc_info=None):
+    statuses.add(status.split()[0])
+
+def through_stack():
+    start = time.perf_counter()
+    for _ in application(environ(), start_response):
+        pass
+    return time.perf_counter() - start
+
+factory = RequestFactory(HTTP_HOST="localhost", secure=True)
+def view_only():
+    request = factory.get(path)
+    start = time.perf_counter()
+    get_csrf_token(request)
+    return time.perf_counter() - start
+
+for _ in range(min(200, count)):
+    through_stack(); view_only()
+full = sorted(through_stack() for _ in range(count))
+bare = sorted(view_only() for _ in range(count))
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "boot_ms": (t2 - t0) * 1000,
+    "request_us": statistics.median(full) * 1e6,
+    "request_p99_us": full[int(len(full) * 0.99) - 1] * 1e6,
+    "overhead_us": (statistics.median(full) - statistics.median(bare)) * 1e6,
+    "apps": len(settings.INSTALLED_APPS),
+    "middleware": len(settings.MIDDLEWARE),
+    "statuses": sorted(statuses),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare settings profiles: settings import time, worker boot time (django.setup + "
+        "middleware chain + URLconf) and per-request routing/middleware overhead on /api/csrf/, "
+        "each measured in fresh interpreters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", default="myproject.core.settings,myproject.core.settings_production",
+            help="Comma-separated settings modules (default: the base and production profiles)",
+        )
+        parser.add_argument("--runs", type=int, default=5, help="Fresh processes per profile (default 5)")
+        parser.add_argument("--requests", type=int, default=2000, help="Timed requests per process (default 2000)")
+
+    def handle(self, *args, **kwargs):
+        rows = []
+        for profile in [p.strip() for p in kwargs["profiles"].split(",") if p.strip()]:
+            samples = [self.sample(profile, kwargs["requests"]) for _ in range(max(kwargs["runs"], 1))]
+
+            def med(key):
+                return statistics.median(s[key] for s in samples)
+
+            rows.append([
+                profile, samples[0]["apps"], samples[0]["middleware"],
+                f"{med('import_ms'):.0f}", f"{med('boot_ms'):.0f}",
+                f"{med('request_us'):.0f}", f"{med('request_p99_us'):.0f}", f"{med('overhead_us'):.0f}",
+            ])
+            self.stdout.write(f"   {profile}: HTTP {', '.join(samples[0]['statuses'])}")
+
+        self.stdout.write("")
+        self.stdout.write(format_table(
+            ["profile", "apps", "middleware", "import ms", "boot ms", "request µs", "p99 µs", "overhead µs"], rows
+        ))
+        self.stdout.write(self.style.SUCCESS(f"✅ Medians of {kwargs['runs']} cold process(es) per profile."))
+
+    @staticmethod
+    def sample(profile, requests):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, "/api/csrf/", str(requests)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"{profile} failed:\n{proc.stderr.strip()[-2000:]}")
+        # Request log lines may share stdout with the result (production logs JSON to stdout)
+        return next(
+            json.loads(line) for line in reversed(proc.stdout.strip().splitlines()) if line.startswith('{"import_ms"')
+        )
@@ -0,0 +1,25 @@
+# quiz/management/commands/prune_sync_tombstones.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quiz.models import DeletedQuestion
+from quiz.views_api import SYNC_TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete DeletedQuestion tombstones older than the sync retention window. "
+        "Clients with older tokens already get a full resync, so nothing is lost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows deleted per batch (default 5000)")
+
+    def handle(self, *args, **kwargs):
+        cutoff = timezone.now() - SYNC_TOMBSTONE_RETENTION
+        stale = DeletedQuestion.objects.filter(deleted_at__lt=cutoff)
+        total = 0
+        while batch := list(stale.values_list("pk", flat=True)[: max(kwargs["batch_size"], 1)]):
+            DeletedQuestion.objects.filter(pk__in=batch).delete()
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"✅ Pruned {total} tombstone(s) older than {cutoff:%Y-%m-%d}."))
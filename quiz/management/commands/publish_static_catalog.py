@@ -0,0 +1,24 @@
+# quiz/management/commands/publish_static_catalog.py
+from django.core.management.base import BaseCommand
+
+from quiz.catalog import catalog_root, publish
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the public catalog (sections, subjects, question banks) into content-hashed "
+        "JSON under STATIC_ROOT/catalog/ for WhiteNoise. Run after import_questions, then "
+        "reload the web workers so they index the new files."
+    )
+
+    def handle(self, *args, **kwargs):
+        manifest, written, pruned = publish()
+        counts = ", ".join(
+            f"{len(v)} {k.replace('_', ' ')}" for k, v in manifest.items() if isinstance(v, dict)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Published catalog {manifest['version']} to {catalog_root()} ({counts}); "
+                f"{written} new file(s), {pruned} stale file(s) removed."
+            )
+        )
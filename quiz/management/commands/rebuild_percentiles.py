@@ -0,0 +1,86 @@
+# quiz/management/commands/rebuild_percentiles.py
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from quiz.models import SubjectScoreHistogram, UserQuestionStatus
+
+
+def bucket_indices(corrects, totals, buckets):
+    """Vectorized SubjectScoreHistogram.bucket_for: the lookup must land where the build counted."""
+    return np.clip((corrects * buckets) // np.maximum(totals, 1), 0, buckets - 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild per-subject accuracy histograms used by /api/percentile/. "
+        "One grouped query over UserQuestionStatus, bucketed with NumPy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-answered", type=int, default=5,
+            help="Users with fewer answered questions in a subject are not ranked (default 5)",
+        )
+
+    def handle(self, *args, **kwargs):
+        min_answered = max(kwargs["min_answered"], 1)
+        buckets = SubjectScoreHistogram.BUCKETS
+
+        # ───────── One (subject, user) aggregate row per pair ─────────
+        rows = (
+            UserQuestionStatus.objects
+            .filter(subject__isnull=False)  # NULL subjects have no histogram to land in
+            .values_list("subject_id", "user_id")
+            .annotate(
+                total=Count("id"),
+                correct=Count("id", filter=Q(last_was_correct=True)),
+            )
+            .order_by()
+            .values_list("subject_id", "total", "correct")
+        )
+        data = np.array(list(rows.iterator(chunk_size=10_000)), dtype=np.int64).reshape(-1, 3)
+        subject_ids, totals, corrects = data[:, 0], data[:, 1], data[:, 2]
+
+        # ───────── Vectorized bucketing ─────────
+        ranked = totals >= min_answered
+        subject_ids, totals, corrects = subject_ids[ranked], totals[ranked], corrects[ranked]
+
+        subjects, subject_idx = np.unique(subject_ids, return_inverse=True)
+        bucket = bucket_indices(corrects, totals, buckets)
+        counts = np.bincount(
+            subject_idx * buckets + bucket, minlength=len(subjects) * buckets
+        ).reshape(len(subjects), buckets)
+        cumulative = np.zeros((len(subjects), buckets + 1), dtype=np.int64)
+        np.cumsum(counts, axis=1, out=cumulative[:, 1:])
+
+        # ───────── Store ─────────
+        now = timezone.now()
+        histograms = [
+            SubjectScoreHistogram(
+                subject_id=int(sid),
+                cumulative_counts=cumulative[i].tolist(),
+                total_users=int(cumulative[i, -1]),
+                min_answered=min_answered,
+                built_at=now,
+            )
+            for i, sid in enumerate(subjects)
+        ]
+        with transaction.atomic():
+            SubjectScoreHistogram.objects.exclude(
+                subject_id__in=[h.subject_id for h in histograms]
+            ).delete()
+            SubjectScoreHistogram.objects.bulk_create(
+                histograms,
+                update_conflicts=True,
+                unique_fields=["subject"],
+                update_fields=["cumulative_counts", "total_users", "min_answered", "built_at"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt {len(histograms)} subject histogram(s) from {int(ranked.sum())} ranked user/subject pairs."
+            )
+        )
@@ -0,0 +1,58 @@
+# quiz/management/commands/rehash_media.py
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quiz.images import IMAGE_FIELDS
+from quiz.models import Question, QuestionImage
+from quiz.storage import CONTENT_PREFIX, is_content_addressed
+
+
+class Command(BaseCommand):
+    help = (
+        "Move legacy uploads (question_image/<id>_<name>, …) to content-addressed paths "
+        "so identical files are stored once. Old files are left for collect_orphan_media."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would move without writing")
+
+    def handle(self, *args, **kwargs):
+        dry = kwargs["dry_run"]
+        moved = missing = 0
+        renamed = {}  # legacy name → content-addressed name, so shared files are hashed once
+
+        for model in (Question, QuestionImage):
+            for field in IMAGE_FIELDS[model._meta.label_lower]:
+                rows = (
+                    model.objects.exclude(**{field: ""})
+                    .exclude(**{f"{field}__isnull": True})
+                    .exclude(**{f"{field}__startswith": f"{CONTENT_PREFIX}/"})
+                    .values_list("pk", field)
+                )
+                for pk, name in rows.iterator(chunk_size=1000):
+                    if is_content_addressed(name):
+                        continue
+                    if name not in renamed:
+                        if not default_storage.exists(name):
+                            self.stdout.write(self.style.WARNING(f"⚠️ Missing file for {model.__name__} {pk}: {name}"))
+                            missing += 1
+                            continue
+                        if dry:
+                            renamed[name] = "(content-addressed)"
+                        else:
+                            with default_storage.open(name, "rb") as fh:
+                                renamed[name] = default_storage.save(name, fh)
+                    if not dry:
+                        values = {field: renamed[name]}
+                        if model is Question:
+                            values["updated_at"] = timezone.now()  # image URL changed → delta sync
+                        model.objects.filter(pk=pk).update(**values)
+                    moved += 1
+
+        prefix = "🔎 Would move" if dry else "✅ Moved"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {moved} reference(s) to {len(renamed)} content-addressed file(s). Missing: {missing}"
+            )
+        )
@@ -0,0 +1,232 @@
+# quiz/management/commands/seed_benchmark_data.py
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from quiz.models import (
+    DeletedQuestion,
+    PatientChartData,
+    Question,
+    Section,
+    Subject,
+    UserProfile,
+    UserQuestionStatus,
+)
+
+DEFAULT_PREFIX = "bench"
+DEFAULT_PASSWORD = "bench-pass"
+
+# Vocabulary for stems/options, so search and the text columns have realistic widths
+TOPICS = [
+    "pulpitis", "periodontitis", "gingivitis", "caries", "abscess", "malocclusion", "bruxism",
+    "xerostomia", "leukoplakia", "candidiasis", "osteonecrosis", "pericoronitis", "fluorosis",
+    "amelogenesis", "dentinogenesis", "ankylosis", "resorption", "hypersensitivity", "trismus",
+]
+FINDINGS = [
+    "lingering pain to cold", "percussion tenderness", "a periapical radiolucency", "bleeding on probing",
+    "a widened PDL space", "mobility grade II", "a draining sinus tract", "white plaques that wipe off",
+    "generalized attrition", "a non-vital response to EPT", "furcation involvement", "recession of 3 mm",
+]
+OPTIONS = ["option1", "option2", "option3", "option4"]
+PATIENTS = ["34-year-old male", "58-year-old female", "12-year-old child", "71-year-old male", "26-year-old female"]
+
+
+def zipf_weights(n, s=0.9):
+    """Popularity of the i-th most popular item ∝ 1 / (i + 1)^s."""
+    return [1 / (i + 1) ** s for i in range(n)]
+
+
+def split(total, weights):
+    """Integer shares of `total` proportional to `weights`, each at least 1."""
+    scale = total / sum(weights)
+    shares = [max(1, int(w * scale)) for w in weights]
+    shares[0] += total - sum(shares)
+    return shares
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create a production-shaped dataset for benchmarks: sections, subjects with Zipf-skewed "
+        "sizes, questions (some with patient charts), users with Pareto-skewed activity and their "
+        "UserQuestionStatus rows, biased toward popular subjects and per-user skill. "
+        "Rows are tagged with --prefix so --reset can remove them again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sections", type=int, default=8, help="Sections, split across exam types (default 8)")
+        parser.add_argument("--subjects", type=int, default=80, help="Subjects in total (default 80)")
+        parser.add_argument("--questions", type=int, default=20000, help="Questions in total (default 20000)")
+        parser.add_argument("--users", type=int, default=500, help="Users (default 500)")
+        parser.add_argument("--answers", type=int, default=400, help="Mean answered questions per user (default 400)")
+        parser.add_argument("--chart-ratio", type=float, default=0.15, help="Share of questions with a patient chart (default 0.15)")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help=f"Password of every user (default {DEFAULT_PASSWORD})")
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help=f"Tag for section names and usernames (default {DEFAULT_PREFIX})")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default 42)")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--reset", action="store_true", help="Delete earlier data with this prefix first")
+
+    def handle(self, *args, **kwargs):
+        rng = random.Random(kwargs["seed"])
+        prefix = kwargs["prefix"]
+        self.batch = kwargs["batch_size"]
+        if kwargs["subjects"] < kwargs["sections"] or kwargs["questions"] < kwargs["subjects"]:
+            raise CommandError("Need at least one subject per section and one question per subject.")
+
+        if kwargs["reset"]:
+            self.reset(prefix)
+        elif Section.objects.filter(name__startswith=f"[{prefix}] ").exists():
+            raise CommandError(f"Data with prefix {prefix!r} exists. Use --reset or another --prefix.")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            subjects = self.seed_catalog(rng, prefix, kwargs["sections"], kwargs["subjects"])
+            questions = self.seed_questions(rng, subjects, kwargs["questions"], kwargs["chart_ratio"])
+            users = self.seed_users(prefix, kwargs["users"], kwargs["password"])
+            statuses = self.seed_statuses(rng, users, subjects, questions, kwargs["answers"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {kwargs['sections']} sections, {len(subjects)} subjects, {sum(map(len, questions.values()))} "
+            f"questions, {len(users)} users and {statuses} statuses in {time.perf_counter() - started:.1f}s "
+            f"(users {prefix}_user_00001…, password {kwargs['password']!r})."
+        ))
+
+    def reset(self, prefix):
+        sections = Section.objects.filter(name__startswith=f"[{prefix}] ")
+        subject_ids = list(Subject.objects.filter(section__in=sections).values_list("id", flat=True))
+        # Statuses and charts have no signals, so each goes in one DELETE before the question cascade
+        UserQuestionStatus.objects.filter(question__subject_id__in=subject_ids).delete()
+        PatientChartData.objects.filter(question__subject_id__in=subject_ids).delete()
+        # Questions first: a Question queryset tombstones in one INSERT, a section cascade row by row
+        questions, _ = Question.objects.filter(subject_id__in=subject_ids).delete()
+        deleted, _ = sections.delete()
+        deleted += questions
+        DeletedQuestion.objects.filter(subject_id__in=subject_ids).delete()
+        users, _ = User.objects.filter(username__startswith=f"{prefix}_user_").delete()
+        self.stdout.write(f"🗑️  Removed {deleted} catalog rows and {users} user rows tagged {prefix!r}")
+
+    def seed_catalog(self, rng, prefix, n_sections, n_subjects):
+        exam_types = list(Section.ExamType.values)
+        sections = Section.objects.bulk_create(
+            Section(name=f"[{prefix}] Section {i + 1:02d}", exam_type=exam_types[i % len(exam_types)])
+            for i in range(n_sections)
+        )
+        per_section = split(n_subjects, [rng.uniform(0.5, 1.5) for _ in sections])
+        subjects = Subject.objects.bulk_create(
+            (
+                Subject(section=section, name=f"{rng.choice(TOPICS).title()} {j + 1:02d}", description="")
+                for section, count in zip(sections, per_section)
+                for j in range(count)
+            ),
+            batch_size=self.batch,
+        )
+        self.stdout.write(f"📚 {len(sections)} sections, {len(subjects)} subjects")
+        return subjects
+
+    def seed_questions(self, rng, subjects, n_questions, chart_ratio):
+        # A few big subjects and a long tail of small ones
+        order = list(subjects)
+        rng.shuffle(order)
+        sizes = split(n_questions, zipf_weights(len(order), 0.8))
+        rows = []
+        for subject, size in zip(order, sizes):
+            for k in range(size):
+                topic, finding = rng.choice(TOPICS), rng.choice(FINDINGS)
+                text = (
+                    f"A {rng.choice(PATIENTS)} presents with {finding}. "
+                    f"Which is the most likely diagnosis? ({subject.id}-{k})"
+                )
+                options = rng.sample(TOPICS, 4)
+                if topic not in options:
+                    options[0] = topic
+                rows.append(Question(
+                    subject=subject,
+                    question_id=f"BENCH-{subject.id}-{k:05d}",
+                    text=text,
+                    normalized_text_key=text.lower()[:500],
+                    option1=options[0].title(), option2=options[1].title(),
+                    option3=options[2].title(), option4=options[3].title(),
+                    correct_option=f"option{options.index(topic) + 1}",
+                    explanation=f"{finding.capitalize()} is characteristic of {topic}. " * rng.randint(1, 4),
+                ))
+        created = Question.objects.bulk_create(rows, batch_size=self.batch)
+
+        charts = PatientChartData.objects.bulk_create(
+            (
+                PatientChartData(
+                    question=q,
+                    patient_details=rng.choice(PATIENTS),
+                    chief_complaint=f"Pain for {rng.randint(1, 30)} days",
+                    medical_history=rng.choice(["Non-contributory", "Type 2 diabetes", "Hypertension, on ACE inhibitor"]),
+                    current_findings=rng.choice(FINDINGS),
+                )
+                for q in created if rng.random() < chart_ratio
+            ),
+            batch_size=self.batch,
+        )
+        self.stdout.write(f"❓ {len(created)} questions, {len(charts)} with patient charts")
+
+        by_subject = {}
+        for q in created:
+            by_subject.setdefault(q.subject_id, []).append((q.id, q.correct_option))
+        return by_subject
+
+    def seed_users(self, prefix, n_users, password):
+        hashed = make_password(password)  # hash once: every user shares it
+        users = User.objects.bulk_create(
+            (User(username=f"{prefix}_user_{i + 1:05d}", email=f"{prefix}{i + 1}@example.com", password=hashed)
+             for i in range(n_users)),
+            batch_size=self.batch,
+        )
+        UserProfile.objects.bulk_create((UserProfile(user=u) for u in users), batch_size=self.batch)
+        self.stdout.write(f"👤 {len(users)} users")
+        return users
+
+    def seed_statuses(self, rng, users, subjects, questions, mean_answers):
+        # Subject popularity is independent of size: some small subjects are studied a lot
+        subject_ids = [s.id for s in subjects if s.id in questions]
+        rng.shuffle(subject_ids)
+        popularity = zipf_weights(len(subject_ids), 1.1)
+        difficulty = {}
+        per_user = []
+        alpha = 1.6  # Pareto: most users answer little, a few answer thousands
+        pending = []
+        for user in users:
+            target = int(mean_answers * rng.paretovariate(alpha) * (alpha - 1) / alpha)
+            skill = rng.betavariate(5, 2)
+            picked = {}  # question → (subject, correct option)
+            for _ in range(max(target, 1) * 2):
+                if len(picked) >= target:
+                    break
+                sid = rng.choices(subject_ids, popularity)[0]
+                qid, key = rng.choice(questions[sid])
+                picked[qid] = (sid, key)
+            per_user.append(len(picked))
+            for qid, (sid, key) in picked.items():
+                d = difficulty.setdefault(qid, rng.uniform(-0.25, 0.25))
+                p = min(max(skill - d, 0.05), 0.98)
+                seen = 1 + min(int(rng.expovariate(1.2)), 9)
+                last_correct = rng.random() < p
+                # The last attempt is one of the `seen`, and its answer agrees with last_was_correct
+                correct = sum(rng.random() < p for _ in range(seen - 1)) + last_correct
+                answer = key if last_correct else rng.choice([o for o in OPTIONS if o != key])
+                pending.append(UserQuestionStatus(
+                    user=user, question_id=qid, subject_id=sid, times_seen=seen, times_correct=correct,
+                    last_answer=answer, last_was_correct=last_correct,
+                ))
+            if len(pending) >= self.batch:
+                UserQuestionStatus.objects.bulk_create(pending, batch_size=self.batch)
+                pending = []
+        UserQuestionStatus.objects.bulk_create(pending, batch_size=self.batch)
+        per_user.sort()
+        if per_user:
+            self.stdout.write(
+                f"✍️  {sum(per_user)} statuses: median {per_user[len(per_user) // 2]} per user, "
+                f"max {per_user[-1]}"
+            )
+        else:
+            self.stdout.write("✍️  0 statuses: no users")
+        return sum(per_user)
@@ -0,0 +1,191 @@
+# quiz/memory.py
+"""
+Worker memory instrumentation.
+
+`MemoryMiddleware` tracks, per endpoint and per worker:
+
+  * how much resident memory (RSS) the worker gained while serving it, and
+  * with tracemalloc running, the peak Python allocation during the request.
+
+Responses that push RSS up and never give it back (big QuestionSerializer
+payloads, caches that grow) show up as endpoints with a large total RSS growth.
+
+tracemalloc is off by default (it slows allocation-heavy code noticeably).
+Start it at boot with MEMORY_TRACE=True, or on one worker at a time with
+POST /api/memory/snapshot/, which also stores a baseline; GET /api/memory/diff/
+then lists the allocation sites that grew since. Both hit whichever worker
+answers: compare `pid` in the responses.
+
+With MEMORY_MAX_RSS_MB set, a worker that ends a request above the limit sends
+itself SIGTERM: gunicorn finishes the request, retires the worker and forks a
+fresh one.
+"""
+import logging
+import os
+import resource
+import signal
+import sys
+import threading
+import tracemalloc
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger("quiz.memory")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_lock = threading.Lock()
+_endpoints = {}  # endpoint → {"requests", "rss_growth", "max_rss_growth", "max_peak"}
+_baseline = None
+
+
+def rss_bytes():
+    """Current resident set size; the high-water mark where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _mb(n):
+    return round(n / (1024 * 1024), 2)
+
+
+# ───────── tracemalloc snapshots ─────────
+def start_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+
+
+def _filtered(snapshot):
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+
+def _stat_row(stat, diff=False):
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    row = {"where": frames[-1] if frames else "?", "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+    if diff:
+        row.update(size_diff_kb=round(stat.size_diff / 1024, 1), count_diff=stat.count_diff)
+    if len(frames) > 1:
+        row["traceback"] = frames
+    return row
+
+
+def take_snapshot(group_by="lineno", limit=25):
+    """Start tracing if needed, store a baseline and return its biggest allocation sites."""
+    global _baseline
+    start_tracing()
+    snapshot = _filtered(tracemalloc.take_snapshot())
+    _baseline = snapshot
+    return [_stat_row(stat) for stat in snapshot.statistics(group_by)[:limit]]
+
+
+def diff_snapshot(group_by="lineno", limit=25):
+    """Allocation sites that grew the most since the baseline, or None without one."""
+    if _baseline is None or not tracemalloc.is_tracing():
+        return None
+    current = _filtered(tracemalloc.take_snapshot())
+    return [_stat_row(stat, diff=True) for stat in current.compare_to(_baseline, group_by)[:limit]]
+
+
+def stop_tracing():
+    global _baseline
+    _baseline = None
+    tracemalloc.stop()
+
+
+def status():
+    traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    with _lock:
+        endpoints = {
+            name: {
+                "requests": s["requests"],
+                "rss_growth_mb": _mb(s["rss_growth"]),
+                "max_rss_growth_mb": _mb(s["max_rss_growth"]),
+                "max_peak_mb": _mb(s["max_peak"]) if s["max_peak"] else None,
+            }
+            for name, s in sorted(_endpoints.items(), key=lambda item: item[1]["rss_growth"], reverse=True)
+        }
+    return {
+        "pid": os.getpid(),
+        "rss_mb": _mb(rss_bytes()),
+        "max_rss_mb": settings.MEMORY_MAX_RSS_MB or None,
+        "tracing": tracemalloc.is_tracing(),
+        "traced_mb": _mb(traced),
+        "traced_peak_mb": _mb(peak),
+        "has_baseline": _baseline is not None,
+        "endpoints": endpoints,
+    }
+
+
+# ───────── Middleware ─────────
+class MemoryMiddleware:
+    """
+    Per-endpoint RSS growth (two /proc reads per request) and, while tracing,
+    the request's peak Python allocation. Peaks are per process, so with
+    threaded workers a concurrent request can inflate another's number.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_rss = settings.MEMORY_MAX_RSS_MB * 1024 * 1024
+        self.recycling = False
+        if settings.MEMORY_TRACE:
+            start_tracing()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        before, traced = self.begin()
+        response = self.get_response(request)
+        self.end(request, before, traced)
+        return response
+
+    async def __acall__(self, request):
+        before, traced = self.begin()
+        response = await self.get_response(request)
+        self.end(request, before, traced)
+        return response
+
+    @staticmethod
+    def begin():
+        traced = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        return rss_bytes(), traced
+
+    def end(self, request, before, traced):
+        after = rss_bytes()
+        peak = tracemalloc.get_traced_memory()[1] - traced if traced is not None and tracemalloc.is_tracing() else 0
+        match = request.resolver_match
+        name = match.view_name if match else "unmatched"
+        growth = max(after - before, 0)
+        with _lock:
+            s = _endpoints.setdefault(name, {"requests": 0, "rss_growth": 0, "max_rss_growth": 0, "max_peak": 0})
+            s["requests"] += 1
+            s["rss_growth"] += growth
+            s["max_rss_growth"] = max(s["max_rss_growth"], growth)
+            s["max_peak"] = max(s["max_peak"], peak)
+        if self.max_rss and after > self.max_rss and not self.recycling:
+            self.recycle(name, after)
+
+    def recycle(self, endpoint, rss):
+        self.recycling = True
+        logger.warning(
+            "Worker %s at %s MB RSS (limit %s MB) after %s; recycling",
+            os.getpid(), _mb(rss), settings.MEMORY_MAX_RSS_MB, endpoint,
+            extra={"event": "memory_recycle", "pid": os.getpid(), "rss_mb": _mb(rss), "endpoint": endpoint},
+        )
+        if "gunicorn" in sys.modules:
+            # Graceful for gunicorn workers: the in-flight response completes, the arbiter replaces us
+            os.kill(os.getpid(), signal.SIGTERM)
@@ -0,0 +1,287 @@
+# quiz/metrics.py
+"""
+Prometheus metrics for every request, aggregated across worker processes.
+
+`MetricsMiddleware` records, per endpoint (the URL name, so label values stay
+bounded by the routes in api_urls.py):
+
+    dentest_http_requests_total{endpoint, method, status}        counter
+    dentest_http_request_duration_seconds{endpoint, method}      histogram
+    dentest_http_db_queries{endpoint, method}                    histogram (queries per request)
+    dentest_http_db_query_seconds_total{endpoint, method}        counter
+    dentest_http_response_size_bytes{endpoint, method}           histogram
+
+Each worker keeps its numbers in memory and writes them to
+METRICS_DIR/<pid>.json at most every METRICS_FLUSH_SECONDS (and at exit), with
+an atomic rename. `/metrics` sums every file, so any worker can answer a
+scrape. Files of workers that have exited (max_requests recycling, restarts)
+are folded into archive.json so totals stay monotonic without the directory
+growing.
+"""
+import atexit
+import fcntl
+import json
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import monotonic, perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .instrumentation import track_queries
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+COUNTERS = {
+    "dentest_http_requests_total": "Requests handled, by endpoint, method and status.",
+    "dentest_http_db_query_seconds_total": "Time spent in database queries.",
+}
+HISTOGRAMS = {
+    "dentest_http_request_duration_seconds": ("Request latency through the whole middleware stack.", DURATION_BUCKETS),
+    "dentest_http_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "dentest_http_response_size_bytes": ("Response body size.", SIZE_BUCKETS),
+}
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+ARCHIVE = "archive.json"
+
+
+# ───────── Per-process store ─────────
+class MetricStore:
+    """
+    In-memory counters and histograms for this process, keyed by
+    (name, sorted label items). Histogram values are
+    [count per bucket..., count above the last bucket, sum].
+    """
+
+    def __init__(self, directory, flush_seconds):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()
+        self.reset()
+        atexit.register(self.flush)
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.counters = {}
+        self.histograms = {}
+        self.flushed_at = monotonic()
+
+    def _check_fork(self):
+        # gunicorn --preload: don't carry the master's numbers into every worker
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = HISTOGRAMS[name][1]
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        hist[bisect_left(buckets, value)] += 1
+        hist[-1] += value
+
+    @contextmanager
+    def recording(self):
+        with self.lock:
+            self._check_fork()
+            yield self
+            due = monotonic() - self.flushed_at >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        return {
+            "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+            "histograms": [[name, dict(labels), list(hist)] for (name, labels), hist in self.histograms.items()],
+        }
+
+    def flush(self):
+        with self.lock:
+            self._check_fork()
+            data = self.snapshot()
+            self.flushed_at = monotonic()
+        if not data["counters"] and not data["histograms"]:
+            return
+        _write_json(os.path.join(self.directory, f"{self.pid}.json"), data)
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"counters": [], "histograms": []}
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = MetricStore(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+    return _store
+
+
+# ───────── Aggregation across workers ─────────
+class Totals:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def add(self, data):
+        for name, labels, value in data["counters"]:
+            key = (name, tuple(sorted(labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + value
+        for name, labels, hist in data["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            if name not in HISTOGRAMS or len(hist) != len(HISTOGRAMS[name][1]) + 2:
+                continue  # bucket layout changed since the file was written
+            total = self.histograms.setdefault(key, [0] * (len(hist) - 1) + [0.0])
+            for i, value in enumerate(hist):
+                total[i] += value
+
+    def dump(self):
+        return {
+            "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+            "histograms": [[name, dict(labels), hist] for (name, labels), hist in self.histograms.items()],
+        }
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Sum the numbers of every worker, folding files of exited workers into the archive."""
+    get_store().flush()
+    directory = settings.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = Totals()
+        archive.add(_read_json(os.path.join(directory, ARCHIVE)))
+        live = Totals()
+        dead = []
+        for entry in os.listdir(directory):
+            pid, _, ext = entry.partition(".")
+            if ext != "json" or not pid.isdigit():
+                continue
+            path = os.path.join(directory, entry)
+            if _alive(int(pid)):
+                live.add(_read_json(path))
+            else:
+                archive.add(_read_json(path))
+                dead.append(path)
+        if dead:
+            _write_json(os.path.join(directory, ARCHIVE), archive.dump())
+            for path in dead:
+                os.remove(path)
+    live.add(archive.dump())
+    return live
+
+
+# ───────── Prometheus text format ─────────
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(items):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}" if items else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals):
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (metric, labels), value in sorted(totals.counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (metric, labels), hist in sorted(totals.histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), hist[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(hist[-1])}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ───────── Middleware ─────────
+def _response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = perf_counter()
+        with track_queries(request) as stats:
+            response = self.get_response(request)
+        self.record(request, response, perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        with track_queries(request) as stats:
+            response = await self.get_response(request)
+        self.record(request, response, perf_counter() - start, stats)
+        return response
+
+    @staticmethod
+    def record(request, response, duration, stats):
+        match = request.resolver_match
+        labels = {
+            "endpoint": (match.view_name or match.route) if match else "unmatched",
+            "method": request.method if request.method in METHODS else "other",
+        }
+        size = _response_size(response)
+        with get_store().recording() as store:
+            store.inc("dentest_http_requests_total", {**labels, "status": str(response.status_code)})
+            store.observe("dentest_http_request_duration_seconds", labels, duration)
+            store.observe("dentest_http_db_queries", labels, stats.count)
+            store.inc("dentest_http_db_query_seconds_total", labels, stats.duration)
+            if size is not None:
+                store.observe("dentest_http_response_size_bytes", labels, size)
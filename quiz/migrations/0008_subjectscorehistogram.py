@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_alter_questionimage_question'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectScoreHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cumulative_counts', models.JSONField(default=list)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('min_answered', models.PositiveIntegerField(default=1)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('subject', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_histogram', to='quiz.subject')),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:03
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEX = GinIndex(fields=["search_vector"], name="quiz_question_search_gin")
+
+
+def build_search_index(apps, schema_editor):
+    """Postgres only: GIN index + backfill. SQLite keeps the column NULL."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Question = apps.get_model("quiz", "Question")
+    schema_editor.add_index(Question, SEARCH_INDEX)
+    Question.objects.update(
+        search_vector=(
+            SearchVector("text", weight="A", config="english")
+            + SearchVector("option1", "option2", "option3", "option4", weight="B", config="english")
+            + SearchVector("explanation", weight="C", config="english")
+        )
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.remove_index(apps.get_model("quiz", "Question"), SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_subjectscorehistogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
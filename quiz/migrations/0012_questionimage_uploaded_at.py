@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionimage',
+            name='uploaded_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
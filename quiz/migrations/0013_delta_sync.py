@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:17
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_questionimage_uploaded_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.PositiveIntegerField()),
+                ('subject_id', models.PositiveIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['subject', 'updated_at'], name='quiz_q_subject_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='userquestionstatus',
+            index=models.Index(fields=['user', 'last_seen_at'], name='quiz_uqs_user_seen'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedquestion',
+            index=models.Index(fields=['subject_id', 'deleted_at'], name='quiz_deleted_subject_at'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SUBJECT_INDEX = models.Index(
+    fields=['user', 'subject', 'last_was_correct'], include=('question',), name='quiz_uqs_user_subject_ok',
+)
+
+
+def add_subject_index(apps, schema_editor):
+    """Postgres: CONCURRENTLY, so answers keep being written while a big table is indexed."""
+    model = apps.get_model("quiz", "UserQuestionStatus")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(model, SUBJECT_INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(model, SUBJECT_INDEX)
+
+
+def remove_subject_index(apps, schema_editor):
+    model = apps.get_model("quiz", "UserQuestionStatus")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(model, SUBJECT_INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(model, SUBJECT_INDEX)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    # Existing rows are backfilled by 0016, before any code reading the column is deployed.
+    atomic = False
+
+    dependencies = [
+        ('quiz', '0013_delta_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userquestionstatus',
+            name='subject',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='quiz.subject'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='userquestionstatus', index=SUBJECT_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_subject_index, remove_subject_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# Same document as the old QUESTION_SEARCH_VECTOR: text A, options B, explanation C
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION quiz_question_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.text, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig,
+            COALESCE(NEW.option1, '') || ' ' || COALESCE(NEW.option2, '') || ' ' ||
+            COALESCE(NEW.option3, '') || ' ' || COALESCE(NEW.option4, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, COALESCE(NEW.explanation, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER quiz_question_search_vector
+    BEFORE INSERT OR UPDATE OF text, option1, option2, option3, option4, explanation ON quiz_question
+    FOR EACH ROW EXECUTE FUNCTION quiz_question_search_vector();
+
+-- Rows written by bulk paths before the trigger existed
+UPDATE quiz_question SET text = text;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS quiz_question_search_vector ON quiz_question;
+DROP FUNCTION IF EXISTS quiz_question_search_vector();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    """Postgres only: the database keeps search_vector current on every write, bulk ones included."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0014_status_subject'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
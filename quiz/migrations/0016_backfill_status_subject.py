@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH = 10_000
+
+
+def backfill_status_subject(apps, schema_editor):
+    """
+    Fill UserQuestionStatus.subject for rows written before 0014, so the
+    subject_id reads never see NULL. Same pk-range walk as
+    `manage.py backfill_status_subject`: one short UPDATE per batch.
+    """
+    Question = apps.get_model("quiz", "Question")
+    UserQuestionStatus = apps.get_model("quiz", "UserQuestionStatus")
+    db = schema_editor.connection.alias
+
+    bounds = UserQuestionStatus.objects.using(db).aggregate(lo=Min("pk"), hi=Max("pk"))
+    if bounds["lo"] is None:
+        return
+    subject_of_question = Subquery(
+        Question.objects.using(db).filter(pk=OuterRef("question_id")).values("subject_id")[:1]
+    )
+    for lo in range(bounds["lo"], bounds["hi"] + 1, BATCH):
+        UserQuestionStatus.objects.using(db).filter(
+            pk__gte=lo, pk__lt=lo + BATCH, subject__isnull=True
+        ).update(subject_id=subject_of_question)
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own instead of one long transaction over the whole table
+    atomic = False
+
+    dependencies = [
+        ('quiz', '0015_question_search_trigger'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_status_subject, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+UPDATED_INDEX = models.Index(fields=['user', 'updated_at'], name='quiz_uqs_user_updated')
+SEEN_INDEX = models.Index(fields=['user', 'last_seen_at'], name='quiz_uqs_user_seen')
+
+
+def swap_sync_index(apps, schema_editor):
+    """Postgres: CONCURRENTLY, like 0014, so answers keep being written meanwhile."""
+    model = apps.get_model("quiz", "UserQuestionStatus")
+    concurrently = {"concurrently": True} if schema_editor.connection.vendor == "postgresql" else {}
+    schema_editor.add_index(model, UPDATED_INDEX, **concurrently)
+    schema_editor.remove_index(model, SEEN_INDEX, **concurrently)
+
+
+def restore_sync_index(apps, schema_editor):
+    model = apps.get_model("quiz", "UserQuestionStatus")
+    concurrently = {"concurrently": True} if schema_editor.connection.vendor == "postgresql" else {}
+    schema_editor.add_index(model, SEEN_INDEX, **concurrently)
+    schema_editor.remove_index(model, UPDATED_INDEX, **concurrently)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    # Existing rows get the migration time, so clients do one full status resync.
+    atomic = False
+
+    dependencies = [
+        ('quiz', '0016_backfill_status_subject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userquestionstatus',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(model_name='userquestionstatus', name='quiz_uqs_user_seen'),
+                migrations.AddIndex(model_name='userquestionstatus', index=UPDATED_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(swap_sync_index, restore_sync_index),
+            ],
+        ),
+    ]
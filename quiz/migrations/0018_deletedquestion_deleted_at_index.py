@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0017_userquestionstatus_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deletedquestion',
+            index=models.Index(fields=['deleted_at'], name='quiz_deleted_at'),
+        ),
+    ]
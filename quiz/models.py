@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 import re
 import unicodedata
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import UniqueConstraint
 
 # 1. Section model — perfect as is.
@@ -58,11 +59,39 @@ def normalize_for_key(s: str) -> str:
     s = re.sub(r"[\.!\?:;,\u200b]+$", "", s)
     return s
 
+# Full-text search config; the document itself is built by a Postgres trigger (migration 0015)
+SEARCH_CONFIG = "english"
+
+
+class QuestionQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Tombstone the batch in one INSERT; the per-row post_delete receiver
+        leaves queryset deletes to this.
+        """
+        with transaction.atomic(using=self.db):
+            pairs = list(self.values_list("pk", "subject_id"))
+            result = super().delete()
+            DeletedQuestion.objects.using(self.db).bulk_create(
+                [DeletedQuestion(question_id=qid, subject_id=sid) for qid, sid in pairs]
+            )
+        return result
+
+
+class QuestionManager(models.Manager.from_queryset(QuestionQuerySet)):
+    def get_queryset(self):
+        # The tsvector is only read inside SQL; never ship it to Python
+        return super().get_queryset().defer("search_vector")
+
+
 class Question(models.Model):
     # Human-friendly code (keep for display/search), not the dedupe key
     question_id = models.CharField(max_length=300
     , blank=True, null=True)
 
+    # UserQuestionStatus.subject copies this. Anything that changes it must also
+    # update the question's statuses: Question.save and the admin move action do;
+    # a raw Question.objects.update(subject=...) would not.
     subject = models.ForeignKey(
         "Subject", related_name="questions", on_delete=models.CASCADE
     )
@@ -94,10 +123,38 @@ class Question(models.Model):
     explanation_image = models.ImageField(
         upload_to="explanation_image/", blank=True, null=True
     )
+    # Postgres-only tsvector (GIN-indexed), written by the quiz_question_search_vector trigger on
+    # every insert/update, bulk ones included: text ranks A, options B, explanation C.
+    # Stays NULL on SQLite, where search falls back to icontains
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Resized WebP/JPEG derivatives + placeholder per image field (see quiz/images.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Delta sync (/api/sync/questions/). Bulk .update() calls must set updated_at themselves.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = QuestionManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_subject_id = instance.__dict__.get("subject_id")
+        instance._loaded_correct_option = instance.__dict__.get("correct_option")
+        return instance
 
     def save(self, *args, **kwargs):
         self.normalized_text_key = normalize_for_key(self.text)
+        moved_from = getattr(self, "_loaded_subject_id", None)
+        old_key = getattr(self, "_loaded_correct_option", None)
         super().save(*args, **kwargs)
+        # Moving a question is a deletion as far as its old subject's clients are concerned
+        if moved_from and moved_from != self.subject_id:
+            DeletedQuestion.objects.create(question_id=self.pk, subject_id=moved_from)
+            UserQuestionStatus.objects.filter(question_id=self.pk).update(subject_id=self.subject_id)
+        if old_key and old_key != self.correct_option:
+            UserQuestionStatus.rekey([self.pk], self.correct_option)
+        self._loaded_subject_id = self.subject_id
+        self._loaded_correct_option = self.correct_option
 
     def __str__(self):
         return self.text
@@ -109,8 +166,13 @@ class Question(models.Model):
                 fields=["subject", "normalized_text_key"], name="uq_subject_normtext"
             )
         ]
+        indexes = [
+            models.Index(fields=["subject", "updated_at"], name="quiz_q_subject_updated"),
+        ]
+
 # 4. QuestionImage
 def get_image_filename(instance, filename):
+    # Only the extension survives: ContentAddressedStorage re-homes files by SHA-256.
     # ✅ Handle case where no question is linked yet
     if instance.question_id:
         return f"question_image/{instance.question_id}_{filename}"
@@ -124,6 +186,9 @@ class QuestionImage(models.Model):
         null=True, blank=True  # ✅ allows upload before linking to a question
     )
     image = models.ImageField(upload_to=get_image_filename)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Unlinked rows older than a grace period are garbage-collected (collect_orphan_media)
+    uploaded_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     def __str__(self):
         return f"Image for {self.question.text if self.question else 'Unlinked image'}"
@@ -197,15 +262,52 @@ class UserQuestionStatus(models.Model):
     question = models.ForeignKey(
         Question, related_name="user_statuses", on_delete=models.CASCADE
     )
+    # Copy of question.subject, so per-subject reads skip the join to Question.
+    # Filled on save; Question.save and the admin move action keep it in step (see
+    # Question.subject); rows from before the column existed are filled by migration 0016.
+    # Rows go with their question (CASCADE above), hence DO_NOTHING and no index of its own.
+    subject = models.ForeignKey(
+        Subject, related_name="+", on_delete=models.DO_NOTHING,
+        null=True, editable=False, db_index=False,
+    )
 
     times_seen = models.PositiveIntegerField(default=0)
     times_correct = models.PositiveIntegerField(default=0)
     last_answer = models.CharField(max_length=100, blank=True)
     last_was_correct = models.BooleanField(default=False)  # ✅ NEW FIELD
     last_seen_at = models.DateTimeField(auto_now=True)
+    # Delta-sync marker: also bumped by bulk changes to the payload (e.g. a corrected
+    # answer key), which must not touch last_seen_at, the user's own last answer
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = [("user", "question")]
+        indexes = [
+            # /api/sync/statuses/?since=
+            models.Index(fields=["user", "updated_at"], name="quiz_uqs_user_updated"),
+            # Per-subject progress, percentile and custom-quiz filters: index-only on Postgres
+            models.Index(
+                fields=["user", "subject", "last_was_correct"], include=["question"],
+                name="quiz_uqs_user_subject_ok",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.subject_id is None:
+            self.subject_id = self.question.subject_id
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "subject"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def rekey(cls, question_ids, correct_option):
+        """
+        Re-grade the latest answers to these questions after their key changed.
+        Bumps updated_at: the status payload carries correct_option, so sync clients refetch.
+        """
+        return cls.objects.filter(question_id__in=question_ids).update(
+            last_was_correct=models.Q(last_answer=correct_option), updated_at=timezone.now()
+        )
 
     def record_attempt(self, chosen_option: str, correct: bool):
         self.times_seen += 1
@@ -220,6 +322,7 @@ class UserQuestionStatus(models.Model):
                 "last_answer",
                 "last_was_correct",  # ✅ NEW FIELD
                 "last_seen_at",
+                "updated_at",
             ]
         )
 
@@ -256,3 +359,84 @@ class CustomQuizQuestion(models.Model):
     def __str__(self):
         return f"{self.custom_quiz.title} ↔ {self.question.question_id}"
     
+
+
+# 10. SubjectScoreHistogram
+class SubjectScoreHistogram(models.Model):
+    """
+    Accuracy distribution of every ranked user in one subject.
+    Rebuilt periodically by `manage.py rebuild_percentiles`, so a user's
+    percentile is a constant-time lookup instead of a scan over all statuses.
+    """
+    BUCKETS = 100
+
+    subject = models.OneToOneField(
+        Subject, related_name="score_histogram", on_delete=models.CASCADE
+    )
+    # cumulative_counts[i] = number of users whose accuracy bucket is < i
+    # (length BUCKETS + 1, so cumulative_counts[-1] == total_users)
+    cumulative_counts = models.JSONField(default=list)
+    total_users = models.PositiveIntegerField(default=0)
+    min_answered = models.PositiveIntegerField(default=1)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def bucket_for(cls, correct: int, answered: int) -> int:
+        # Integer math, exactly as rebuild_percentiles buckets: floats put 29/100 in bucket 28
+        return min(max((correct * cls.BUCKETS) // max(answered, 1), 0), cls.BUCKETS - 1)
+
+    def percentile_for(self, correct: int, answered: int):
+        """Share of ranked users scoring below correct/answered (ties count half)."""
+        if not self.total_users or len(self.cumulative_counts) != self.BUCKETS + 1:
+            return None
+        b = self.bucket_for(correct, answered)
+        below = self.cumulative_counts[b]
+        same = self.cumulative_counts[b + 1] - below
+        return round(100.0 * (below + 0.5 * same) / self.total_users, 1)
+
+    def __str__(self):
+        return f"Histogram for {self.subject_id} ({self.total_users} users)"
+
+
+# 11. RelatedQuestion
+class RelatedQuestion(models.Model):
+    """
+    Precomputed top-k TF-IDF neighbours of a question (same exam type),
+    written by `manage.py build_related_questions`.
+    """
+    question = models.ForeignKey(
+        Question, related_name="related_links", on_delete=models.CASCADE
+    )
+    related = models.ForeignKey(
+        Question, related_name="+", on_delete=models.CASCADE
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["question", "-score"]
+        unique_together = [("question", "related")]
+
+    def __str__(self):
+        return f"{self.question_id} → {self.related_id} ({self.score:.2f})"
+
+
+# 12. DeletedQuestion
+class DeletedQuestion(models.Model):
+    """
+    Tombstone for delta sync: a question deleted from, or moved out of, a subject.
+    Written by Question deletes (QuestionQuerySet.delete, or the post_delete signal
+    for single objects) and by moves (Question.save, the admin move action).
+    """
+    question_id = models.PositiveIntegerField()
+    subject_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["subject_id", "deleted_at"], name="quiz_deleted_subject_at"),
+            # /api/sync/statuses/ deletion feed and prune_sync_tombstones
+            models.Index(fields=["deleted_at"], name="quiz_deleted_at"),
+        ]
+
+    def __str__(self):
+        return f"Question {self.question_id} (subject {self.subject_id}) deleted {self.deleted_at:%Y-%m-%d %H:%M}"
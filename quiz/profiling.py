@@ -0,0 +1,230 @@
+# quiz/profiling.py
+"""
+On-demand sampling profiler for single requests.
+
+A staff member asks for a short-lived signed token (POST /api/profiles/token/)
+and replays or forwards the slow request with it:
+
+    curl -H "X-Profile: <token>" -b "sessionid=<the user's session>" https://…/api/user-progress/
+
+`ProfilingMiddleware` then samples the request thread's stack every
+PROFILE_INTERVAL_MS from a background thread (the request itself is not
+traced, so timings stay realistic) and writes to PROFILE_DIR:
+
+    <id>.collapsed   "frame;frame;frame count" lines for flamegraph.pl / speedscope
+    <id>.txt         top functions by self and total samples
+    <id>.json        method, path, endpoint, duration, sample count
+
+The response carries `X-Profile-Id: <id>`; GET /api/profiles/ lists results and
+/api/profiles/<id>/collapsed|top/ downloads them. Requests without the header
+cost one dict lookup. Under ASGI the sampled thread is the event loop, so
+concurrent requests on that worker show up in the profile too.
+"""
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+
+from .benchmarking import format_table
+
+HEADER = "X-Profile"
+META_KEY = "HTTP_X_PROFILE"
+TOKEN_SALT = "quiz.profiling"
+VALID_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[A-Za-z0-9._-]{1,32}$")
+TOP_FUNCTIONS = 40
+
+
+# ───────── Tokens ─────────
+def make_token(user):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign_object({"u": user.pk})
+
+
+def check_token(token):
+    """The staff user id the token was issued to, or None if it's forged or expired."""
+    try:
+        data = signing.TimestampSigner(salt=TOKEN_SALT).unsign_object(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return data.get("u")
+
+
+# ───────── Sampler ─────────
+@lru_cache(maxsize=4096)
+def _short_path(filename):
+    if "site-packages/" in filename:
+        return filename.split("site-packages/", 1)[1]
+    root = str(settings.BASE_DIR.parent) + "/"
+    return filename[len(root):] if filename.startswith(root) else os.path.basename(filename)
+
+
+class Sampler(threading.Thread):
+    """Counts the target thread's stacks (function granularity) until stopped or max_seconds."""
+
+    def __init__(self, thread_id, interval, max_seconds):
+        super().__init__(name="quiz-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.deadline = perf_counter() + max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval) and perf_counter() < self.deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self.done.set()
+        self.join()
+
+
+def top_functions(stacks, limit=TOP_FUNCTIONS):
+    """Rows of (function, self %, self, total %, total), busiest first."""
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    samples = sum(stacks.values()) or 1
+    return [
+        (fn, f"{own[fn] * 100 / samples:.1f}", own[fn], f"{total[fn] * 100 / samples:.1f}", total[fn])
+        for fn in sorted(total, key=lambda fn: (own[fn], total[fn]), reverse=True)[:limit]
+    ]
+
+
+# ───────── Storage ─────────
+def save(profile_id, sampler, meta):
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    with open(f"{base}.collapsed", "w") as fh:
+        fh.writelines(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common())
+    with open(f"{base}.txt", "w") as fh:
+        fh.write(f"{meta['method']} {meta['path']}  {meta['status']}  {meta['duration_ms']} ms  "
+                 f"{meta['samples']} samples every {meta['interval_ms']} ms\n\n")
+        fh.write(format_table(["function", "self %", "self", "total %", "total"], top_functions(sampler.stacks)))
+        fh.write("\n")
+    with open(f"{base}.json", "w") as fh:
+        json.dump(meta, fh)
+    prune(directory, settings.PROFILE_KEEP)
+
+
+def prune(directory, keep):
+    ids = sorted({name.rsplit(".", 1)[0] for name in os.listdir(directory) if VALID_ID.match(name.rsplit(".", 1)[0])})
+    for profile_id in ids[:-keep] if keep else []:
+        for ext in ("collapsed", "txt", "json"):
+            try:
+                os.remove(os.path.join(directory, f"{profile_id}.{ext}"))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    directory = settings.PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith(".json") and VALID_ID.match(name[:-5]):
+            with open(os.path.join(directory, name)) as fh:
+                profiles.append(json.load(fh))
+    return profiles
+
+
+def profile_path(profile_id, kind):
+    """Path of a stored result, or None for unknown ids (never outside PROFILE_DIR)."""
+    ext = {"collapsed": "collapsed", "top": "txt"}.get(kind)
+    if ext is None or not VALID_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.{ext}")
+    return path if os.path.exists(path) else None
+
+
+# ───────── Middleware ─────────
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if META_KEY not in request.META:
+            return self.get_response(request)
+        staff_id = check_token(request.META[META_KEY])
+        if staff_id is None:
+            return self.get_response(request)
+        sampler, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.finish(request, response, sampler, start, staff_id)
+
+    async def __acall__(self, request):
+        if META_KEY not in request.META:
+            return await self.get_response(request)
+        staff_id = check_token(request.META[META_KEY])
+        if staff_id is None:
+            return await self.get_response(request)
+        sampler, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.finish(request, response, sampler, start, staff_id)
+
+    @staticmethod
+    def start():
+        sampler = Sampler(
+            threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000, settings.PROFILE_MAX_SECONDS
+        )
+        sampler.start()
+        return sampler, perf_counter()
+
+    @staticmethod
+    def finish(request, response, sampler, start, staff_id):
+        duration_ms = round((perf_counter() - start) * 1000, 1)
+        now = datetime.now(timezone.utc)
+        request_id = getattr(request, "request_id", None) or f"{os.getpid()}{now.microsecond:06d}"
+        profile_id = f"{now:%Y%m%dT%H%M%S}-{request_id[:32]}"
+        match = request.resolver_match
+        save(profile_id, sampler, {
+            "id": profile_id,
+            "created": now.isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.path,
+            "endpoint": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": duration_ms,
+            "samples": sampler.samples,
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "requested_by": staff_id,
+            "pid": os.getpid(),
+        })
+        response["X-Profile-Id"] = profile_id
+        return response
@@ -0,0 +1,178 @@
+# quiz/query_plans.py
+"""
+Reading query plans for `manage.py audit_query_plans`.
+
+On PostgreSQL each captured SELECT is run under EXPLAIN (ANALYZE, BUFFERS,
+FORMAT JSON) and the plan tree is checked for:
+
+  * "seq_scan": a Seq Scan that reads at least `min_rows` rows (kept plus
+    removed by its filter), with an index suggested from the filter columns;
+  * "sort_spill" / "hash_spill": a Sort or Hash that ran out of work_mem and
+    went to disk;
+  * "random_sort": ORDER BY random() over at least `min_rows` rows, which
+    sorts every candidate to keep a handful;
+  * "nested_loop": a Nested Loop whose inner side ran `max_loops` times or
+    more, usually because the outer row estimate was far off.
+
+SQLite has no ANALYZE or BUFFERS; EXPLAIN QUERY PLAN still shows full table
+scans and random sorts, which is enough for a local dry run.
+"""
+import re
+from typing import NamedTuple, Optional
+
+MIN_ROWS = 1000
+MAX_LOOPS = 1000
+
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_CAST = re.compile(r"::[a-z ]+(?:\[\])?")
+_IDENT = re.compile(r'"?\b([a-z_][a-z0-9_]*)\b"?(?:\s*(=|<>|<=|>=|<|>|~~\*?|IS\b|IN\b))?', re.IGNORECASE)
+
+
+class Finding(NamedTuple):
+    kind: str
+    node: str
+    detail: str
+    suggestion: Optional[str] = None
+
+
+# ───────── Schema helpers ─────────
+def table_columns(connection, table):
+    with connection.cursor() as cursor:
+        return [col.name for col in connection.introspection.get_table_description(cursor, table)]
+
+
+def table_indexes(connection, table):
+    """{index name: [columns]} for every index on the table, constraints included."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {name: c["columns"] for name, c in constraints.items() if c["index"] or c["unique"] or c["primary_key"]}
+
+
+def filter_columns(expression, columns):
+    """
+    Columns of `columns` that an EXPLAIN filter or SQL WHERE clause compares,
+    equality comparisons first (they lead a composite index), then the rest.
+    LIKE patterns (~~) are left out: a b-tree index doesn't serve them.
+    """
+    expression = _CAST.sub("", _QUOTED.sub("?", expression))
+    equal, other = [], []
+    for name, op in _IDENT.findall(expression):
+        if name not in columns or name in equal or name in other or op.startswith("~~"):
+            continue
+        (equal if op in ("=", "IN") else other).append(name)
+    return equal + other
+
+
+def suggest_index(connection, table, columns):
+    """CREATE INDEX for `columns`, or a note naming the existing index that already leads with them."""
+    if not columns:
+        return None
+    for name, indexed in table_indexes(connection, table).items():
+        if indexed[:len(columns)] == columns:
+            return f"{name} already covers ({', '.join(columns)}): the planner skipped it, check ANALYZE statistics"
+    return f"CREATE INDEX CONCURRENTLY ON {table} ({', '.join(columns)});"
+
+
+# ───────── PostgreSQL ─────────
+def walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def _describe(node):
+    relation = node.get("Relation Name")
+    return f"{node['Node Type']} on {relation}" if relation else node["Node Type"]
+
+
+def analyze_postgres(connection, plan, min_rows=MIN_ROWS, max_loops=MAX_LOOPS):
+    """Findings for one EXPLAIN (ANALYZE, FORMAT JSON) result (the list psycopg returns)."""
+    findings = []
+    for node in walk(plan[0]["Plan"]):
+        kind = node["Node Type"]
+        loops = node.get("Actual Loops", 1)
+        if kind == "Seq Scan":
+            kept = node.get("Actual Rows", 0) * loops
+            read = kept + node.get("Rows Removed by Filter", 0) * loops
+            if read >= min_rows:
+                table = node["Relation Name"]
+                condition = node.get("Filter", "")
+                columns = filter_columns(condition, table_columns(connection, table)) if condition else []
+                findings.append(Finding(
+                    "seq_scan", _describe(node),
+                    f"read {read} rows to keep {kept}" + (f", filter {condition}" if condition else ""),
+                    suggest_index(connection, table, columns),
+                ))
+        elif kind in ("Sort", "Incremental Sort"):
+            keys = node.get("Sort Key", [])
+            random_key = any("random()" in k for k in keys)
+            if node.get("Sort Space Type") == "Disk":
+                findings.append(Finding(
+                    "sort_spill", _describe(node),
+                    f"{node.get('Sort Method')} wrote {node.get('Sort Space Used')} kB to disk, key {', '.join(keys)}",
+                    None if random_key else "raise work_mem for this query or index the sort key",
+                ))
+            if random_key and node.get("Actual Rows", 0) * loops >= min_rows:
+                findings.append(Finding(
+                    "random_sort", _describe(node),
+                    f"ORDER BY random() sorted {node['Actual Rows'] * loops} rows",
+                    "sample ids from the candidates instead of sorting all of them",
+                ))
+        elif kind == "Hash" and node.get("Hash Batches", 1) > 1:
+            findings.append(Finding(
+                "hash_spill", _describe(node),
+                f"{node['Hash Batches']} batches, {node.get('Peak Memory Usage')} kB in memory",
+                "raise work_mem for this query",
+            ))
+        elif kind == "Nested Loop" and len(node.get("Plans", [])) == 2:
+            outer, inner = node["Plans"]
+            inner_loops = inner.get("Actual Loops", 0)
+            if inner_loops >= max_loops:
+                findings.append(Finding(
+                    "nested_loop", _describe(node),
+                    f"inner {_describe(inner)} ran {inner_loops} times; outer estimated "
+                    f"{outer.get('Plan Rows')} rows, produced {outer.get('Actual Rows')}",
+                    None if "Index" in inner["Node Type"] else "index the inner side's join column",
+                ))
+    return findings
+
+
+def postgres_totals(plan):
+    root = plan[0]["Plan"]
+    return {
+        "ms": round(plan[0].get("Execution Time", 0), 2),
+        "rows": root.get("Actual Rows", 0),
+        "hit": root.get("Shared Hit Blocks", 0),
+        "read": root.get("Shared Read Blocks", 0),
+        "temp": root.get("Temp Written Blocks", 0),
+    }
+
+
+# ───────── SQLite ─────────
+_RANDOM_ORDER = re.compile(r"ORDER BY\s+RAND(?:OM)?\(\)", re.IGNORECASE)  # Django registers RAND() on SQLite
+_WHERE = re.compile(r"\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+
+
+def analyze_sqlite(connection, sql, rows, min_rows=MIN_ROWS):
+    """Findings for EXPLAIN QUERY PLAN rows (id, parent, notused, detail)."""
+    findings = []
+    where = _WHERE.search(sql)
+    for detail in (row[3] for row in rows):
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            table = detail.split()[1]
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+                count = cursor.fetchone()[0]
+            if count >= min_rows:
+                # Only this table's comparisons: other tables in the join may share column names
+                own = re.findall(rf'"{table}"\."(\w+)"\s*(=|IN\b|<>|<=|>=|<|>|IS\b)', where.group(1), re.IGNORECASE) if where else []
+                columns = filter_columns(" ".join(f"{c} {op}" for c, op in own), table_columns(connection, table))
+                findings.append(Finding(
+                    "seq_scan", detail, f"full scan of {count} rows", suggest_index(connection, table, columns),
+                ))
+        elif detail.startswith("USE TEMP B-TREE FOR ORDER BY") and _RANDOM_ORDER.search(sql):
+            findings.append(Finding(
+                "random_sort", detail, "ORDER BY random() sorts every candidate row",
+                "sample ids from the candidates instead of sorting all of them",
+            ))
+    return findings
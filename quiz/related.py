@@ -0,0 +1,62 @@
+# quiz/related.py
+"""
+TF-IDF vectors for question + explanation text and sparse cosine-similarity
+search, used offline by `manage.py build_related_questions`.
+"""
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from .search import tokenize
+
+MIN_TOKEN_LEN = 3
+
+
+def tfidf_matrix(docs: list[str]) -> sparse.csr_matrix:
+    """Row-normalized sublinear TF-IDF matrix (one row per doc)."""
+    vocab = {}
+    indptr, indices, data = [0], [], []
+    for doc in docs:
+        counts = Counter(t for t in tokenize(doc) if len(t) >= MIN_TOKEN_LEN)
+        for term, count in counts.items():
+            indices.append(vocab.setdefault(term, len(vocab)))
+            data.append(count)
+        indptr.append(len(indices))
+
+    X = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), indptr),
+        shape=(len(docs), max(len(vocab), 1)),
+    )
+    X.data = 1.0 + np.log(X.data)
+
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    idf = np.log((1.0 + X.shape[0]) / (1.0 + df)) + 1.0
+    X = (X @ sparse.diags(idf.astype(np.float32))).tocsr()
+
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ X).tocsr()
+
+
+def similarity_rows(X: sparse.csr_matrix, rows, min_score: float, chunk: int = 256):
+    """Yield (row, cols, scores) for every row in `rows`: all other rows with cosine ≥ min_score."""
+    rows = np.asarray(rows, dtype=np.int64)
+    XT = X.T.tocsc()
+    for start in range(0, len(rows), chunk):
+        block = rows[start:start + chunk]
+        sims = (X[block] @ XT).tocsr()
+        for r, row in enumerate(block):
+            lo, hi = sims.indptr[r], sims.indptr[r + 1]
+            cols, vals = sims.indices[lo:hi], sims.data[lo:hi]
+            keep = (cols != row) & (vals >= min_score)
+            yield int(row), cols[keep], vals[keep]
+
+
+def top_k(cols: np.ndarray, vals: np.ndarray, k: int) -> list[tuple[int, float]]:
+    """Best `k` (col, score) pairs, highest first."""
+    if len(vals) > k:
+        part = np.argpartition(-vals, k)[:k]
+        cols, vals = cols[part], vals[part]
+    order = np.argsort(-vals, kind="stable")
+    return [(int(c), float(v)) for c, v in zip(cols[order], vals[order])]
@@ -0,0 +1,117 @@
+# quiz/request_log.py
+"""
+Structured request logging.
+
+`RequestLogMiddleware` emits one record per request on the `quiz.requests`
+logger:
+
+    {"ts": "...", "level": "INFO", "logger": "quiz.requests", "event": "request",
+     "request_id": "3f2c…", "user_id": 12, "method": "GET", "path": "/api/user-progress/",
+     "endpoint": "user-progress", "route": "api/user-progress/", "status": 200,
+     "duration_ms": 41.7, "queries": 2, "db_ms": 3.1, "message": "GET /api/user-progress/ 200 41.7ms"}
+
+Requests slower than REQUEST_LOG_SLOW_MS are logged at WARNING with
+`"event": "slow_request"`, so `grep slow_request` finds them. The record is
+handed to a QueueingHandler (myproject/core/log_handlers.py) in settings, so
+the request thread pays for an enqueue; `JsonFormatter` runs on the listener
+thread.
+"""
+import json
+import logging
+import re
+import uuid
+from datetime import datetime, timezone
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .instrumentation import track_queries
+
+logger = logging.getLogger("quiz.requests")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_RESERVED = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and every `extra` field."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        entry.update((k, v) for k, v in record.__dict__.items() if k not in _RESERVED)
+        entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def request_id_for(request):
+    """Reuse a well-formed upstream X-Request-ID (load balancer, frontend), else mint one."""
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    return incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+
+def _user_id(request):
+    # Never force the lazy user here: that would add session/user queries to requests that didn't need them
+    user = request.__dict__.get("user")
+    if user is None or isinstance(user, SimpleLazyObject):
+        user = request.__dict__.get("_cached_user") or request.__dict__.get("_acached_user")
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class RequestLogMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_LOG_SLOW_MS", 1000)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.request_id = request_id_for(request)
+        start = perf_counter()
+        with track_queries(request) as stats:
+            response = self.get_response(request)
+        return self.finish(request, response, start, stats)
+
+    async def __acall__(self, request):
+        request.request_id = request_id_for(request)
+        start = perf_counter()
+        with track_queries(request) as stats:
+            response = await self.get_response(request)
+        return self.finish(request, response, start, stats)
+
+    def finish(self, request, response, start, stats):
+        duration_ms = round((perf_counter() - start) * 1000, 1)
+        response[REQUEST_ID_HEADER] = request.request_id
+        match = request.resolver_match
+        slow = duration_ms >= self.slow_ms
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "%s %s %s %sms", request.method, request.path, response.status_code, duration_ms,
+            extra={
+                "event": "slow_request" if slow else "request",
+                "request_id": request.request_id,
+                "user_id": _user_id(request),
+                "method": request.method,
+                "path": request.path,
+                "endpoint": match.view_name if match else None,
+                "route": match.route if match else None,
+                "status": response.status_code,
+                "duration_ms": duration_ms,
+                "queries": stats.count,
+                "db_ms": round(stats.duration * 1000, 1),
+            },
+        )
+        return response
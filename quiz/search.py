@@ -0,0 +1,57 @@
+# quiz/search.py
+"""
+Ranked full-text search over question text, options and explanations.
+
+On Postgres this uses the GIN-indexed `Question.search_vector` column,
+written by the `quiz_question_search_vector` trigger (migration 0015) on every
+insert and update, bulk ones included. Elsewhere (local SQLite) it falls back
+to an AND-of-terms `icontains` scan with a crude text-over-options rank.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from .models import SEARCH_CONFIG
+
+MAX_TERMS = 8
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query: str) -> list[str]:
+    return _TERM_RE.findall((query or "").lower())
+
+
+def full_text_filter(qs, query: str):
+    """Return `qs` narrowed to questions matching `query`, annotated with `rank`."""
+    if connection.vendor == "postgresql":
+        sq = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        return qs.filter(search_vector=sq).annotate(rank=SearchRank(F("search_vector"), sq))
+
+    terms = tokenize(query)[:MAX_TERMS]
+    if not terms:
+        return qs.none()
+    rank = Value(0.0)
+    for term in terms:
+        in_options = (
+            Q(option1__icontains=term) | Q(option2__icontains=term)
+            | Q(option3__icontains=term) | Q(option4__icontains=term)
+        )
+        qs = qs.filter(Q(text__icontains=term) | in_options | Q(explanation__icontains=term))
+        rank = rank + Case(
+            When(text__icontains=term, then=Value(1.0)),
+            When(in_options, then=Value(0.4)),
+            default=Value(0.2),
+            output_field=FloatField(),
+        )
+    return qs.annotate(rank=rank)
+
+
+def search_questions(qs, query: str, exam_type=None, subject_id=None):
+    """Filter by exam type / subject, match `query`, best matches first."""
+    if exam_type:
+        qs = qs.filter(subject__section__exam_type=exam_type)
+    if subject_id:
+        qs = qs.filter(subject_id=subject_id)
+    return full_text_filter(qs, query).order_by("-rank", "id")
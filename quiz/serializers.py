@@ -1,6 +1,7 @@
 # quiz/serializers.py
 
 from rest_framework import serializers
+from .images import variant_srcset
 from .models import Section, Subject, Question, UserQuestionStatus
 
 
@@ -24,6 +25,9 @@ class QuestionSerializer(serializers.ModelSerializer):
     question_image_url = serializers.URLField(read_only=True, allow_null=True, required=False)
     explanation_image = serializers.ImageField(read_only=True, allow_null=True, required=False)
     explanation_image_url = serializers.URLField(read_only=True, allow_null=True, required=False)
+    # {"width", "height", "placeholder", "webp": "<url> 320w, ...", "jpeg": "..."} or null
+    question_image_variants = serializers.SerializerMethodField()
+    explanation_image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Question
@@ -40,8 +44,21 @@ class QuestionSerializer(serializers.ModelSerializer):
             'question_image_url',
             'explanation_image',
             'explanation_image_url',
+            'question_image_variants',
+            'explanation_image_variants',
             'subject',
         ]
+
+    def _variants(self, obj, field):
+        request = self.context.get("request")
+        url_for = request.build_absolute_uri if request else (lambda url: url)
+        return variant_srcset((obj.image_variants or {}).get(field), url_for)
+
+    def get_question_image_variants(self, obj):
+        return self._variants(obj, "question_image")
+
+    def get_explanation_image_variants(self, obj):
+        return self._variants(obj, "explanation_image")
 # serializers.py
 
 class SectionWithSubjectsSerializer(serializers.ModelSerializer):
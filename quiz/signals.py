@@ -1,10 +1,11 @@
 # quiz/signals.py
 # ----------------
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import UserProfile  # adjust import path if your app name differs
+from .images import schedule_variants
+from .models import DeletedQuestion, Question, QuestionImage, QuestionQuerySet, UserProfile  # adjust import path if your app name differs
 
 User = get_user_model()
 
@@ -16,4 +17,29 @@ def create_or_update_user_profile(sender, instance, **kwargs):
     If one already exists, do nothing; otherwise create it.
     The new profile model handles default values internally.
     """
-    UserProfile.objects.get_or_create(user=instance)
\ No newline at end of file
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return  # every login saves last_login; the profile was ensured when the user was saved before
+    UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=QuestionImage)
+def build_image_variants(sender, instance, raw=False, **kwargs):
+    """
+    Resize / recompress changed images in the background worker pool
+    (no-op when the stored variant map already matches the file).
+    """
+    if raw:
+        return
+    schedule_variants(instance)
+
+
+@receiver(post_delete, sender=Question)
+def record_question_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Leave a tombstone so /api/sync/questions/ can tell returning clients to drop it.
+    Question querysets tombstone their whole batch in QuestionQuerySet.delete.
+    """
+    if isinstance(origin, QuestionQuerySet):
+        return
+    DeletedQuestion.objects.create(question_id=instance.pk, subject_id=instance.subject_id)
@@ -0,0 +1,190 @@
+# quiz/slow_queries.py
+"""
+Opt-in slow-query and N+1 log (SLOW_QUERY_LOG=True).
+
+`SlowQueryMiddleware` wraps every database execute for the request and keeps
+two kinds of entries in a bounded in-process ring buffer:
+
+  * "slow": a single query over SLOW_QUERY_MS, with its SQL, fingerprint,
+    duration, view and the project frames of the stack that issued it.
+  * "n_plus_one": one fingerprint executed SLOW_QUERY_REPEAT times or more in
+    one request, with the count, total time and the stack of the first repeat
+    (that is the loop that issues it).
+
+Entries are also logged on `quiz.slow_queries` at WARNING, so the request log
+files hold every worker's entries; the buffer behind GET /api/slow-queries/
+only holds the worker that answers. With the setting off the middleware
+removes itself at startup (MiddlewareNotUsed) and costs nothing.
+"""
+import logging
+import re
+import threading
+import traceback
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("quiz.slow_queries")
+
+STACK_DEPTH = 8
+SQL_MAX_CHARS = 2000
+# Entry points and the middleware that wrap every request say nothing about the query
+SKIP_FRAMES = ("manage.py", "quiz/instrumentation.py", "quiz/metrics.py", "quiz/request_log.py", "quiz/slow_queries.py")
+
+_buffer = deque(maxlen=getattr(settings, "SLOW_QUERY_BUFFER", 200))
+_buffer_lock = threading.Lock()
+
+
+# ───────── SQL fingerprints ─────────
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalize SQL so the same statement with different values groups together:
+    literals and placeholders become ?, IN lists of any length collapse to IN (...).
+    """
+    sql = _STRING.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def project_stack():
+    """
+    The innermost STACK_DEPTH frames that belong to this repo (no Django, DRF, stdlib
+    or middleware). When the query comes from library code only (a DRF serializer
+    walking a relation), the innermost library frames above the ORM instead.
+    """
+    root = str(settings.BASE_DIR.parent) + "/"
+    ours, libraries = [], []
+    for frame in traceback.extract_stack():
+        path = frame.filename
+        if path.startswith(root) and "site-packages" not in path:
+            path = path[len(root):]
+            if path not in SKIP_FRAMES:
+                ours.append(f"{path}:{frame.lineno} in {frame.name}")
+        elif "site-packages/" in path and "/django/db/" not in path:
+            libraries.append(f"{path.split('site-packages/', 1)[1]}:{frame.lineno} in {frame.name}")
+    return (ours or libraries)[-STACK_DEPTH:]
+
+
+def entries(kind=None):
+    with _buffer_lock:
+        items = list(_buffer)
+    items.reverse()  # newest first
+    return [e for e in items if kind is None or e["kind"] == kind]
+
+
+def _remember(entry):
+    with _buffer_lock:
+        _buffer.append(entry)
+    logger.warning("%s %s", entry["kind"], entry["fingerprint"][:200], extra=entry)
+
+
+# ───────── Per-request recorder ─────────
+class QueryRecorder:
+    """`connection.execute_wrapper` that times each query and tracks fingerprint repeats."""
+
+    def __init__(self, request, threshold_ms, repeat):
+        self.request = request
+        self.threshold = threshold_ms / 1000
+        self.repeat = repeat
+        self.seen = {}  # fingerprint → [count, total seconds, stack of the first repeat]
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, perf_counter() - start)
+
+    def record(self, sql, duration):
+        fp = fingerprint(sql)
+        stats = self.seen.setdefault(fp, [0, 0.0, None])
+        stats[0] += 1
+        stats[1] += duration
+        if stats[0] == 2:
+            stats[2] = project_stack()
+        if duration >= self.threshold:
+            _remember({
+                **self.context(),
+                "kind": "slow",
+                "fingerprint": fp,
+                "sql": sql[:SQL_MAX_CHARS],
+                "duration_ms": round(duration * 1000, 1),
+                "stack": stats[2] or project_stack(),
+            })
+
+    def context(self):
+        match = self.request.resolver_match
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "request_id": getattr(self.request, "request_id", None),
+            "method": self.request.method,
+            "path": self.request.path,
+            "endpoint": match.view_name if match else None,
+            "view": match._func_path if match else None,
+        }
+
+    def finish(self):
+        for fp, (count, total, stack) in self.seen.items():
+            if count >= self.repeat:
+                _remember({
+                    **self.context(),
+                    "kind": "n_plus_one",
+                    "fingerprint": fp,
+                    "count": count,
+                    "total_ms": round(total * 1000, 1),
+                    "stack": stack,
+                })
+
+
+# ───────── Middleware ─────────
+@contextmanager
+def _wrapped(recorder):
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(recorder))
+        yield recorder
+
+
+class SlowQueryMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_LOG", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold_ms = getattr(settings, "SLOW_QUERY_MS", 100)
+        self.repeat = getattr(settings, "SLOW_QUERY_REPEAT", 10)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(request, self.threshold_ms, self.repeat)
+        with _wrapped(recorder):
+            response = self.get_response(request)
+        recorder.finish()
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(request, self.threshold_ms, self.repeat)
+        with _wrapped(recorder):
+            response = await self.get_response(request)
+        recorder.finish()
+        return response
+
@@ -0,0 +1,53 @@
+# quiz/storage.py
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_PREFIX = "content"
+
+
+def content_name(digest: str, ext: str) -> str:
+    """content/ab/cd/abcd…<ext> — the storage path for a file with this SHA-256."""
+    return f"{CONTENT_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+
+def file_digest(content) -> str:
+    """SHA-256 of a Django File / UploadedFile, leaving it rewound."""
+    h = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        h.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return h.hexdigest()
+
+
+def is_content_addressed(name: str) -> bool:
+    return bool(name) and name.startswith(CONTENT_PREFIX + "/")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Ignores the upload_to path and stores each file under its SHA-256
+    (keeping only the extension). The same diagram attached to many questions
+    is written and downloaded once, and names never change for given bytes,
+    so they can be cached forever.
+
+    A save that finds its file already there refreshes the file's mtime:
+    collect_orphan_media spares files modified within its grace period, which
+    covers a reference written just after an old orphan was reused.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        target = content_name(file_digest(content), os.path.splitext(name)[1])
+        if self.exists(target):
+            os.utime(self.path(target))
+            return target
+        return super().save(target, content, max_length=max_length)
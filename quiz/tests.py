@@ -1,3 +1,583 @@
-from django.test import TestCase
+# quiz/tests.py
+"""
+Query and response-size budgets for every endpoint in quiz/api_urls.py.
 
-# Create your tests here.
+Each endpoint runs against the same seeded catalog at SMALL_ROWS and at
+LARGE_ROWS: questions in one subject, subjects in one section, one user's
+statuses, related questions and sync tombstones all scale with the row count.
+Queries must stay within the endpoint's budget at both sizes, so a per-row
+query (an N+1) fails at LARGE_ROWS even if it slips under the budget at
+SMALL_ROWS. Bodies must stay under `fixed_bytes + bytes_per_row * rows`.
+
+Session-authenticated requests pay two queries (session + user) before the view;
+writes inside atomic blocks count their SAVEPOINT/RELEASE statements.
+Runs on SQLite or Postgres:
+
+    python manage.py test quiz
+"""
+import importlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+from types import SimpleNamespace
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from . import api_urls, memory
+from .budgets import budget_for
+from .catalog import publish
+from .exporting import export_chunks
+from .management.commands.rebuild_percentiles import bucket_indices
+from .models import (
+    DeletedQuestion,
+    PatientChartData,
+    Question,
+    QuestionImage,
+    RelatedQuestion,
+    Section,
+    Subject,
+    SubjectScoreHistogram,
+    UserQuestionStatus,
+)
+from .profiling import make_token
+from .query_plans import analyze_postgres
+from .storage import ContentAddressedStorage
+
+SMALL_ROWS = 10
+LARGE_ROWS = 1000
+PASSWORD = "budget-pass-1"
+
+
+class Case(NamedTuple):
+    url_name: str
+    path: Callable  # (test) → path
+    queries: int
+    bytes_per_row: int = 0
+    fixed_bytes: int = 4096
+    method: str = "get"
+    data: Optional[Callable] = None  # (test) → JSON body
+    auth: str = "anon"  # anon | user | staff
+    status: int = 200
+    setup: Optional[Callable] = None  # (test) → None, run before the request
+    cleanup: Optional[Callable] = None
+
+
+def api_path(name, *args):
+    # Resolved against api_urls alone: "login"/"logout" also name django.contrib.auth views
+    return "/api" + reverse(name, urlconf=api_urls, args=args)
+
+
+def _url(name, *args, query=None):
+    def build(t):
+        path = api_path(name, *[a(t) if callable(a) else a for a in args])
+        return f"{path}?{query(t) if callable(query) else query}" if query else path
+    return build
+
+
+def _sync_token(t):
+    return t.client.get(api_path("sync-questions"), {"subject_id": t.subject.id}).json()["token"]
+
+
+def _profile_id(t):
+    return t.client.get(api_path("current-user"), HTTP_X_PROFILE=make_token(t.staff))["X-Profile-Id"]
+
+
+CASES = [
+    # ───────── Catalog ─────────
+    Case("section-list", _url("section-list", "inbde"), queries=1),
+    Case("subject-list", _url("subject-list", lambda t: t.section.id), queries=1, bytes_per_row=120),
+    Case("section-with-subjects", _url("section-with-subjects", lambda t: t.section.id), queries=2, bytes_per_row=120),
+    Case("questions-by-subject", _url("questions-by-subject", lambda t: t.subject.id), queries=1, bytes_per_row=700),
+    Case("related-questions", _url("related-questions", lambda t: t.questions[0].id), queries=1, bytes_per_row=10),
+    Case("question-search", _url("question-search", query="q=stem"), queries=1, fixed_bytes=8192),
+    Case("catalog-manifest", _url("catalog-manifest"), queries=0),
+    Case("sync-questions", _url("sync-questions", query=lambda t: f"subject_id={t.subject.id}"),
+         queries=1, bytes_per_row=700),
+    Case("sync-questions", _url("sync-questions", query=lambda t: f"subject_id={t.subject.id}&since={_sync_token(t)}"),
+         queries=2, bytes_per_row=700),
+    # ───────── Auth ─────────
+    Case("get-csrf", _url("get-csrf"), queries=0),
+    Case("login", _url("login"), method="post", queries=9,
+         data=lambda t: {"username": t.user.username, "password": PASSWORD}),
+    Case("logout", _url("logout"), method="post", auth="user", queries=4),
+    Case("current-user", _url("current-user"), auth="user", queries=2),
+    Case("signup", _url("signup"), method="post", status=201, queries=15,
+         data=lambda t: {"username": "newcomer", "email": "new@example.com", "password": PASSWORD}),
+    # ───────── Per-user ─────────
+    Case("update-question-status", _url("update-question-status"), method="post", auth="user", queries=5,
+         data=lambda t: {"question_id": t.questions[1].id, "selected": "option1"}),
+    Case("user-question-status-by-subject", _url("user-question-status-by-subject", lambda t: t.subject.id),
+         auth="user", queries=3, bytes_per_row=150),
+    Case("user_question_status_all", _url("user_question_status_all"), auth="user", queries=3, bytes_per_row=150),
+    Case("user-progress", _url("user-progress"), auth="user", queries=3),
+    Case("percentile", _url("percentile"), auth="user", queries=4),
+    Case("custom-quiz", _url("custom-quiz"), method="post", auth="user", queries=3, fixed_bytes=20 * 800,
+         data=lambda t: {"subject_ids": [t.subject.id], "filter": "incorrect", "limit": 20}),
+    Case("custom-quiz", _url("custom-quiz"), method="post", queries=1, fixed_bytes=20 * 800,
+         data=lambda t: {"subject_ids": [t.subject.id], "filter": "all", "limit": 20}),
+    Case("sync-statuses", _url("sync-statuses"), auth="user", queries=3, bytes_per_row=150),
+    Case("sync-statuses", _url("sync-statuses", query=lambda t: f"since={_sync_token(t)}"),
+         auth="user", queries=4, bytes_per_row=160),
+    # ───────── Staff tools ─────────
+    Case("question-export", _url("question-export", query="format=jsonl"), auth="staff",
+         queries=4, bytes_per_row=900),
+    Case("slow-queries", _url("slow-queries"), auth="staff", queries=2),
+    Case("profile-token", _url("profile-token"), method="post", auth="staff", queries=2),
+    Case("profile-list", _url("profile-list"), auth="staff", queries=2,
+         setup=_profile_id),
+    Case("profile-download", _url("profile-download", _profile_id, "top"), auth="staff", queries=2, fixed_bytes=16384),
+    Case("memory-status", _url("memory-status"), auth="staff", queries=2),
+    Case("memory-snapshot", _url("memory-snapshot", query="limit=5"), method="post", auth="staff",
+         queries=2, fixed_bytes=16384, cleanup=memory.stop_tracing),
+    Case("memory-diff", _url("memory-diff", query="limit=5"), auth="staff", queries=2, fixed_bytes=16384,
+         setup=lambda t: memory.take_snapshot(limit=1), cleanup=memory.stop_tracing),
+    # ───────── Async twins ─────────
+    Case("async-section-list", _url("async-section-list", "inbde"), queries=1),
+    Case("async-section-with-subjects", _url("async-section-with-subjects", lambda t: t.section.id),
+         queries=2, bytes_per_row=120),
+    Case("async-questions-by-subject", _url("async-questions-by-subject", lambda t: t.subject.id),
+         queries=1, bytes_per_row=700),
+    Case("async-user-progress", _url("async-user-progress"), auth="user", queries=3),
+]
+
+
+def seed_catalog(rows):
+    """One section of `rows` subjects; the first holds `rows` questions, answered by one user."""
+    section = Section.objects.create(name="Budget section", exam_type=Section.ExamType.INBDE)
+    Section.objects.create(name="Other section", exam_type=Section.ExamType.ADAT)
+    subjects = Subject.objects.bulk_create(
+        Subject(section=section, name=f"Subject {i:04d}", description="") for i in range(rows)
+    )
+    subject = subjects[0]
+    questions = Question.objects.bulk_create(
+        Question(
+            subject=subject,
+            question_id=f"B-{i:04d}",
+            text=f"Budget stem {i}: which finding best explains the presentation?",
+            normalized_text_key=f"budget stem {i}",
+            option1="Irreversible pulpitis",
+            option2="Reversible pulpitis",
+            option3="Cracked tooth",
+            option4="Periapical abscess",
+            correct_option=f"option{i % 4 + 1}",
+            explanation="The lingering pain to cold points to an irreversibly inflamed pulp.",
+        )
+        for i in range(rows)
+    )
+    user = User.objects.create_user("budget-user", "user@example.com", PASSWORD)
+    staff = User.objects.create_user("budget-staff", "staff@example.com", PASSWORD, is_staff=True)
+    UserQuestionStatus.objects.bulk_create(
+        UserQuestionStatus(
+            user=user, question=q, subject=subject, times_seen=2, times_correct=i % 2,
+            last_answer="option1", last_was_correct=bool(i % 2),
+        )
+        for i, q in enumerate(questions)
+    )
+    RelatedQuestion.objects.bulk_create(
+        RelatedQuestion(question=questions[0], related=q, score=1.0 / (i + 1))
+        for i, q in enumerate(questions[1:])
+    )
+    DeletedQuestion.objects.bulk_create(
+        DeletedQuestion(question_id=10 ** 6 + i, subject_id=subject.id) for i in range(rows)
+    )
+    SubjectScoreHistogram.objects.create(
+        subject=subject, cumulative_counts=list(range(SubjectScoreHistogram.BUCKETS + 1)),
+        total_users=SubjectScoreHistogram.BUCKETS,
+    )
+    return section, subject, questions, user, staff
+
+
+class ScratchDirsMixin:
+    def setUp(self):
+        # Keep the metrics store and stored profiles out of the real directories
+        scratch = tempfile.mkdtemp(prefix="quiz-tests-")
+        self.addCleanup(shutil.rmtree, scratch, ignore_errors=True)
+        overrides = override_settings(
+            METRICS_DIR=f"{scratch}/metrics",
+            PROFILE_DIR=f"{scratch}/profiles",
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+
+class EndpointBudgetMixin(ScratchDirsMixin):
+    ROWS = SMALL_ROWS
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(cls.ROWS)
+
+    def run_case(self, case):
+        self.client.logout()
+        if case.auth != "anon":
+            self.client.force_login(self.user if case.auth == "user" else self.staff)
+        if case.setup:
+            case.setup(self)
+        if case.cleanup:
+            self.addCleanup(case.cleanup)
+        path = case.path(self)
+        kwargs = {}
+        if case.data:
+            kwargs = {"data": json.dumps(case.data(self)), "content_type": "application/json"}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, case.method)(path, **kwargs)
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+
+        self.assertEqual(response.status_code, case.status, f"{case.url_name} {path}: {body[:300]!r}")
+        self.assertLessEqual(
+            len(ctx.captured_queries), case.queries,
+            f"{case.url_name} ran {len(ctx.captured_queries)} queries at {self.ROWS} rows "
+            f"(budget {case.queries}), first ones:\n" + "\n".join(q["sql"] for q in ctx.captured_queries[:10]),
+        )
+        max_bytes = case.fixed_bytes + case.bytes_per_row * self.ROWS
+        self.assertLessEqual(
+            len(body), max_bytes,
+            f"{case.url_name} returned {len(body)} bytes at {self.ROWS} rows (budget {max_bytes})",
+        )
+
+    def test_endpoint_budgets(self):
+        for i, case in enumerate(CASES):
+            with self.subTest(case=case.url_name, n=i):
+                self.run_case(case)
+
+
+FAST_HASHER = override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+
+@FAST_HASHER
+class SmallCatalogBudgetTests(EndpointBudgetMixin, TestCase):
+    ROWS = SMALL_ROWS
+
+
+@FAST_HASHER
+class LargeCatalogBudgetTests(EndpointBudgetMixin, TestCase):
+    ROWS = LARGE_ROWS
+
+
+class BudgetCoverageTests(TestCase):
+    def test_every_api_route_has_a_budget(self):
+        routes = {p.name for p in api_urls.urlpatterns if isinstance(p, URLPattern)}
+        self.assertEqual(routes - {case.url_name for case in CASES}, set(), "add a Case for each new endpoint")
+
+    def test_budgets_fit_under_runtime_caps(self):
+        # A Case above its runtime cap would pass here and answer 503 in production
+        for case in CASES:
+            cap = budget_for(SimpleNamespace(view_name=case.url_name, route="api/"))["queries"]
+            with self.subTest(case=case.url_name):
+                self.assertLessEqual(case.queries, cap or case.queries)
+
+
+# ───────── Runtime budgets ─────────
+@FAST_HASHER
+class RequestBudgetTests(ScratchDirsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(SMALL_ROWS)
+
+    def custom_quiz(self, **data):
+        body = {"subject_ids": [self.subject.id], "filter": "all", "limit": 20, **data}
+        return self.client.post(api_path("custom-quiz"), json.dumps(body), content_type="application/json")
+
+    @override_settings(CUSTOM_QUIZ_MAX_LIMIT=50, CUSTOM_QUIZ_MAX_SUBJECTS=3)
+    def test_custom_quiz_caps(self):
+        self.assertEqual(self.custom_quiz(limit=50).status_code, 200)
+        for data in ({"limit": 51}, {"limit": 0}, {"limit": "lots"}, {"subject_ids": [1, 2, 3, 4]},
+                     {"subject_ids": ["1; DROP"]}, {"subject_ids": {"id": 1}}):
+            with self.subTest(**data):
+                response = self.custom_quiz(**data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+
+    @override_settings(REQUEST_BUDGETS={"user-progress": {"queries": 1}})
+    def test_query_cap_fails_fast_and_logs(self):
+        self.client.force_login(self.user)
+        with self.assertLogs("quiz.budgets", "WARNING") as logs:
+            response = self.client.get(api_path("user-progress"))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("more than 1 database queries", response.json()["detail"])
+        self.assertEqual(logs.records[0].endpoint, "user-progress")
+
+    @override_settings(REQUEST_BUDGETS={"async-user-progress": {"queries": 1}})
+    def test_query_cap_on_plain_async_view(self):
+        self.client.force_login(self.user)
+        with self.assertLogs("quiz.budgets", "WARNING"):
+            response = self.client.get(api_path("async-user-progress"))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("detail", response.json())
+
+    def test_session_save_is_outside_the_budget(self):
+        order = settings.MIDDLEWARE.index
+        budget = order("quiz.budgets.BudgetMiddleware")
+        self.assertGreater(budget, order("django.contrib.sessions.middleware.SessionMiddleware"))
+        self.assertGreater(budget, order("django.contrib.auth.middleware.AuthenticationMiddleware"))
+
+
+# ───────── Query-plan audit ─────────
+# A custom-quiz "incorrect" plan gone wrong, as EXPLAIN (ANALYZE, FORMAT JSON) reports it
+BAD_PLAN = [{
+    "Plan": {"Node Type": "Limit", "Actual Rows": 20, "Actual Loops": 1, "Plans": [{
+        "Node Type": "Sort", "Sort Key": ["(random())"], "Sort Method": "external merge",
+        "Sort Space Type": "Disk", "Sort Space Used": 9000, "Actual Rows": 5000, "Actual Loops": 1,
+        "Plans": [{
+            "Node Type": "Nested Loop", "Actual Rows": 5000, "Actual Loops": 1, "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "quiz_userquestionstatus",
+                 "Filter": "((user_id = 7) AND (NOT last_was_correct))", "Plan Rows": 12,
+                 "Actual Rows": 5000, "Rows Removed by Filter": 95000, "Actual Loops": 1},
+                {"Node Type": "Index Scan", "Relation Name": "quiz_question", "Index Cond": "(id = u0.question_id)",
+                 "Actual Rows": 1, "Actual Loops": 5000},
+            ],
+        }],
+    }]},
+    "Execution Time": 812.5,
+}]
+
+
+class QueryPlanAuditTests(TestCase):
+    def test_flags_bad_plan(self):
+        findings = {f.kind: f for f in analyze_postgres(connection, BAD_PLAN)}
+        self.assertEqual(set(findings), {"sort_spill", "random_sort", "nested_loop", "seq_scan"})
+        self.assertEqual(
+            findings["seq_scan"].suggestion,
+            "CREATE INDEX CONCURRENTLY ON quiz_userquestionstatus (user_id, last_was_correct);",
+        )
+        self.assertIsNone(findings["nested_loop"].suggestion)  # the inner side is already an index scan
+
+    @FAST_HASHER
+    def test_command_replays_the_api(self):
+        seed_catalog(SMALL_ROWS)
+        out = StringIO()
+        call_command("audit_query_plans", "--username", "budget-user", "--all", stdout=out)
+        self.assertIn("custom-quiz incorrect", out.getvalue())
+        self.assertIn("distinct queries", out.getvalue())
+        self.assertFalse(User.objects.get(username="budget-user").is_staff)  # rolled back
+
+
+# ───────── Denormalized status subject ─────────
+class StatusSubjectTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(SMALL_ROWS)
+        cls.other = Subject.objects.create(section=cls.section, name="Other subject", description="")
+
+    def test_save_fills_subject(self):
+        status = UserQuestionStatus.objects.create(user=self.staff, question=self.questions[0])
+        self.assertEqual(status.subject_id, self.subject.id)
+
+    def test_moving_a_question_moves_its_statuses(self):
+        question = Question.objects.get(pk=self.questions[0].pk)
+        question.subject = self.other
+        question.save()
+        self.assertEqual(
+            UserQuestionStatus.objects.get(user=self.user, question=question).subject_id, self.other.id
+        )
+
+    def test_admin_move_moves_statuses(self):
+        self.client.force_login(User.objects.create_superuser("move-admin", "move@example.com", PASSWORD))
+        response = self.client.post(reverse("admin:quiz_question_changelist"), {
+            "action": "move_to_subject",
+            "_selected_action": [self.questions[0].pk, self.questions[1].pk],
+            "target_subject": self.other.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        moved = UserQuestionStatus.objects.filter(question__in=self.questions[:2])
+        self.assertTrue(moved.exists())
+        self.assertFalse(moved.exclude(subject=self.other).exists())
+        self.assertFalse(UserQuestionStatus.objects.exclude(question__in=self.questions[:2]).exclude(subject=self.subject).exists())
+
+    def test_admin_answer_key_fix_resyncs_without_touching_last_answer(self):
+        question = self.questions[0]
+        before = UserQuestionStatus.objects.get(user=self.user, question=question)
+        self.client.force_login(User.objects.create_superuser("key-admin", "key@example.com", PASSWORD))
+        self.client.post(reverse("admin:quiz_question_changelist"), {
+            "action": "set_correct_option",
+            "_selected_action": [question.pk],
+            "correct_option": next(o for o in ("option1", "option2") if o != question.correct_option),
+        })
+        after = UserQuestionStatus.objects.get(pk=before.pk)
+        self.assertEqual(after.last_seen_at, before.last_seen_at)
+        self.assertGreater(after.updated_at, before.updated_at)
+
+    def test_editing_the_key_regrades_and_resyncs(self):
+        self.client.force_login(self.user)
+        token = self.client.get(api_path("sync-statuses")).json()["token"]
+        question = Question.objects.get(pk=self.questions[1].pk)  # key option2, answered option1
+        question.correct_option = "option1"
+        question.save()
+        data = self.client.get(api_path("sync-statuses"), {"since": token}).json()
+        synced = {s["question_id"]: s for s in data["statuses"]}
+        self.assertEqual(synced[question.pk]["correct_option"], "option1")
+        self.assertTrue(synced[question.pk]["last_was_correct"])
+
+    def test_backfill(self):
+        UserQuestionStatus.objects.filter(question=self.questions[0]).update(subject=None)
+        UserQuestionStatus.objects.filter(question=self.questions[1]).update(subject=self.other)
+        call_command("backfill_status_subject", "--batch-size", "3", "--sleep", "0", stdout=StringIO())
+        self.assertFalse(UserQuestionStatus.objects.filter(subject__isnull=True).exists())
+        self.assertEqual(UserQuestionStatus.objects.filter(subject=self.other).count(), 1)  # left for --recheck
+        call_command("backfill_status_subject", "--recheck", "--sleep", "0", stdout=StringIO())
+        self.assertFalse(UserQuestionStatus.objects.filter(subject=self.other).exists())
+
+    def test_migration_backfills_before_reads(self):
+        UserQuestionStatus.objects.update(subject=None)
+        migration = importlib.import_module("quiz.migrations.0016_backfill_status_subject")
+        migration.backfill_status_subject(apps, SimpleNamespace(connection=connection))
+        self.assertFalse(UserQuestionStatus.objects.filter(subject__isnull=True).exists())
+
+    def test_rebuild_skips_statuses_without_subject(self):
+        UserQuestionStatus.objects.filter(question=self.questions[0]).update(subject=None)
+        call_command("rebuild_percentiles", "--min-answered", "1", stdout=StringIO())
+        self.assertEqual(list(SubjectScoreHistogram.objects.values_list("subject", flat=True)), [self.subject.id])
+
+
+# ───────── Sync tombstones ─────────
+class TombstoneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(SMALL_ROWS)
+        cls.other = Subject.objects.create(section=cls.section, name="Other subject", description="")
+
+    def tombstoned(self, questions):
+        return set(DeletedQuestion.objects.filter(question_id__in=[q.pk for q in questions])
+                   .values_list("question_id", "subject_id"))
+
+    def test_queryset_delete_tombstones_in_one_insert(self):
+        doomed = self.questions[:3]
+        with CaptureQueriesContext(connection) as ctx:
+            Question.objects.filter(pk__in=[q.pk for q in doomed]).only("pk").delete()
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "quiz_deletedquestion"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.tombstoned(doomed), {(q.pk, self.subject.id) for q in doomed})
+
+    def test_single_delete_tombstones(self):
+        Question.objects.get(pk=self.questions[0].pk).delete()
+        self.assertEqual(self.tombstoned(self.questions[:1]), {(self.questions[0].pk, self.subject.id)})
+
+    def test_status_sync_reports_deleted_not_moved(self):
+        self.client.force_login(self.user)
+        token = self.client.get(api_path("sync-statuses")).json()["token"]
+        Question.objects.filter(pk=self.questions[0].pk).delete()
+        moved = Question.objects.get(pk=self.questions[1].pk)
+        moved.subject = self.other
+        moved.save()
+        data = self.client.get(api_path("sync-statuses"), {"since": token}).json()
+        self.assertIn(self.questions[0].pk, data["deleted"])
+        self.assertNotIn(moved.pk, data["deleted"])
+
+
+# ───────── Static catalog ─────────
+class StaticCatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(SMALL_ROWS)
+
+    def test_bank_file_plus_delta_since_publish(self):
+        root = tempfile.mkdtemp(prefix="quiz-catalog-")
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        manifest, _, _ = publish(root)
+        with open(os.path.join(root, manifest["questions"][str(self.subject.id)]), encoding="utf-8") as fh:
+            bank = json.load(fh)
+        self.assertEqual([q["id"] for q in bank], [q.id for q in self.questions])
+
+        edited = Question.objects.get(pk=self.questions[0].pk)
+        edited.explanation = "Edited after the publish."
+        edited.save()
+        since = int(datetime.fromisoformat(manifest["published_at"]).timestamp() * 1000)
+        data = self.client.get(api_path("sync-questions"), {"subject_id": self.subject.id, "since": since}).json()
+        self.assertFalse(data["full"])
+        changed = {q["id"]: q for q in data["questions"]}
+        self.assertEqual(changed[edited.pk]["explanation"], "Edited after the publish.")
+
+
+# ───────── Export / import round trip ─────────
+class ExportRoundTripTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.section, cls.subject, cls.questions, cls.user, cls.staff = seed_catalog(SMALL_ROWS)
+        PatientChartData.objects.create(
+            question=cls.questions[2], patient_details="58-year-old female",
+            chief_complaint="Pain for 3 days", medical_history="Hypertension", current_findings="Percussion tenderness",
+        )
+
+    def setUp(self):
+        scratch = tempfile.mkdtemp(prefix="quiz-export-")
+        self.addCleanup(shutil.rmtree, scratch, ignore_errors=True)
+        self.media = os.path.join(scratch, "media")
+        overrides = override_settings(MEDIA_ROOT=self.media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.export = os.path.join(scratch, "bank")
+        name = default_storage.save("diagram.png", ContentFile(b"diagram bytes"))
+        Question.objects.filter(pk=self.questions[0].pk).update(question_image=name)
+        QuestionImage.objects.create(question=self.questions[1], image=default_storage.save("extra.png", ContentFile(b"extra")))
+
+    def round_trip(self, fmt):
+        path = f"{self.export}.{fmt}"
+        with open(path, "wb") as fh:
+            fh.writelines(export_chunks(fmt))
+        out = StringIO()
+        call_command("import_questions", path, "--media-dir", self.media, stdout=out)
+        return out.getvalue()
+
+    def test_reimport_changes_nothing(self):
+        for fmt in ("csv", "jsonl"):
+            with self.subTest(fmt=fmt):
+                before = dict(Question.objects.values_list("pk", "updated_at"))
+                images = QuestionImage.objects.count()
+                output = self.round_trip(fmt)
+                self.assertIn("2 referenced, 0 uploaded, 2 already stored, 0 missing", output)
+                self.assertIn(f"Created: 0, Updated: 0, Unchanged: {SMALL_ROWS}, Deleted: 0", output)
+                self.assertEqual(dict(Question.objects.values_list("pk", "updated_at")), before)
+                self.assertEqual(QuestionImage.objects.count(), images)
+                self.assertEqual(PatientChartData.objects.get().chief_complaint, "Pain for 3 days")
+
+    def test_chart_only_edit_bumps_updated_at(self):
+        path = f"{self.export}.csv"
+        with open(path, "wb") as fh:
+            fh.writelines(export_chunks("csv"))
+        PatientChartData.objects.update(chief_complaint="Edited in the database")
+        before = Question.objects.get(pk=self.questions[2].pk).updated_at
+        call_command("import_questions", path, stdout=StringIO())
+        self.assertEqual(PatientChartData.objects.get().chief_complaint, "Pain for 3 days")
+        self.assertGreater(Question.objects.get(pk=self.questions[2].pk).updated_at, before)
+
+
+# ───────── Media ─────────
+class ContentAddressedStorageTests(TestCase):
+    def test_dedupe_hit_refreshes_mtime(self):
+        location = tempfile.mkdtemp(prefix="quiz-media-")
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        storage = ContentAddressedStorage(location=location)
+        name = storage.save("a.png", ContentFile(b"diagram"))
+        week_ago = os.path.getmtime(storage.path(name)) - 7 * 86400
+        os.utime(storage.path(name), (week_ago, week_ago))
+
+        self.assertEqual(storage.save("b.png", ContentFile(b"diagram")), name)
+        self.assertGreater(os.path.getmtime(storage.path(name)), week_ago + 86400)
+
+
+# ───────── Percentile buckets ─────────
+class PercentileBucketTests(TestCase):
+    def test_lookup_matches_rebuild(self):
+        pairs = [(c, t) for t in range(1, 301) for c in range(t + 1)]
+        built = bucket_indices(
+            np.array([c for c, _ in pairs]), np.array([t for _, t in pairs]), SubjectScoreHistogram.BUCKETS
+        )
+        looked_up = [SubjectScoreHistogram.bucket_for(c, t) for c, t in pairs]
+        self.assertEqual(built.tolist(), looked_up)
+        self.assertEqual(SubjectScoreHistogram.bucket_for(29, 100), 29)
+        self.assertEqual(SubjectScoreHistogram.bucket_for(57, 100), 57)
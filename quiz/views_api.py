@@ -2,10 +2,21 @@ from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.middleware.csrf import get_token
 
-from .models import Section, Subject, Question, UserQuestionStatus
+from django.db.models import Count, F, Q
+
+from .models import (
+    Section,
+    Subject,
+    Question,
+    UserQuestionStatus,
+    SubjectScoreHistogram,
+    RelatedQuestion,
+)
+from .search import search_questions
 from .serializers import (
     SectionSerializer,
     SubjectSerializer,
@@ -42,7 +53,7 @@ class SubjectListBySection(generics.ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return Subject.objects.filter(section_id=self.kwargs["section_id"])
+        return Subject.objects.filter(section_id=self.kwargs["section_id"]).select_related("section")
 
 
 class QuestionListBySubject(generics.ListAPIView):
@@ -50,7 +61,23 @@ class QuestionListBySubject(generics.ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return Question.objects.filter(subject_id=self.kwargs["subject_id"])
+        return Question.objects.filter(subject_id=self.kwargs["subject_id"]).select_related("subject__section")
+
+
+class RelatedQuestionsView(APIView):
+    """
+    GET /api/questions/<question_id>/related/ → {"question_id": 12, "related_ids": [40, 7, 311]}
+    Neighbours are precomputed by `manage.py build_related_questions`; nothing is scored here.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, question_id):
+        related_ids = list(
+            RelatedQuestion.objects.filter(question_id=question_id)
+            .order_by("-score")
+            .values_list("related_id", flat=True)
+        )
+        return Response({"question_id": question_id, "related_ids": related_ids})
 
 
 class SectionWithSubjectsView(generics.RetrieveAPIView):
@@ -69,8 +96,8 @@ class UserQuestionStatusBySubjectView(generics.ListAPIView):
     def get_queryset(self):
         return UserQuestionStatus.objects.filter(
             user=self.request.user,
-            question__subject_id=self.kwargs["subject_id"],
-        )
+            subject_id=self.kwargs["subject_id"],
+        ).select_related("question")
 
 
 # ✅ New: return all answered questions for the logged-in user
@@ -83,7 +110,7 @@ class UserQuestionStatusAllView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return UserQuestionStatus.objects.filter(user=self.request.user)
+        return UserQuestionStatus.objects.filter(user=self.request.user).select_related("question")
 # ✅  Updated: decide correctness on the server
 class UserQuestionStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -111,27 +138,129 @@ class UserProgressView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        progress = {}
-        for s in UserQuestionStatus.objects.filter(user=request.user):
-            sid = s.question.subject_id
-            if sid not in progress:
-                progress[sid] = {"correct": 0, "total": 0}
-            progress[sid]["total"] += 1
-            if s.last_was_correct:
-                progress[sid]["correct"] += 1
-
+        rows = (
+            UserQuestionStatus.objects.filter(user=request.user)
+            .values("subject_id")
+            .annotate(total=Count("id"), correct=Count("id", filter=Q(last_was_correct=True)))
+            .order_by()
+        )
         return Response(
-            [{"subject_id": sid, **data} for sid, data in progress.items()],
+            [
+                {"subject_id": row["subject_id"], "correct": row["correct"], "total": row["total"]}
+                for row in rows
+            ],
             status=200,
         )
 
+# ───────── Percentile ranking ─────────
+class PercentileView(APIView):
+    """
+    GET /api/percentile/[?subject_id=3]
+    → [{"subject_id": 3, "answered": 40, "correct": 31, "accuracy": 77.5,
+        "percentile": 82.0, "ranked_users": 1200, "built_at": "..."}]
+
+    The user's own aggregate is one grouped query; the percentile itself is an
+    O(1) lookup into the histogram built by `manage.py rebuild_percentiles`.
+    `percentile` is null until the user has answered `min_answered` questions
+    or before the first rebuild.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        qs = UserQuestionStatus.objects.filter(user=request.user)
+        subject_id = request.query_params.get("subject_id")
+        if subject_id:
+            if not subject_id.isdigit():
+                return Response(
+                    {"detail": "subject_id must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(subject_id=subject_id)
+
+        own = (
+            qs.values("subject_id")
+            .annotate(
+                answered=Count("id"),
+                correct=Count("id", filter=Q(last_was_correct=True)),
+            )
+            .order_by("subject_id")
+        )
+        own = list(own)
+        histograms = SubjectScoreHistogram.objects.in_bulk(
+            [row["subject_id"] for row in own], field_name="subject_id"
+        )
+
+        results = []
+        for row in own:
+            sid = row["subject_id"]
+            accuracy = row["correct"] / row["answered"]
+            hist = histograms.get(sid)
+            percentile = None
+            if hist and row["answered"] >= hist.min_answered:
+                percentile = hist.percentile_for(row["correct"], row["answered"])
+            results.append({
+                "subject_id": sid,
+                "answered": row["answered"],
+                "correct": row["correct"],
+                "accuracy": round(100.0 * accuracy, 1),
+                "percentile": percentile,
+                "ranked_users": hist.total_users if hist else 0,
+                "built_at": hist.built_at if hist else None,
+            })
+        return Response(results, status=200)
+
+
+# ───────── Full-text question search ─────────
+class QuestionSearchView(APIView):
+    """
+    GET /api/search/?q=pulpitis&exam_type=inbde&subject_id=3&limit=20
+    → [{"id": 12, "text": "...", "subject_id": 3, "subject_name": "...",
+        "exam_type": "inbde", "rank": 0.61}]
+
+    Ranked by text > options > explanation. Returns lightweight rows only;
+    full questions come from the regular question endpoints.
+    """
+    permission_classes = [AllowAny]
+    MAX_LIMIT = 50
+
+    def get(self, request):
+        q = (request.query_params.get("q") or "").strip()
+        if not q:
+            return Response({"detail": "q required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        exam_type = request.query_params.get("exam_type")
+        if exam_type and exam_type not in Section.ExamType.values:
+            return Response({"detail": "Unknown exam_type"}, status=status.HTTP_400_BAD_REQUEST)
+
+        subject_id = request.query_params.get("subject_id")
+        if subject_id and not subject_id.isdigit():
+            return Response(
+                {"detail": "subject_id must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = search_questions(
+            Question.objects.all(), q, exam_type=exam_type, subject_id=subject_id
+        ).values(
+            "id", "text", "subject_id", "rank",
+            subject_name=F("subject__name"),
+            exam_type=F("subject__section__exam_type"),
+        )[:limit]
+        return Response(list(rows), status=200)
+
+
 class CustomQuizView(APIView):
     """
     POST /api/custom-quiz/
     {
-      "subject_ids": [1, 2, 3],                # required
+      "subject_ids": [1, 2, 3],                # required, at most CUSTOM_QUIZ_MAX_SUBJECTS
       "filter": "all|correct|incorrect|unanswered",
-      "limit": 20                              # default 20
+      "limit": 20                              # default 20, 1…CUSTOM_QUIZ_MAX_LIMIT
     }
 
     • Anyone can request "all".
@@ -141,14 +270,35 @@ class CustomQuizView(APIView):
 
     def post(self, request):
         subj_ids: list[int] = request.data.get("subject_ids", [])
-        filt: str           = request.data.get("filter", "all").lower()
-        limit: int          = int(request.data.get("limit", 20))
+        filt: str           = str(request.data.get("filter", "all")).lower()
+        limit               = request.data.get("limit", 20)
 
         if not subj_ids:
             return Response(
                 {"detail": "subject_ids required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        # ---- size caps: one request must not sort a whole bank ----------------
+        max_subjects = settings.CUSTOM_QUIZ_MAX_SUBJECTS
+        if (
+            not isinstance(subj_ids, list)
+            or len(subj_ids) > max_subjects
+            or not all(isinstance(s, int) and not isinstance(s, bool) for s in subj_ids)
+        ):
+            return Response(
+                {"detail": f"subject_ids must be a list of at most {max_subjects} integer ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_limit = settings.CUSTOM_QUIZ_MAX_LIMIT
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return Response(
+                {"detail": f"limit must be an integer from 1 to {max_limit}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # ---- guest restriction ------------------------------------------------
         if not request.user.is_authenticated and filt != "all":
@@ -160,23 +310,19 @@ class CustomQuizView(APIView):
 
         qs = Question.objects.filter(subject_id__in=subj_ids)
 
-        # answer-based filters (require auth)
+        # answer-based filters (require auth): question ids straight from the
+        # (user, subject, last_was_correct) index, no join back through Question
         if filt in ("correct", "incorrect", "unanswered"):
+            answered = UserQuestionStatus.objects.filter(user=request.user, subject_id__in=subj_ids)
             if filt == "correct":
-                qs = qs.filter(
-                    user_statuses__user=request.user,
-                    user_statuses__last_was_correct=True,
-                )
+                qs = qs.filter(id__in=answered.filter(last_was_correct=True).values("question_id"))
             elif filt == "incorrect":
-                qs = qs.filter(
-                    user_statuses__user=request.user,
-                    user_statuses__last_was_correct=False,
-                )
+                qs = qs.filter(id__in=answered.filter(last_was_correct=False).values("question_id"))
             else:  # "unanswered"
-                qs = qs.exclude(user_statuses__user=request.user)
+                qs = qs.exclude(id__in=answered.values("question_id"))
 
         # randomise and cap
-        questions = qs.order_by("?")[:limit]
+        questions = qs.select_related("subject__section").order_by("?")[:limit]
         return Response(QuestionSerializer(questions, many=True).data)
 # ───────── Simple login & CSRF helpers (unchanged) ─────────
 
@@ -265,12 +411,9 @@ class SignupView(View):
             user = User.objects.create_user(
                 username=username, email=email, password=password
             )
-            user.save()
 
-            # --- automatically log them in (optional) ---
-            user = authenticate(username=username, password=password)
-            if user:
-                login(request, user)
+            # --- automatically log them in (no second password hash / user fetch via authenticate) ---
+            login(request, user, backend="django.contrib.auth.backends.ModelBackend")
 
             return JsonResponse(
                 {"message": "User created successfully.", "username": user.username},
@@ -280,4 +423,299 @@ class SignupView(View):
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON."}, status=400)
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
+            return JsonResponse({"error": str(e)}, status=500)
+
+# ───────── Staff export (streams the import sheet format) ─────────
+from django.http import StreamingHttpResponse
+from .exporting import EXPORT_FORMATS, export_chunks
+
+
+class QuestionExportView(View):
+    """
+    GET /api/export/?format=csv|jsonl&gzip=1&subject_id=&exam_type=
+    Plain Django view: DRF would treat ?format= as a renderer override.
+    """
+
+    def get(self, request):
+        if not (request.user.is_authenticated and request.user.is_staff):
+            return JsonResponse({"detail": "Staff only."}, status=403)
+
+        fmt = request.GET.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return JsonResponse({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}."}, status=400)
+        gzip = request.GET.get("gzip") in ("1", "true")
+        subject_id = request.GET.get("subject_id")
+        if subject_id and not subject_id.isdigit():
+            return JsonResponse({"error": "subject_id must be an integer."}, status=400)
+
+        content_type, ext = EXPORT_FORMATS[fmt]
+        filename = f"questions.{ext}" + (".gz" if gzip else "")
+        response = StreamingHttpResponse(
+            export_chunks(fmt, gzip=gzip, subject_id=subject_id, exam_type=request.GET.get("exam_type")),
+            content_type="application/gzip" if gzip else content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+# ───────── Delta sync (returning clients fetch only what changed) ─────────
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from .models import DeletedQuestion
+
+# Rows committed slightly after their timestamp was taken are re-sent, never missed
+SYNC_OVERLAP = timedelta(seconds=30)
+# Tombstones older than this may be pruned; older tokens get a full resync
+SYNC_TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+def _sync_since(request):
+    """
+    Parse ?since=<token> (epoch milliseconds from a previous response).
+    Returns (since datetime or None for a full sync, next token). Raises ValueError.
+    """
+    now = timezone.now()
+    token = str(int(now.timestamp() * 1000))
+    raw = request.query_params.get("since")
+    if not raw:
+        return None, token
+    try:
+        since = datetime.fromtimestamp(int(raw) / 1000, tz=dt_timezone.utc) - SYNC_OVERLAP
+    except (OverflowError, OSError) as exc:
+        raise ValueError(raw) from exc
+    if since < now - SYNC_TOMBSTONE_RETENTION:
+        return None, token
+    return since, token
+
+
+class QuestionSyncView(APIView):
+    """
+    GET /api/sync/questions/?subject_id=3&since=<token>
+    → {"token": "...", "full": false, "questions": [...], "deleted": [12, 40]}
+    Without a token (or with an expired one) `full` is true and `questions` is the whole bank:
+    the client should replace its cache. Otherwise upsert `questions` and drop `deleted`.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        subject_id = request.query_params.get("subject_id", "")
+        if not subject_id.isdigit():
+            return Response({"error": "subject_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            since, token = _sync_since(request)
+        except ValueError:
+            return Response({"error": "Invalid since token."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Question.objects.filter(subject_id=subject_id).select_related("subject__section")
+        deleted = []
+        if since is not None:
+            qs = qs.filter(updated_at__gte=since)
+        questions = QuestionSerializer(qs.order_by("id"), many=True, context={"request": request}).data
+
+        if since is not None:
+            changed = {q["id"] for q in questions}
+            deleted = sorted(
+                set(
+                    DeletedQuestion.objects.filter(subject_id=subject_id, deleted_at__gte=since)
+                    .values_list("question_id", flat=True)
+                ) - changed  # moved away and back again → the upsert wins
+            )
+        return Response({"token": token, "full": since is None, "questions": questions, "deleted": deleted})
+
+
+class StatusSyncView(APIView):
+    """
+    GET /api/sync/statuses/?since=<token>
+    → {"token": "...", "full": false, "statuses": [...], "deleted": [12, 40]}
+    Statuses only disappear with their question: `deleted` lists questions deleted since
+    the token (moved ones keep their statuses), so the client drops those statuses too.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since, token = _sync_since(request)
+        except ValueError:
+            return Response({"error": "Invalid since token."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = UserQuestionStatus.objects.filter(user=request.user).select_related("question")
+        deleted = []
+        if since is not None:
+            qs = qs.filter(updated_at__gte=since)
+            deleted = list(
+                DeletedQuestion.objects.filter(deleted_at__gte=since)
+                .exclude(question_id__in=Question.objects.values("id"))
+                .values_list("question_id", flat=True).distinct().order_by("question_id")
+            )
+        statuses = UserQuestionStatusSerializer(qs.order_by("question_id"), many=True).data
+        return Response({"token": token, "full": since is None, "statuses": statuses, "deleted": deleted})
+
+
+# ───────── Static catalog manifest ─────────
+from .catalog import load_manifest
+
+
+class CatalogManifestView(APIView):
+    """
+    GET /api/catalog/manifest/ → {"version", "published_at", "base_url",
+    "sections": {"inbde": "sections-inbde.<hash>.json"},
+    "sections_with_subjects": {"<section id>": ...}, "questions": {"<subject id>": ...}}
+    Files are published by `manage.py publish_static_catalog` and served by WhiteNoise.
+    Clients load a question bank from its file, then /api/sync/questions/?since=<published_at ms>.
+    An empty object means nothing is published yet: use the regular endpoints.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        response = Response(load_manifest())
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
+
+# ───────── Slow-query log (opt-in, SLOW_QUERY_LOG) ─────────
+import os
+from django.conf import settings
+from rest_framework.permissions import IsAdminUser
+from . import slow_queries
+
+
+class SlowQueryLogView(APIView):
+    """
+    GET /api/slow-queries/?kind=slow|n_plus_one → newest first, from this worker's ring buffer.
+    Every worker's entries are also in the quiz.slow_queries log.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        kind = request.GET.get("kind")
+        if kind not in (None, "slow", "n_plus_one"):
+            return Response({"error": "kind must be slow or n_plus_one."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "enabled": settings.SLOW_QUERY_LOG,
+            "threshold_ms": settings.SLOW_QUERY_MS,
+            "repeat_threshold": settings.SLOW_QUERY_REPEAT,
+            "pid": os.getpid(),
+            "entries": slow_queries.entries(kind),
+        })
+
+
+# ───────── Request profiles (quiz/profiling.py) ─────────
+from django.http import FileResponse
+from . import profiling
+
+
+class ProfileTokenView(APIView):
+    """
+    POST /api/profiles/token/ → {"header": "X-Profile", "token": "...", "expires_in": 3600}
+    Any request sent with that header within the lifetime is sampled and stored.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        return Response({
+            "header": profiling.HEADER,
+            "token": profiling.make_token(request.user),
+            "expires_in": settings.PROFILE_TOKEN_MAX_AGE,
+        })
+
+
+class ProfileListView(APIView):
+    """GET /api/profiles/ → stored profiles, newest first"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(profiling.list_profiles())
+
+
+class ProfileDownloadView(APIView):
+    """GET /api/profiles/<id>/collapsed/ (flamegraph input) or /api/profiles/<id>/top/ (text table)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id, kind):
+        path = profiling.profile_path(profile_id, kind)
+        if path is None:
+            return Response({"error": "Profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            open(path, "rb"), as_attachment=True, filename=os.path.basename(path), content_type="text/plain"
+        )
+
+
+# ───────── Worker memory (quiz/memory.py) ─────────
+from . import memory
+
+MEMORY_GROUPINGS = ("lineno", "filename", "traceback")
+
+
+def _memory_params(request):
+    group_by = request.query_params.get("group", "lineno")
+    limit = request.query_params.get("limit", "25")
+    if group_by not in MEMORY_GROUPINGS or not limit.isdigit():
+        raise ValueError
+    return group_by, min(int(limit), 200)
+
+
+class MemoryStatusView(APIView):
+    """GET /api/memory/ → this worker's RSS, tracemalloc totals and per-endpoint growth"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(memory.status())
+
+
+class MemorySnapshotView(APIView):
+    """
+    POST /api/memory/snapshot/?group=lineno|filename|traceback&limit=25
+    Starts tracemalloc on this worker if needed and stores the baseline for /api/memory/diff/.
+    DELETE stops tracing and drops the baseline.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        try:
+            group_by, limit = _memory_params(request)
+        except ValueError:
+            return Response({"error": "group must be lineno, filename or traceback; limit an integer."}, status=400)
+        return Response({"pid": os.getpid(), "top": memory.take_snapshot(group_by, limit)})
+
+    def delete(self, request):
+        memory.stop_tracing()
+        return Response({"pid": os.getpid(), "tracing": False})
+
+
+class MemoryDiffView(APIView):
+    """GET /api/memory/diff/?group=&limit= → allocation sites that grew since this worker's baseline"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            group_by, limit = _memory_params(request)
+        except ValueError:
+            return Response({"error": "group must be lineno, filename or traceback; limit an integer."}, status=400)
+        top = memory.diff_snapshot(group_by, limit)
+        if top is None:
+            return Response(
+                {"error": f"No baseline on worker {os.getpid()}: POST /api/memory/snapshot/ first."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"pid": os.getpid(), "top": top})
+
+# ───────── Prometheus metrics ─────────
+import hmac
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+from .metrics import collect, render
+
+
+@never_cache
+def metrics_endpoint(request):
+    """
+    GET /metrics → Prometheus text format, summed over every worker (quiz/metrics.py).
+    Scrapers send `Authorization: Bearer <METRICS_TOKEN>`; staff sessions work too.
+    """
+    token = settings.METRICS_TOKEN
+    auth = request.headers.get("Authorization", "")
+    authorized = bool(token) and hmac.compare_digest(auth.encode(), f"Bearer {token}".encode())
+    if not (authorized or (request.user.is_authenticated and request.user.is_staff)):
+        return JsonResponse({"detail": "Staff or metrics token required."}, status=403)
+    return HttpResponse(render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,72 @@
+# quiz/views_async.py
+"""
+Async twins of the hot read endpoints, mounted under /api/async/.
+
+Same JSON as the DRF views, but written as native Django async views with
+the async ORM, so under an ASGI server (see myproject/core/gunicorn_asgi.py)
+a worker keeps accepting requests while a query is in flight. Under WSGI
+they still work; Django just runs them through async_to_sync.
+
+Rows are fetched asynchronously and then handed to the existing serializers,
+which do no further I/O because everything they touch is select_related.
+"""
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .models import Question, Section, UserQuestionStatus
+from .serializers import QuestionSerializer, SectionSerializer, SectionWithSubjectsSerializer
+
+
+def _forbidden():
+    # Same body DRF returns for IsAuthenticated
+    return JsonResponse({"detail": "Authentication credentials were not provided."}, status=403)
+
+
+# ───────── Catalog ─────────
+@require_GET
+async def section_list(request, exam_type):
+    """Async GET /api/sections/<exam_type>/"""
+    sections = [s async for s in Section.objects.filter(exam_type=exam_type)]
+    return JsonResponse(SectionSerializer(sections, many=True).data, safe=False)
+
+
+@require_GET
+async def section_with_subjects(request, section_id):
+    """Async GET /api/sections/<section_id>/with-subjects/"""
+    section = await Section.objects.prefetch_related("subjects").filter(pk=section_id).afirst()
+    if section is None:
+        raise Http404("No Section matches the given query.")
+    return JsonResponse(SectionWithSubjectsSerializer(section).data)
+
+
+# ───────── Questions ─────────
+@require_GET
+async def questions_by_subject(request, subject_id):
+    """Async GET /api/questions/subject/<subject_id>/"""
+    questions = [
+        q async for q in Question.objects.filter(subject_id=subject_id).select_related("subject__section")
+    ]
+    data = QuestionSerializer(questions, many=True, context={"request": request}).data
+    return JsonResponse(data, safe=False)
+
+
+# ───────── User progress ─────────
+@require_GET
+async def user_progress(request):
+    """Async GET /api/user-progress/ → [{"subject_id", "correct", "total"}]"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return _forbidden()
+
+    rows = (
+        UserQuestionStatus.objects.filter(user=user)
+        .values("subject_id")
+        .annotate(total=Count("id"), correct=Count("id", filter=Q(last_was_correct=True)))
+        .order_by()
+    )
+    progress = [
+        {"subject_id": row["subject_id"], "correct": row["correct"], "total": row["total"]}
+        async for row in rows
+    ]
+    return JsonResponse(progress, safe=False)